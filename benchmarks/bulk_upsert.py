@@ -0,0 +1,78 @@
+# benchmarks/bulk_upsert.py
+"""
+Пропускная способность bulk upsert (services/product_service/api/bulk.py) против
+построчного создания через ORM с commit на каждый товар (как POST /products/).
+Файл SQLite во временном каталоге: commit действительно пишет на диск.
+
+    python benchmarks/bulk_upsert.py [число_строк]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from common.db.base import Base
+from common.models import Category, Inventory, Product
+import services.review_service.models.review  # noqa: F401  (связи User/Product)
+import services.review_service.models.recommendation  # noqa: F401
+from services.product_service.api.bulk import BULK_BATCH_SIZE, process_batch
+
+
+def make_rows(n: int, category_id: int, price: float = 1.0):
+    return [
+        (i, {
+            "name": f"bench-{i}", "description": "bench", "price": price, "status": "active",
+            "current_inventory": 5, "category_id": category_id, "category_name": "bench",
+        })
+        for i in range(1, n + 1)
+    ]
+
+
+def setup(path: str) -> Session:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    db.add(Category(category_id=1, category_name="bench"))
+    db.commit()
+    return db
+
+
+def bulk(db: Session, rows) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(rows), BULK_BATCH_SIZE):
+        report, _ = process_batch(db, rows[i:i + BULK_BATCH_SIZE])
+        assert all(r["status"] == "ok" for r in report), report[:3]
+    return time.perf_counter() - start
+
+
+def row_by_row(db: Session, rows) -> float:
+    start = time.perf_counter()
+    for _, row in rows:
+        product = Product(**row)
+        db.add(product)
+        db.flush()
+        db.add(Inventory(product_id=product.id, category_id=row["category_id"], delta=row["current_inventory"], reason="initial"))
+        db.commit()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = setup(os.path.join(tmp, "bulk.db"))
+        inserted = bulk(db, make_rows(n, 1))
+        updated = bulk(db, make_rows(n, 1, price=2.0))  # те же ключи — ветка ON CONFLICT DO UPDATE
+
+        db_orm = setup(os.path.join(tmp, "orm.db"))
+        sample = min(n, 2000)
+        orm = row_by_row(db_orm, make_rows(sample, 1))
+
+    print(f"{'режим':<28}{'строк':>10}{'строк/с':>12}")
+    print(f"{'bulk insert':<28}{n:>10}{n / inserted:>12.0f}")
+    print(f"{'bulk upsert (конфликт)':<28}{n:>10}{n / updated:>12.0f}")
+    print(f"{'ORM, commit на строку':<28}{sample:>10}{sample / orm:>12.0f}")
@@ -0,0 +1,101 @@
+# benchmarks/inventory_contention.py
+"""
+Конкурентное списание остатков: N потоков покупают по одной штуке товара с остатком S < N.
+Сравнивается старая схема «прочитать остаток → записать новое значение» и
+условный UPDATE ... WHERE current_inventory >= :n RETURNING (services/product_service/api/inventory.py).
+Успешных продаж должно быть ровно S, остаток — 0; больше S — перепродажа.
+
+    python benchmarks/inventory_contention.py [потоков] [остаток] [url_бд]
+
+По умолчанию — файл SQLite во временном каталоге; для Postgres передайте url (таблицы создаются заново).
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from common.custom_exceptions import InsufficientInventoryException
+from common.db.base import Base
+from common.models import Category, Product
+import services.review_service.models.review  # noqa: F401  (связи User/Product)
+import services.review_service.models.recommendation  # noqa: F401
+from services.product_service.api.inventory import decrement_inventory
+from services.product_service.api.schemas import InventoryItem
+
+
+def setup(url: str, stock: int):
+    engine = create_engine(url, connect_args={"timeout": 60} if url.startswith("sqlite") else {})
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Category(category_id=1, category_name="bench"))
+        db.add(Product(
+            id=1, name="bench", description="bench", price=1.0, status="active",
+            current_inventory=stock, category_id=1, category_name="bench",
+        ))
+        db.commit()
+    return Session
+
+
+def read_then_write(db) -> bool:
+    # Как раньше в sales_service: GET остатка, проверка в приложении, PUT абсолютного значения
+    current = db.execute(select(Product.current_inventory).where(Product.id == 1)).scalar()
+    time.sleep(0.001)  # задержка сети между двумя HTTP-запросами
+    if current < 1:
+        return False
+    db.query(Product).filter(Product.id == 1).update({"current_inventory": current - 1})
+    db.commit()
+    return True
+
+
+def atomic(db) -> bool:
+    try:
+        decrement_inventory(db, [InventoryItem(product_id=1, quantity=1)])
+    except InsufficientInventoryException:
+        return False
+    db.commit()
+    return True
+
+
+def run(Session, buy, threads: int):
+    sold, lock, barrier = [0], threading.Lock(), threading.Barrier(threads)
+
+    def worker():
+        with Session() as db:
+            barrier.wait()
+            if buy(db):
+                with lock:
+                    sold[0] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    with Session() as db:
+        left = db.execute(select(Product.current_inventory).where(Product.id == 1)).scalar()
+    return sold[0], left, elapsed
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    stock = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        url = sys.argv[3] if len(sys.argv) > 3 else f"sqlite:///{os.path.join(tmp, 'contention.db')}"
+        print(f"потоков: {threads}, остаток: {stock}")
+        print(f"{'схема':<18}{'продано':>10}{'остаток':>10}{'перепродано':>14}{'потеряно списаний':>20}{'время, с':>10}")
+        for name, buy in (("read → write", read_then_write), ("атомарный UPDATE", atomic)):
+            sold, left, elapsed = run(setup(url, stock), buy, threads)
+            lost = sold - (stock - left)  # продажи, не уменьшившие остаток (lost update)
+            print(f"{name:<18}{sold:>10}{left:>10}{max(0, sold - stock):>14}{lost:>20}{elapsed:>10.2f}")
+            if buy is atomic:
+                assert sold == stock and left == 0, "атомарное списание перепродало товар"
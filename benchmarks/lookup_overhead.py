@@ -0,0 +1,84 @@
+# benchmarks/lookup_overhead.py
+"""
+Накладные расходы Python на одну выборку строки: Query API (как было)
+против заранее собранных select() из common/db/queries.py.
+Используется SQLite в памяти, поэтому время почти целиком — Python/ORM, а не БД.
+
+    python benchmarks/lookup_overhead.py [число_вызовов]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from common.db import queries
+from common.db.base import Base
+from common.models import AdminUser, Category, Product, User
+import services.review_service.models.review  # noqa: F401  (связи User/Product)
+import services.review_service.models.recommendation  # noqa: F401
+
+
+def setup_session() -> Session:
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = Session(engine)
+    category = Category(category_name="bench")
+    db.add(category)
+    db.flush()
+    db.add(Product(
+        name="bench", description="bench", price=1.0, status="active", current_inventory=1,
+        category_id=category.category_id, category_name="bench",
+    ))
+    db.add(User(login="bench@example.com", password="x"))
+    db.add(AdminUser(email="admin@example.com", username="admin", password_hash="x"))
+    db.commit()
+    return db
+
+
+CASES = {
+    "product_by_id": (
+        lambda db: db.query(Product).options(joinedload(Product.category)).filter(Product.id == 1).first(),
+        lambda db: queries.get_product(db, 1, with_category=True),
+    ),
+    "category_by_id": (
+        lambda db: db.query(Category).filter(Category.category_id == 1).first(),
+        lambda db: queries.get_category(db, 1),
+    ),
+    "user_by_id": (
+        lambda db: db.query(User).filter(User.id == 1).first(),
+        lambda db: queries.get_user(db, 1),
+    ),
+    "user_by_login": (
+        lambda db: db.query(User).filter(User.login == "bench@example.com").first(),
+        lambda db: queries.get_user_by_login(db, "bench@example.com"),
+    ),
+    "admin_by_email": (
+        lambda db: db.query(AdminUser).filter(AdminUser.email == "admin@example.com").first(),
+        lambda db: queries.get_admin_by_email(db, "admin@example.com"),
+    ),
+}
+
+
+def per_call_us(db: Session, fn, n: int) -> float:
+    for _ in range(100):  # прогрев кэша компиляции
+        fn(db)
+    db.expunge_all()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(db)
+        db.expunge_all()  # как в отдельном запросе: identity map пустая
+    return (time.perf_counter() - start) / n * 1e6
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    db = setup_session()
+    print(f"{'lookup':<16}{'query() мкс':>14}{'cached мкс':>14}{'ускорение':>12}")
+    for name, (old, new) in CASES.items():
+        before, after = per_call_us(db, old, n), per_call_us(db, new, n)
+        print(f"{name:<16}{before:>14.1f}{after:>14.1f}{before / after:>11.2f}x")
@@ -0,0 +1,86 @@
+# benchmarks/sales_rollups.py
+"""
+fetch_sales по сырой таблице sales против дневных агрегатов (services/sales_service/api/rollups.py).
+Время запроса к агрегатам зависит от числа дней × сущностей, а не от числа продаж.
+
+    python benchmarks/sales_rollups.py [число_продаж]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from common.db import category_map
+from common.db.base import Base
+from common.models import Sales
+from common.utils.cache import LocalCache
+import services.review_service.models.review  # noqa: F401  (связи User/Product)
+import services.review_service.models.recommendation  # noqa: F401
+from services.sales_service.api import controller
+from services.sales_service.api.rollups import record_sales_rollups
+
+
+class FoundResponse:
+    status_code = 200
+
+
+# Без product_service и .env: проверка товара не участвует в замере, словарь категорий — в памяти процесса
+controller.get_product_details_by_id = lambda product_id: FoundResponse()
+category_map._cache = LocalCache(maxsize=1)
+
+CASES = {
+    "month": {"group_by": "month"},
+    "category-month": {"group_by": "category-month"},
+    "product_id-date, 1 товар": {"group_by": "product_id-date", "product_id": 7},
+    "user-date, 1 месяц": {"group_by": "user-date", "user_id": 3, "start_date": "2025-03-01", "end_date": "2025-03-31"},
+}
+
+
+def populate(db: Session, n: int, batch: int = 5000):
+    rng = random.Random(1)
+    start = datetime(2025, 1, 1)
+    for offset in range(0, n, batch):
+        rows = []
+        for _ in range(min(batch, n - offset)):
+            quantity = rng.randint(1, 5)
+            rows.append(Sales(
+                product_id=rng.randint(1, 500), category_id=rng.randint(1, 20), user_id=rng.randint(1, 2000),
+                quantity=quantity, total_price=quantity * 10.0,
+                sold_at=start + timedelta(seconds=rng.randint(0, 365 * 86400)),
+            ))
+        db.execute(insert(Sales), [
+            {c: getattr(s, c) for c in ("product_id", "category_id", "user_id", "quantity", "total_price", "sold_at")}
+            for s in rows
+        ])
+        record_sales_rollups(db, rows)
+    db.commit()
+
+
+def timed(db: Session, params: dict, use_rollups: bool, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        controller.fetch_sales(db, use_rollups=use_rollups, **params)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'sales.db')}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db:
+            populate(db, n)
+            print(f"продаж: {n}")
+            print(f"{'group_by':<28}{'sales, мс':>12}{'агрегаты, мс':>15}{'ускорение':>12}")
+            for name, params in CASES.items():
+                raw, rollup = timed(db, params, False), timed(db, params, True)
+                print(f"{name:<28}{raw:>12.1f}{rollup:>15.1f}{raw / rollup:>11.1f}x")
@@ -0,0 +1,72 @@
+# benchmarks/serialize_products.py
+"""
+Сериализация списка из 10k товаров: как было (ProductOut по полям + повторная
+валидация response_model + стандартный JSONResponse) против быстрого пути
+common/utils/fast_json.py (одна валидация из ORM-атрибутов + orjson).
+
+    python benchmarks/serialize_products.py [число_строк]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from common.models.products import Product
+from common.utils.fast_json import FastJSONResponse, dump_models, type_adapter
+from services.product_service.api.schemas import ProductOut
+
+
+def make_rows(n: int) -> list:
+    now = datetime.now(timezone.utc)
+    return [
+        Product(
+            id=i, name=f"Товар {i}", description="Описание товара " * 4, price=i * 1.5,
+            old_price=None, image=f"/img/{i}.jpg", status="active", current_inventory=i % 50,
+            is_hit=i % 7 == 0, is_discount=False, is_new=True, created_at=now, updated_at=now,
+            category_id=i % 20, category_name="Взуття", subcategory=None, product_type=None,
+        )
+        for i in range(n)
+    ]
+
+
+def old_path(rows) -> bytes:
+    items = [
+        ProductOut(
+            id=p.id, name=p.name, description=p.description, price=p.price, old_price=p.old_price,
+            image=p.image, status=p.status, current_inventory=p.current_inventory, is_hit=p.is_hit,
+            is_discount=p.is_discount, is_new=p.is_new, created_at=p.created_at, updated_at=p.updated_at,
+            category_id=p.category_id, category_name=p.category_name, subcategory=p.subcategory,
+            product_type=p.product_type,
+        )
+        for p in rows
+    ]
+    # Что делает FastAPI с response_model: валидация ответа + jsonable_encoder + json.dumps
+    validated = type_adapter(List[ProductOut]).validate_python(items, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_path(rows) -> bytes:
+    return FastJSONResponse(dump_models(ProductOut, rows)).body
+
+
+def best_ms(fn, rows, runs: int = 5) -> float:
+    fn(rows)  # прогрев (построение TypeAdapter)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rows = make_rows(n)
+    before, after = best_ms(old_path, rows), best_ms(fast_path, rows)
+    print(f"{n} строк: было {before:.1f} мс, fast path {after:.1f} мс ({before / after:.1f}x)")
@@ -0,0 +1,55 @@
+# benchmarks/startup_time.py
+"""
+Время импорта и пиковый RSS приложений (холодный старт воркера).
+Каждый модуль импортируется в отдельном процессе, результат — JSON в stdout,
+чтобы его можно было сохранять и сравнивать между релизами:
+
+    python benchmarks/startup_time.py > startup_$(git describe --tags).json
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+MODULES = [
+    "main",
+    "services.product_service.main",
+    "services.review_service.main",
+    "services.sales_service.main",
+    "services.dashboard_service.main",
+]
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+from common.utils.startup_metrics import peak_rss_mb
+import sys
+print(json.dumps({{
+    "import_seconds": round(elapsed, 3),
+    "peak_rss_mb": peak_rss_mb(),
+    "heavy_modules_loaded": [m for m in ("tensorflow", "pandas", "nltk") if m in sys.modules],
+}}))
+"""
+
+
+def measure(module: str, runs: int = 3) -> dict:
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return {"module": module, "error": proc.stderr.strip().splitlines()[-1:]}
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    best = min(samples, key=lambda s: s["import_seconds"])
+    return {"module": module, **best}
+
+
+if __name__ == "__main__":
+    modules = sys.argv[1:] or MODULES
+    print(json.dumps([measure(m) for m in modules], ensure_ascii=False, indent=2))
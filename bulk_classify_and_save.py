@@ -1,4 +1,3 @@
-import pandas as pd
 from sqlalchemy.orm import Session
 from common.models.products import Product
 from datetime import datetime
@@ -32,6 +31,8 @@ CATEGORY_MAP = {
 }
 
 def load_and_classify_bulk(db: Session):
+    import pandas as pd  # тяжёлый импорт — только при реальной загрузке
+
     try:
         df = pd.read_csv(CSV_PATH)
         print("📌 Колонки CSV:", df.columns.tolist())
@@ -1,5 +1,6 @@
 # common/config/settings.py
 from pydantic import Field
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 
@@ -11,6 +12,58 @@ class Settings(BaseSettings):
 
     # База данных
     MAINDB_URL: str = Field(..., alias="MAINDB_URL")
+    DB_ECHO: bool = Field(False, alias="DB_ECHO")
+    # Необязательно: отдельный URL для async-драйвера (по умолчанию выводится из MAINDB_URL)
+    ASYNC_MAINDB_URL: Optional[str] = Field(None, alias="ASYNC_MAINDB_URL")
+
+    # Пул соединений (на один процесс/воркер)
+    DB_POOL_SIZE: int = Field(10, alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(20, alias="DB_MAX_OVERFLOW")
+    DB_POOL_PRE_PING: bool = Field(True, alias="DB_POOL_PRE_PING")
+    DB_POOL_RECYCLE: int = Field(1800, alias="DB_POOL_RECYCLE")  # секунды
+    DB_POOL_TIMEOUT: float = Field(10.0, alias="DB_POOL_TIMEOUT")  # ожидание свободного соединения, секунды
+
+    # SQL-инструментирование: Server-Timing, лог медленных запросов, детектор N+1
+    SQL_INSTRUMENTATION: bool = Field(True, alias="SQL_INSTRUMENTATION")
+    SQL_SLOW_QUERY_MS: int = Field(200, alias="SQL_SLOW_QUERY_MS")
+    SQL_NPLUS1_THRESHOLD: int = Field(10, alias="SQL_NPLUS1_THRESHOLD")
+    # GET /debug/pool раскрывает хост/пользователя/имя БД — только для отладки, по умолчанию выключен (404)
+    DEBUG_ENDPOINTS_ENABLED: bool = Field(False, alias="DEBUG_ENDPOINTS_ENABLED")
+
+    # Реплика для чтения (GET-маршруты). Если не задана — чтение идёт в основную БД
+    REPLICA_DB_URL: Optional[str] = Field(None, alias="REPLICA_DB_URL")
+
+    # Отдельный ограниченный пул для тяжёлой аналитики (не отнимает соединения у checkout)
+    ANALYTICS_POOL_SIZE: int = Field(3, alias="ANALYTICS_POOL_SIZE")
+    ANALYTICS_MAX_OVERFLOW: int = Field(0, alias="ANALYTICS_MAX_OVERFLOW")
+    ANALYTICS_STATEMENT_TIMEOUT_MS: int = Field(30000, alias="ANALYTICS_STATEMENT_TIMEOUT_MS")
+
+    # Подключение при старте: число попыток и базовая задержка экспоненциального backoff
+    DB_CONNECT_RETRIES: int = Field(5, alias="DB_CONNECT_RETRIES")
+    DB_CONNECT_BACKOFF: float = Field(1.0, alias="DB_CONNECT_BACKOFF")
+
+    # Кэш чтения: memory (в процессе, по умолчанию) или redis (общий для воркеров, нужен REDIS_URL)
+    CACHE_BACKEND: str = Field("memory", alias="CACHE_BACKEND")
+    REDIS_URL: Optional[str] = Field(None, alias="REDIS_URL")
+    PRODUCT_CACHE_TTL: int = Field(300, alias="PRODUCT_CACHE_TTL")  # секунды
+    PRODUCT_CACHE_MAXSIZE: int = Field(10000, alias="PRODUCT_CACHE_MAXSIZE")  # ключей (только memory)
+    FACETS_CACHE_TTL: int = Field(30, alias="FACETS_CACHE_TTL")  # секунды; фасеты не инвалидируются, только TTL
+    CATEGORY_MAP_TTL: int = Field(300, alias="CATEGORY_MAP_TTL")  # секунды; сбрасывается и при создании категории
+
+    # Межсервисные HTTP-запросы (common/utils/http_client.py)
+    HTTP_CONNECT_TIMEOUT: float = Field(2.0, alias="HTTP_CONNECT_TIMEOUT")  # секунды
+    HTTP_READ_TIMEOUT: float = Field(5.0, alias="HTTP_READ_TIMEOUT")  # секунды
+    HTTP_RETRIES: int = Field(2, alias="HTTP_RETRIES")  # повторов сверх первой попытки
+    HTTP_POOL_SIZE: int = Field(20, alias="HTTP_POOL_SIZE")  # keep-alive соединений на сервис
+    HTTP_BREAKER_THRESHOLD: int = Field(5, alias="HTTP_BREAKER_THRESHOLD")  # ошибок подряд до размыкания
+    HTTP_BREAKER_RESET_TIMEOUT: float = Field(30.0, alias="HTTP_BREAKER_RESET_TIMEOUT")  # секунды
+
+    # Журнал остатков: движения старше N дней сворачиваются в снимки (POST /products/inventory/compact)
+    INVENTORY_LEDGER_RETENTION_DAYS: int = Field(90, alias="INVENTORY_LEDGER_RETENTION_DAYS")
+
+    # Инкрементальная выгрузка каталога: watermark = now() БД минус перекрытие (секунды) —
+    # покрывает лаг реплики и незавершённые транзакции; строки из перекрытия выгружаются повторно
+    EXPORT_WATERMARK_OVERLAP: int = Field(300, alias="EXPORT_WATERMARK_OVERLAP")
 
     # Ссылки на микросервисы
     PRODUCT_SERVICE_URL: str = Field(..., alias="PRODUCT_SERVICE_URL")
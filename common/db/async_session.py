@@ -0,0 +1,66 @@
+# common/db/async_session.py
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from common.config.settings import settings
+from common.db.pool import InstrumentedAsyncQueuePool
+from common.db.registry import engine_options, registry
+from common.db.session import MAINDB_URL
+
+# Синхронный драйвер -> async-драйвер
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def async_database_url(url: str):
+    """Преобразует MAINDB_URL (psycopg2) в URL для async-драйвера и его connect_args."""
+    db_url = make_url(url)
+    backend = db_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Нет async-драйвера для '{backend}'")
+
+    connect_args = {}
+    # asyncpg не понимает libpq-параметр sslmode (Supabase) — передаём его как ssl
+    sslmode = db_url.query.get("sslmode")
+    if backend == "postgresql" and sslmode:
+        db_url = db_url.difference_update_query(["sslmode"])
+        connect_args["ssl"] = sslmode
+    return db_url.set(drivername=ASYNC_DRIVERS[backend]), connect_args
+
+
+def get_async_engine():
+    # Движок создаётся при первом обращении, чтобы сервисы без async-маршрутов не требовали asyncpg
+    global _async_engine
+    if _async_engine is None:
+        if settings.ASYNC_MAINDB_URL:
+            url, connect_args = make_url(settings.ASYNC_MAINDB_URL), {}
+        else:
+            url, connect_args = async_database_url(MAINDB_URL)
+        options = engine_options(url, poolclass=InstrumentedAsyncQueuePool)
+        _async_engine = registry.add_engine(
+            url, create_async_engine(url, connect_args=connect_args, **options), service="common_async"
+        )
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,  # без неявных запросов при доступе к атрибутам после commit
+        )
+    return _AsyncSessionLocal
+
+
+# Генератор async-сессии для Depends в async def маршрутах
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
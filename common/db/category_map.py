@@ -0,0 +1,45 @@
+# common/db/category_map.py
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from common.models.categories import Category
+from common.utils.cache import build_cache
+
+# Словарь category_id -> category_name для обогащения аналитики (sales_service и др.).
+# Читается из общей БД, а не по HTTP из product_service; TTL + явная инвалидация при создании категории.
+# С CACHE_BACKEND=redis словарь и его инвалидация общие для всех сервисов и воркеров
+CATEGORY_MAP_KEY = "category_map"
+
+_category_names = select(Category.category_id, Category.category_name)
+_cache = None
+
+
+def _category_cache():
+    # Ленивое создание: settings читаются при первом обращении, модуль импортируется и без .env
+    global _cache
+    if _cache is None:
+        from common.config.settings import settings
+
+        _cache = build_cache(
+            backend=settings.CACHE_BACKEND,
+            maxsize=1,
+            ttl=settings.CATEGORY_MAP_TTL,
+            redis_url=settings.REDIS_URL,
+            prefix="allures:categories:",
+        )
+    return _cache
+
+
+def get_category_map(db: Session) -> dict:
+    cache = _category_cache()
+    cached = cache.get(CATEGORY_MAP_KEY)
+    if cached is not None:
+        return {int(category_id): name for category_id, name in cached.items()}
+    category_map = dict(db.execute(_category_names).all())
+    # Ключи — строки: в Redis значение хранится как JSON-объект
+    cache.set(CATEGORY_MAP_KEY, {str(category_id): name for category_id, name in category_map.items()})
+    return category_map
+
+
+def invalidate_category_map():
+    _category_cache().delete(CATEGORY_MAP_KEY)
@@ -0,0 +1,20 @@
+# common/db/debug.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from common.config.settings import settings
+from common.db.registry import registry
+
+
+def require_debug_enabled():
+    # Маршрут смонтирован на публичном приложении — без флага его как будто нет
+    if not settings.DEBUG_ENDPOINTS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(dependencies=[Depends(require_debug_enabled)])
+
+
+# Состояние пулов соединений: checked_out / overflow / время ожидания checkout и бюджеты сервисов
+@router.get("/pool")
+def get_pool_status():
+    return registry.status()
@@ -0,0 +1,111 @@
+# common/db/instrumentation.py
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from common.config.settings import settings
+
+logger = logging.getLogger("allures.sql")
+
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|\?|:\w+|\b\d+\b|'(?:[^']|'')*'")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Нормализованная форма запроса: параметры/литералы -> ?, IN-списки схлопнуты."""
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _SPACES_RE.sub(" ", shape).strip()
+
+
+class RequestSQLStats:
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_request_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время старта живёт на контексте выполнения, а не на соединении: упавший запрос
+    # не оставит в пуловом соединении чужую отметку для следующего запроса
+    if context is not None:
+        context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start_time", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning("Медленный запрос %.1f мс: %s", elapsed * 1000, statement_shape(statement)[:500])
+
+
+def install():
+    # Слушатели вешаются на класс Engine — действуют для всех движков процесса (включая async)
+    global _installed
+    if _installed or not settings.SQL_INSTRUMENTATION:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _installed = True
+
+
+class SQLTimingMiddleware:
+    """
+    ASGI-middleware: считает запросы к БД и их суммарное время за HTTP-запрос,
+    отдаёт их в заголовке Server-Timing и предупреждает о повторяющихся
+    запросах одной формы (N+1).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestSQLStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries"'
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            for shape, n in stats.repeated(settings.SQL_NPLUS1_THRESHOLD):
+                logger.warning(
+                    "Возможный N+1: %s %s выполнил %d раз один и тот же запрос: %s",
+                    scope.get("method"), scope.get("path"), n, shape[:500],
+                )
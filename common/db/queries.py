@@ -0,0 +1,40 @@
+# common/db/queries.py
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session, joinedload
+
+from common.models.admin import AdminUser
+from common.models.categories import Category
+from common.models.products import Product
+from common.models.user import User
+
+# Самые частые выборки одной строки. Конструкции select() собираются один раз при
+# импорте, значения передаются через bindparam — на каждый вызов остаётся только
+# поиск готового SQL в кэше компиляции SQLAlchemy, без сборки Query/фильтров заново.
+
+_product_by_id = select(Product).where(Product.id == bindparam("product_id"))
+_product_with_category_by_id = _product_by_id.options(joinedload(Product.category))
+_category_by_id = select(Category).where(Category.category_id == bindparam("category_id"))
+_user_by_id = select(User).where(User.id == bindparam("user_id"))
+_user_by_login = select(User).where(User.login == bindparam("login"))
+_admin_by_email = select(AdminUser).where(AdminUser.email == bindparam("email"))
+
+
+def get_product(db: Session, product_id: int, with_category: bool = False):
+    stmt = _product_with_category_by_id if with_category else _product_by_id
+    return db.execute(stmt, {"product_id": product_id}).scalars().first()
+
+
+def get_category(db: Session, category_id: int):
+    return db.execute(_category_by_id, {"category_id": category_id}).scalars().first()
+
+
+def get_user(db: Session, user_id: int):
+    return db.execute(_user_by_id, {"user_id": user_id}).scalars().first()
+
+
+def get_user_by_login(db: Session, login: str):
+    return db.execute(_user_by_login, {"login": login}).scalars().first()
+
+
+def get_admin_by_email(db: Session, email: str):
+    return db.execute(_admin_by_email, {"email": email}).scalars().first()
@@ -0,0 +1,118 @@
+# common/db/registry.py
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from common.config.settings import settings
+from common.db import instrumentation
+from common.db.pool import InstrumentedQueuePool, pool_status
+
+instrumentation.install()
+
+
+def engine_options(url, poolclass=InstrumentedQueuePool, **overrides) -> dict:
+    # SQLite (локальные тесты) использует свой пул — параметры QueuePool к нему не применимы
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"echo": settings.DB_ECHO}
+    options = {
+        "echo": settings.DB_ECHO,
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    options.update(overrides)
+    return options
+
+
+class EngineRegistry:
+    """
+    Один движок (и один пул) на URL базы данных в пределах процесса.
+    Именованный пул (pool="analytics") позволяет завести отдельный, ограниченный
+    пул к тому же URL. Сервисы регистрируются под своим именем с бюджетом
+    соединений — бюджеты видны в /debug/pool вместе с фактической ёмкостью пула.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engines = {}
+        self._sessionmakers = {}
+        self._budgets = {}
+
+    @staticmethod
+    def _key(url, pool: str = "default") -> tuple:
+        return pool, make_url(url).render_as_string(hide_password=False)
+
+    def get_engine(
+        self,
+        url,
+        service: str = "common",
+        pool_size: int = None,
+        max_overflow: int = None,
+        pool: str = "default",
+        options: dict = None,
+    ):
+        # options применяются только при создании пула (первым зарегистрировавшимся)
+        key = self._key(url, pool)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine = create_engine(url, **engine_options(url, **(options or {})))
+                self._engines[key] = engine
+            budgets = self._budgets.setdefault(key, {})
+            if pool_size is not None or service not in budgets:
+                # Без явного бюджета сервис просто делит общий пул (None в метриках)
+                budgets[service] = None if pool_size is None else {
+                    "pool_size": pool_size,
+                    "max_overflow": max_overflow or 0,
+                }
+        return engine
+
+    def add_engine(self, url, engine, service: str = "common"):
+        # Для движков, созданных вне реестра (например, AsyncEngine) — чтобы они попали в метрики
+        key = self._key(url)
+        with self._lock:
+            self._engines.setdefault(key, engine)
+            self._budgets.setdefault(key, {}).setdefault(service, None)
+        return self._engines[key]
+
+    def get_sessionmaker(self, url, service: str = "common", pool: str = "default", read_only: bool = False):
+        engine = self.get_engine(url, service=service, pool=pool)
+        key = self._key(url, pool) + (read_only,)
+        with self._lock:
+            if key not in self._sessionmakers:
+                bind = engine
+                if read_only and engine.dialect.name == "postgresql":
+                    # READ ONLY-транзакции: запись через read-сессию упадёт даже при фолбэке на основную БД
+                    bind = engine.execution_options(postgresql_readonly=True)
+                self._sessionmakers[key] = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+            return self._sessionmakers[key]
+
+    def status(self) -> dict:
+        with self._lock:
+            items = [(key, self._engines[key], dict(self._budgets.get(key, {}))) for key in self._engines]
+
+        pools = []
+        max_connections = 0
+        for (pool_name, _), engine, budgets in items:
+            sync_engine = getattr(engine, "sync_engine", engine)
+            data = {"pool": pool_name, **pool_status(sync_engine)}
+            capacity = None
+            if isinstance(sync_engine.pool, QueuePool):
+                capacity = data["size"] + data["max_overflow"]
+                max_connections += capacity
+            data["capacity"] = capacity
+            data["budgets"] = budgets
+            data["budget_total"] = sum(b["pool_size"] + b["max_overflow"] for b in budgets.values() if b)
+            data["over_budget"] = capacity is not None and data["budget_total"] > capacity
+            pools.append(data)
+        # Верхняя граница соединений одного воркера; умножить на число воркеров для оценки нагрузки на БД
+        return {"pools": pools, "max_connections_per_worker": max_connections}
+
+
+registry = EngineRegistry()
@@ -0,0 +1,35 @@
+# common/db/schema_version.py
+import os
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+ALEMBIC_INI = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../alembic.ini"))
+
+_head_revision = None
+
+
+def head_revision() -> str:
+    # Последняя ревизия из migrations/versions (читается один раз на процесс)
+    global _head_revision
+    if _head_revision is None:
+        _head_revision = ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+    return _head_revision
+
+
+def current_revision(engine):
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def check_schema_version(engine) -> bool:
+    """
+    Быстрая проверка на старте вместо create_all: сравнивает ревизию в alembic_version
+    с последней миграцией. Схему не меняет — миграции применяются `alembic upgrade head`.
+    """
+    current, head = current_revision(engine), head_revision()
+    if current != head:
+        print(f" Схема БД не актуальна: {current or 'нет ревизии'} != {head}. Выполните: alembic upgrade head")
+        return False
+    return True
@@ -0,0 +1,175 @@
+# common/db/search.py
+import re
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from common.models.products import Product
+
+# Поля, по которым ищем, и их вес в ранжировании
+SEARCH_FIELDS = {
+    "name": 3.0,
+    "category_name": 2.0,
+    "subcategory": 1.5,
+    "product_type": 1.5,
+    "description": 1.0,
+}
+
+# То же выражение, что и в индексе ix_products_search_tsv (миграция 0006) — иначе индекс не используется.
+# Конфигурация 'simple': без стемминга, одинаково для украинского/русского/английского текста
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce(category_name, '') || ' ' || coalesce(subcategory, '') || ' ' || coalesce(product_type, ''))"
+)
+
+TRGM_SIMILARITY_THRESHOLD = 0.3
+MAX_CANDIDATES = 500  # id кандидатов в одном IN (...) при дочитывании с фильтрами
+INDEX_CHECK_INTERVAL = 30.0  # секунды между проверками валидатора каталога
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def trigrams(token: str) -> set:
+    # Как в pg_trgm: слово дополняется двумя пробелами слева и одним справа
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+# === Postgres: tsvector (GIN) + pg_trgm по названию ===
+
+def _pg_rank_and_condition(query: str):
+    document = literal_column(SEARCH_DOCUMENT_SQL)
+    tsquery = func.websearch_to_tsquery(literal_column("'simple'"), query)
+    rank = func.ts_rank(document, tsquery) * 2 + func.similarity(Product.name, query)
+    condition = or_(document.op("@@")(tsquery), Product.name.op("%")(query))
+    return rank, condition
+
+
+def search_condition(db: Session, query: str):
+    """
+    Условие WHERE для поиска товаров. На Postgres — по tsvector/триграммам (индексы),
+    на остальных диалектах — ILIKE по полям поиска (только для локальной разработки).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return _pg_rank_and_condition(query)[1]
+    pattern = f"%{query}%"
+    return or_(*(getattr(Product, field).ilike(pattern) for field in SEARCH_FIELDS))
+
+
+# === In-process инвертированный индекс (SQLite и тесты) ===
+
+class ProductSearchIndex:
+    """
+    Инвертированный индекс по токенам + индекс триграмм токенов для опечаток.
+    Перестраивается, когда меняется валидатор каталога (max(updated_at), count).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.checked_at = None  # time.monotonic() последней проверки валидатора
+        self.postings = defaultdict(dict)  # token -> {product_id: вес}
+        self.token_trigrams = {}  # token -> set(триграмм)
+        self.trigram_tokens = defaultdict(set)  # триграмма -> {token}
+
+    def build(self, rows, version=None):
+        postings, token_trigrams, trigram_tokens = defaultdict(dict), {}, defaultdict(set)
+        for row in rows:
+            for field, weight in SEARCH_FIELDS.items():
+                for token in set(tokenize(getattr(row, field))):
+                    docs = postings[token]
+                    docs[row.id] = docs.get(row.id, 0.0) + weight
+                    if token not in token_trigrams:
+                        token_trigrams[token] = trigrams(token)
+                        for tg in token_trigrams[token]:
+                            trigram_tokens[tg].add(token)
+        with self._lock:
+            self.postings, self.token_trigrams, self.trigram_tokens = postings, token_trigrams, trigram_tokens
+            self.version = version
+
+    def _matching_tokens(self, token: str):
+        # Точное совпадение — вес 1; иначе похожие по триграммам токены с весом = сходство
+        if token in self.postings:
+            yield token, 1.0
+        query_tg = trigrams(token)
+        candidates = set()
+        for tg in query_tg:
+            candidates |= self.trigram_tokens.get(tg, set())
+        for candidate in candidates:
+            if candidate == token:
+                continue
+            score = _similarity(query_tg, self.token_trigrams[candidate])
+            if score >= TRGM_SIMILARITY_THRESHOLD:
+                yield candidate, score
+
+    def search(self, query: str, limit: int = None) -> list:
+        """[(product_id, score)] по убыванию релевантности."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        scores = defaultdict(float)
+        with self._lock:
+            for token in tokens:
+                for matched, similarity in self._matching_tokens(token):
+                    for product_id, weight in self.postings[matched].items():
+                        scores[product_id] += weight * similarity
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def due_for_check(self, interval: float = INDEX_CHECK_INTERVAL) -> bool:
+        # Валидатор проверяется не чаще раза в interval: поиск успевает за каталогом с этой задержкой
+        now = time.monotonic()
+        with self._lock:
+            if self.checked_at is not None and now - self.checked_at < interval:
+                return False
+            self.checked_at = now
+            return True
+
+
+_local_index = ProductSearchIndex()
+
+
+def _local_index_for(db: Session) -> ProductSearchIndex:
+    if not _local_index.due_for_check():
+        return _local_index
+    version = tuple(db.execute(select(func.max(Product.updated_at), func.count(Product.id))).one())
+    if _local_index.version != version:
+        columns = [Product.id] + [getattr(Product, field) for field in SEARCH_FIELDS]
+        _local_index.build(db.execute(select(*columns)).all(), version)
+    return _local_index
+
+
+def search_products(db: Session, query: str, conditions=(), limit: int = 20) -> list:
+    """Товары по релевантности; conditions — дополнительные фильтры каталога."""
+    if db.get_bind().dialect.name == "postgresql":
+        rank, condition = _pg_rank_and_condition(query)
+        stmt = (
+            select(Product)
+            .where(condition, *conditions)
+            .order_by(rank.desc(), Product.id)
+            .limit(limit)
+        )
+        return db.execute(stmt).scalars().all()
+
+    # Фильтры применяются к кандидатам по порядку релевантности, пачками по MAX_CANDIDATES,
+    # пока не наберётся limit: обрезка до фильтров теряла бы подходящие товары
+    ranked = [product_id for product_id, _ in _local_index_for(db).search(query)]
+    products = []
+    for start in range(0, len(ranked), MAX_CANDIDATES):
+        chunk = ranked[start:start + MAX_CANDIDATES]
+        order = {product_id: position for position, product_id in enumerate(chunk)}
+        stmt = select(Product).where(Product.id.in_(chunk), *conditions)
+        products += sorted(db.execute(stmt).scalars().all(), key=lambda p: order[p.id])
+        if len(products) >= limit:
+            break
+    return products[:limit]
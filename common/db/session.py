@@ -1,33 +1,71 @@
 # common/db/session.py
-import os
+import random
 import time
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from dotenv import load_dotenv
 from common.config.settings import settings
+from common.db.registry import registry
 
 load_dotenv()
 
 MAINDB_URL = settings.MAINDB_URL
 
-MAX_RETRIES = 3
-RETRY_DELAY = 5
 
-def create_database_engine_with_retries():
-    for attempt in range(MAX_RETRIES):
+# Все сервисы процесса получают движок через общий реестр: один пул на URL базы.
+# create_engine не открывает соединение — реальная проверка выполняется в wait_for_database()
+engine = registry.get_engine(MAINDB_URL, service="common")
+SessionLocal = registry.get_sessionmaker(MAINDB_URL, service="common")
+
+# Чтение: реплика, если задана, иначе та же основная БД (тот же пул)
+READ_DB_URL = settings.REPLICA_DB_URL or MAINDB_URL
+ReadSessionLocal = registry.get_sessionmaker(READ_DB_URL, service="common_read", read_only=True)
+
+
+def _analytics_options(url) -> dict:
+    options = {
+        "pool_size": settings.ANALYTICS_POOL_SIZE,
+        "max_overflow": settings.ANALYTICS_MAX_OVERFLOW,
+    }
+    if url.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.ANALYTICS_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+# Аналитика: отдельный пул ограниченного размера к реплике (или к основной БД),
+# чтобы долгие агрегации не занимали соединения checkout-пути
+analytics_engine = registry.get_engine(
+    READ_DB_URL,
+    service="analytics",
+    pool="analytics",
+    pool_size=settings.ANALYTICS_POOL_SIZE,
+    max_overflow=settings.ANALYTICS_MAX_OVERFLOW,
+    options=_analytics_options(READ_DB_URL),
+)
+AnalyticsSessionLocal = registry.get_sessionmaker(READ_DB_URL, service="analytics", pool="analytics", read_only=True)
+
+
+def wait_for_database(db_engine=None, retries: int = None, backoff: float = None):
+    """Подключение к БД с экспоненциальным backoff. Вызывается на старте сервиса."""
+    db_engine = db_engine or engine
+    if retries is None:
+        retries = settings.DB_CONNECT_RETRIES
+    # 0 и меньше — одна попытка без повторов: без подключения сервис не стартует
+    retries = max(retries, 1)
+    backoff = settings.DB_CONNECT_BACKOFF if backoff is None else backoff
+
+    for attempt in range(1, retries + 1):
         try:
-            engine = create_engine(MAINDB_URL, echo=True)
-            return engine
-        except Exception as e:
-            print(f"[{attempt + 1}/{MAX_RETRIES}] Ошибка подключения: {e}")
-            if attempt < MAX_RETRIES - 1:
-                print(f"Повтор через {RETRY_DELAY} секунд...")
-                time.sleep(RETRY_DELAY)
-            else:
+            with db_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except OperationalError as e:
+            if attempt == retries:
                 raise
+            delay = backoff * 2 ** (attempt - 1) + random.uniform(0, backoff)
+            print(f"[{attempt}/{retries}] Ошибка подключения: {e.orig}. Повтор через {delay:.1f} с...")
+            time.sleep(delay)
 
-engine = create_database_engine_with_retries()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
@@ -35,3 +73,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Для GET-маршрутов без записи
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Для тяжёлых агрегирующих запросов (статистика продаж, админ-статистика)
+def get_analytics_db():
+    db = AnalyticsSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -2,11 +2,12 @@
 from .user import User
 from .uploads import Upload
 from .sales import Sales
+from .sales_rollup import SalesDaily, SalesDailyCategory, SalesDailyProduct, SalesDailyUser
 from .subscriptions import Subscription, UserSubscription
 from .admin import AdminUser
 from .categories import Category
 from .dashboard_log import DashboardLog
-from .inventory import Inventory
+from .inventory import Inventory, InventoryReservation, InventorySnapshot
 from .payment import Payment
 from .products import Product
 
@@ -1,6 +1,7 @@
 # common/models/categories.py
-from sqlalchemy import Column, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from common.db.base import Base
 
 class Category(Base):
@@ -13,6 +14,9 @@ class Category(Base):
     subcategory = Column(String(100), nullable=True)
     product_type = Column(String(100), nullable=True)
 
+    # Валидатор для ETag/Last-Modified списка категорий
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
     __table_args__ = (
         UniqueConstraint('category_name', 'subcategory', 'product_type', name='uq_category_full'),
     )
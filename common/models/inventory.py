@@ -1,16 +1,65 @@
 # common/db/models/inventory.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import JSON, Boolean, Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from common.db.base import Base
 
 
 class Inventory(Base):
+    """
+    Журнал движения остатков: одна строка — одно изменение (delta), а не абсолютное значение.
+    Остаток на момент T = последний снимок InventorySnapshot до T + сумма delta после него.
+    """
     __tablename__ = "inventory"
+    __table_args__ = (
+        # Остаток на дату и сверка: все движения товара в порядке времени
+        Index("ix_inventory_product_id_created_at", "product_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"))
-    category_id = Column(String, nullable=False)
-    inventory_quantity = Column(Integer, nullable=False)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    category_id = Column(
+        Integer, ForeignKey("categories.category_id", name="fk_inventory_category_id_categories"), nullable=False
+    )
+    delta = Column(Integer, nullable=False)
+    # initial | adjust | bulk | sale | release | reconcile
+    reason = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
-    # Связь с Product
-    # product = relationship("Product", back_populates="inventory", lazy="selectin")
+    # Связь с Product: позволяет добавить движение вместе с новым товаром в одном flush
+    product = relationship("Product")
+
+
+class InventorySnapshot(Base):
+    """
+    Снимок остатка после компактизации журнала: quantity — остаток с учётом всех
+    движений с id <= last_entry_id (сами эти строки из inventory удалены).
+    """
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        Index("ix_inventory_snapshots_product_id_as_of", "product_id", "as_of"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    as_of = Column(DateTime(timezone=True), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    last_entry_id = Column(Integer, nullable=False)
+
+
+class InventoryReservation(Base):
+    """
+    Списание по заказу (POST /products/inventory/decrement с order_key): повтор с тем же ключом
+    не списывает второй раз, возврат по ключу — не больше одного раза и ровно то, что списано.
+    released без списания — метка: возврат пришёл раньше (таймаут), опоздавшее списание отклоняется.
+    """
+    __tablename__ = "inventory_reservations"
+    __table_args__ = (
+        # Очистка старых ключей при компактизации журнала
+        Index("ix_inventory_reservations_created_at", "created_at"),
+    )
+
+    order_key = Column(String(64), primary_key=True)
+    items = Column(JSON, nullable=False)  # [[product_id, quantity], ...]
+    released = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
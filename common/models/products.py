@@ -1,12 +1,24 @@
 # common/models/products.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from common.db.base import Base
 
 class Product(Base):
     __tablename__ = "products"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Keyset-пагинация каталога: сортировки (created_at, id), (price, id) и фильтр по категории
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_id", "price", "id"),
+        Index("ix_products_category_id_created_at", "category_id", "created_at"),
+        # Инкрементальная выгрузка каталога (GET /products/export?updated_since=)
+        Index("ix_products_updated_at", "updated_at"),
+        # Натуральный ключ товара: upsert в POST /products/bulk (ON CONFLICT)
+        Index("uq_products_name_category_id", "name", "category_id", unique=True),
+        {'extend_existing': True},
+    )
+    # id/created_at/updated_at возвращаются в том же INSERT/UPDATE (RETURNING), без refresh()
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -1,5 +1,5 @@
 # common/models/sales.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from common.db.base import Base
 import datetime
@@ -20,3 +20,9 @@ class Sales(Base):
     user = relationship("User", back_populates="sales")
     category = relationship("Category", backref="sales")
 
+    __table_args__ = (
+        Index("ix_sales_sold_at", "sold_at"),
+        Index("ix_sales_user_id_sold_at", "user_id", "sold_at"),
+        Index("ix_sales_product_id_sold_at", "product_id", "sold_at"),
+    )
+
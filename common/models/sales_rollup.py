@@ -0,0 +1,47 @@
+# common/models/sales_rollup.py
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from common.db.base import Base
+
+# Дневные агрегаты продаж. Обновляются в той же транзакции, что и INSERT в sales
+# (services/sales_service/api/rollups.py); ключ начинается с сущности — фильтр по ней + диапазон дней
+
+
+class SalesDaily(Base):
+    # Итоги дня без сущности в ключе: сюда попадают и старые продажи с пустыми category_id/user_id
+    __tablename__ = "sales_daily"
+
+    day = Column(Date, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    last_sold_at = Column(DateTime, nullable=False)
+
+
+class SalesDailyProduct(Base):
+    __tablename__ = "sales_daily_product"
+
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    category_id = Column(Integer, ForeignKey("categories.category_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    last_sold_at = Column(DateTime, nullable=False)
+
+
+class SalesDailyCategory(Base):
+    __tablename__ = "sales_daily_category"
+
+    category_id = Column(Integer, ForeignKey("categories.category_id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    last_sold_at = Column(DateTime, nullable=False)
+
+
+class SalesDailyUser(Base):
+    __tablename__ = "sales_daily_user"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    units = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    last_sold_at = Column(DateTime, nullable=False)
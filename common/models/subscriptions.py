@@ -1,6 +1,7 @@
 # common/models/subscription.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from datetime import datetime
 from common.db.base import Base
 
@@ -19,6 +20,9 @@ class Subscription(Base):
     stats_access = Column(Boolean, default=False)
     description = Column(String)
 
+    # Валидатор для ETag/Last-Modified каталога подписок
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
     __table_args__ = (
         UniqueConstraint('code', 'language', name='uq_code_language'),
     )
@@ -41,3 +45,7 @@ class UserSubscription(Base):
     subscription = relationship("Subscription", back_populates="user_subscriptions")
     payment = relationship("Payment", backref="user_subscription")
     user = relationship("User", back_populates="subscriptions")
+
+    __table_args__ = (
+        Index("ix_user_subscriptions_user_id_is_active", "user_id", "is_active"),
+    )
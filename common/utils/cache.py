@@ -0,0 +1,157 @@
+# common/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "errors": self.errors,
+            }
+
+
+class LocalCache:
+    """In-process LRU с TTL: не больше maxsize ключей, самый давно использованный вытесняется."""
+
+    backend = "memory"
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.stats.incr("hits")
+                    return value
+                del self._data[key]
+                self.stats.incr("expirations")
+        self.stats.incr("misses")
+        return None
+
+    def set(self, key: str, value, ttl: float = None):
+        with self._lock:
+            self._data[key] = (self._clock() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def delete(self, *keys: str):
+        with self._lock:
+            removed = sum(self._data.pop(key, None) is not None for key in keys)
+        self.stats.incr("invalidations", len(keys))
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        return {"backend": self.backend, "size": size, "maxsize": self.maxsize, "ttl": self.ttl, **self.stats.snapshot()}
+
+
+class RedisCache:
+    """
+    Кэш в Redis (общий для всех воркеров). Клиент — любой объект с get/set(ex=)/delete
+    по протоколу redis-py. Значения хранятся как JSON (orjson), TTL и вытеснение — на стороне Redis.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, ttl: float = 300, prefix: str = "allures:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.stats = CacheStats()
+
+    # Недоступный Redis не должен ронять запросы: ошибка = промах, чтение идёт в БД
+    def get(self, key: str):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            self.stats.incr("errors")
+            print(f"⚠️ Redis недоступен (get): {e}")
+            raw = None
+        if raw is None:
+            self.stats.incr("misses")
+            return None
+        self.stats.incr("hits")
+        return orjson.loads(raw)
+
+    def set(self, key: str, value, ttl: float = None):
+        try:
+            self.client.set(self.prefix + key, orjson.dumps(value), ex=int(ttl or self.ttl))
+        except Exception as e:
+            self.stats.incr("errors")
+            print(f"⚠️ Redis недоступен (set): {e}")
+
+    def delete(self, *keys: str):
+        self.stats.incr("invalidations", len(keys))
+        if not keys:
+            return 0
+        try:
+            return self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            self.stats.incr("errors")
+            print(f"⚠️ Redis недоступен (delete): {e}")
+            return 0
+
+    def clear(self):
+        # Только ключи своего префикса — Redis может быть общим с другими сервисами
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def info(self) -> dict:
+        data = {"backend": self.backend, "ttl": self.ttl, "prefix": self.prefix, **self.stats.snapshot()}
+        try:
+            # Вытеснения по maxmemory считает сам Redis
+            data["evictions"] = int(self.client.info("stats").get("evicted_keys", 0))
+        except Exception:
+            pass
+        return data
+
+
+def build_cache(backend: str = "memory", maxsize: int = 10000, ttl: float = 300, redis_url: str = None, prefix: str = "allures:"):
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("Для CACHE_BACKEND=redis нужен REDIS_URL")
+        import redis  # необязательная зависимость — нужна только для этого бэкенда
+
+        return RedisCache(redis.Redis.from_url(redis_url), ttl=ttl, prefix=prefix)
+    return LocalCache(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,44 @@
+# common/utils/fast_json.py
+from functools import lru_cache
+from typing import Any, List
+
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+class FastJSONResponse(Response):
+    """
+    JSON-ответ через orjson (datetime/UUID/dataclass кодируются нативно).
+    Возврат Response из роута отключает повторную валидацию по response_model —
+    response_model остаётся в декораторе только для OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    # Построение TypeAdapter (схема валидатора) дорогое — один экземпляр на тип
+    return TypeAdapter(tp)
+
+
+def dump_models(schema, rows) -> list:
+    """
+    ORM-объекты или строки результата (Row) -> список dict за одну валидацию,
+    без ручной сборки схемы по полям.
+    """
+    adapter = type_adapter(List[schema])
+    return adapter.dump_python(adapter.validate_python(rows, from_attributes=True))
+
+
+def dump_model(schema, obj) -> dict:
+    adapter = type_adapter(schema)
+    return adapter.dump_python(adapter.validate_python(obj, from_attributes=True))
+
+
+def fast_json_list(schema, rows, **kwargs) -> FastJSONResponse:
+    return FastJSONResponse(dump_models(schema, rows), **kwargs)
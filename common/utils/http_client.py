@@ -0,0 +1,294 @@
+# common/utils/http_client.py
+import asyncio
+import random
+import threading
+import time
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+# Повтор безопасен только для идемпотентных методов; POST повторяется, лишь если запрос не ушёл (ошибка соединения)
+# или вызывающий передал idempotent=True (сервис узнаёт повтор по ключу)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+
+
+class ServiceUnavailableError(Exception):
+    """Сервис недоступен: цепь разомкнута, таймаут или ошибка соединения после всех повторов."""
+
+    def __init__(self, service: str, message: str):
+        self.service = service
+        super().__init__(f"{service}: {message}")
+
+
+class CircuitBreaker:
+    """
+    closed → (failure_threshold ошибок подряд) → open: запросы сразу отклоняются;
+    через reset_timeout — half_open: пропускается один пробный запрос, успех замыкает цепь.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+class _Policy:
+    """Общая логика повторов и circuit breaker для sync- и async-клиента."""
+
+    def __init__(self, service: str, retries: int, backoff: float, max_backoff: float, breaker: CircuitBreaker):
+        self.service = service
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker
+
+    def check_circuit(self):
+        if not self.breaker.allow():
+            raise ServiceUnavailableError(self.service, "circuit open")
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter: клиенты, упавшие одновременно, не повторяют синхронно
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def should_retry_status(self, idempotent: bool, status: int, attempt: int) -> bool:
+        return attempt < self.retries and status in RETRY_STATUSES and idempotent
+
+    def should_retry_error(self, idempotent: bool, connect_failed: bool, attempt: int) -> bool:
+        return attempt < self.retries and (connect_failed or idempotent)
+
+    def record(self, status: Optional[int]):
+        # 4xx — сервис отвечает, это не повод размыкать цепь
+        if status is not None and status < 500:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+
+def _connect_failed(e: requests.RequestException) -> bool:
+    # Соединение не установлено — запрос точно не дошёл до сервиса
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class ServiceClient:
+    """Синхронный клиент сервиса: requests.Session с пулом keep-alive соединений, таймаутами и повторами."""
+
+    def __init__(
+        self,
+        service: str,
+        base_url: str,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        pool_size: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        connect_timeout, read_timeout, retries, pool_size, breaker = _with_defaults(
+            connect_timeout, read_timeout, retries, pool_size, breaker
+        )
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.policy = _Policy(service, retries, backoff, max_backoff, breaker)
+        self.session = requests.Session()
+        # max_retries=0: повторами управляет policy, а не urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, path: str, timeout=None, idempotent: bool = False, **kwargs) -> requests.Response:
+        """idempotent=True — POST, который сервис применяет не более одного раза (ключ идемпотентности)."""
+        method = method.upper()
+        idempotent = idempotent or method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.policy.check_circuit()
+            try:
+                response = self.session.request(method, self.base_url + path, timeout=timeout or self.timeout, **kwargs)
+            except requests.RequestException as e:
+                self.policy.record(None)
+                if not self.policy.should_retry_error(idempotent, _connect_failed(e), attempt):
+                    raise ServiceUnavailableError(self.policy.service, str(e)) from e
+            else:
+                self.policy.record(response.status_code)
+                if not self.policy.should_retry_status(idempotent, response.status_code, attempt):
+                    return response
+            time.sleep(self.policy.delay(attempt))
+            attempt += 1
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PUT", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncServiceClient:
+    """Асинхронный вариант на httpx.AsyncClient — не блокирует event loop, пока сервис отвечает медленно."""
+
+    def __init__(
+        self,
+        service: str,
+        base_url: str,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        pool_size: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        connect_timeout, read_timeout, retries, pool_size, breaker = _with_defaults(
+            connect_timeout, read_timeout, retries, pool_size, breaker
+        )
+        self.policy = _Policy(service, retries, backoff, max_backoff, breaker)
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def request(
+        self, method: str, path: str, stream: bool = False, idempotent: bool = False, **kwargs
+    ) -> httpx.Response:
+        method = method.upper()
+        idempotent = idempotent or method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.policy.check_circuit()
+            try:
+                response = await self.client.send(self.client.build_request(method, path, **kwargs), stream=stream)
+            except httpx.TransportError as e:
+                self.policy.record(None)
+                connect_failed = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if not self.policy.should_retry_error(idempotent, connect_failed, attempt):
+                    raise ServiceUnavailableError(self.policy.service, repr(e)) from e
+            else:
+                self.policy.record(response.status_code)
+                if not self.policy.should_retry_status(idempotent, response.status_code, attempt):
+                    return response
+                if stream:
+                    await response.aclose()
+            await asyncio.sleep(self.policy.delay(attempt))
+            attempt += 1
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def stream(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Ответ с непрочитанным телом (response.aiter_bytes()): повторы и breaker — только до начала тела.
+        Закрывает вызывающий: await response.aclose(), иначе соединение не вернётся в пул.
+        """
+        return await self.request(method, path, stream=True, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def _with_defaults(connect_timeout, read_timeout, retries, pool_size, breaker):
+    if None not in (connect_timeout, read_timeout, retries, pool_size, breaker):
+        return connect_timeout, read_timeout, retries, pool_size, breaker
+    # settings читаются при создании клиента, а не при импорте — модуль импортируется и без .env (тесты)
+    from common.config.settings import settings
+
+    return (
+        settings.HTTP_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+        settings.HTTP_READ_TIMEOUT if read_timeout is None else read_timeout,
+        settings.HTTP_RETRIES if retries is None else retries,
+        settings.HTTP_POOL_SIZE if pool_size is None else pool_size,
+        breaker or CircuitBreaker(settings.HTTP_BREAKER_THRESHOLD, settings.HTTP_BREAKER_RESET_TIMEOUT),
+    )
+
+
+# === Общие клиенты процесса: один пул соединений и один breaker на сервис ===
+
+_clients = {}
+# httpx.AsyncClient привязан к event loop, в котором открыты соединения — клиенты хранятся по самому loop.
+# Слабая ссылка: собранный loop уносит свои клиенты, а новый loop с тем же id() чужих не получит
+_async_clients = weakref.WeakKeyDictionary()  # loop -> {(service, base_url): AsyncServiceClient}
+_clients_lock = threading.Lock()
+
+
+def service_client(service: str, base_url: str) -> ServiceClient:
+    with _clients_lock:
+        key = ("sync", service, base_url)
+        if key not in _clients:
+            _clients[key] = ServiceClient(service, base_url)
+        return _clients[key]
+
+
+def async_service_client(service: str, base_url: str) -> AsyncServiceClient:
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        # Открытые соединения ссылаются на свой loop и не дают ему собраться — закрытые loop убираем явно
+        for stale in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[stale]
+        clients = _async_clients.setdefault(loop, {})
+        if (service, base_url) not in clients:
+            clients[(service, base_url)] = AsyncServiceClient(service, base_url)
+        return clients[(service, base_url)]
+
+
+async def aclose_async_clients():
+    """Закрывает клиенты текущего event loop — вызывается при остановке приложения."""
+    with _clients_lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
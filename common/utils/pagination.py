@@ -0,0 +1,45 @@
+# common/utils/pagination.py
+import base64
+import json
+
+from sqlalchemy import tuple_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _json_default(value):
+    # datetime/date -> ISO-строка, остальное (Decimal и т.п.) -> str
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def encode_cursor(payload: dict) -> str:
+    # Курсор непрозрачен для клиента: base64url от компактного JSON без паддинга
+    raw = json.dumps(payload, separators=(",", ":"), default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Некорректный курсор") from e
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Некорректный курсор")
+    return payload
+
+
+def keyset_condition(columns, values, descending: bool = False):
+    """
+    Условие «строго после последней строки страницы» для сортировки по columns.
+    Сравнение кортежей (a, b) > (x, y) использует составной индекс по тем же колонкам,
+    поэтому стоимость страницы не зависит от её номера (в отличие от OFFSET).
+    """
+    left, right = tuple_(*columns), tuple_(*values)
+    return left < right if descending else left > right
+
+
+def keyset_order(columns, descending: bool = False):
+    return [c.desc() if descending else c.asc() for c in columns]
@@ -0,0 +1,22 @@
+# common/utils/startup_metrics.py
+import resource
+import sys
+import time
+
+# Момент импорта модуля — чем раньше он импортирован в main.py, тем точнее замер
+_started_at = time.perf_counter()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss: килобайты в Linux, байты в macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def startup_report(service: str) -> dict:
+    return {
+        "service": service,
+        "startup_seconds": round(time.perf_counter() - _started_at, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "heavy_modules_loaded": [m for m in ("tensorflow", "pandas", "nltk") if m in sys.modules],
+    }
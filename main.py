@@ -3,14 +3,17 @@ import sys
 import os
 # Добавление корневого пути (для импорта модулей из /services и /common)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-from tensorflow.keras.models import load_model
 
+from common.utils.startup_metrics import startup_report  # первым — отсчёт времени старта
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 #import common.utils.env_loader
 
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
+from common.utils.http_client import aclose_async_clients
 from sqlalchemy import text
 from common.db.base import Base
 from common.db.session import engine
@@ -32,12 +35,12 @@ from services.dashboard_service.routers.dashboard import router as dashboard_rou
 from services.admin_service.routers.admin_router import router as admin_router
 from services.subscription_service.routers.subscription_routers import router as subscription_router
 from services.review_service.models.review import Review
-from bulk_classify_and_save import load_and_classify_bulk
 
 # Загрузка переменных окружения
 load_dotenv()
 
 app = FastAPI(title="Allures Backend")
+app.add_middleware(SQLTimingMiddleware)
 
 # Подключение всех роутеров
 app.include_router(product_router, prefix="/products", tags=["Products"])
@@ -50,6 +53,7 @@ app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 # app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
 app.include_router(admin_router, prefix="/admin", tags=["Admin"])
 app.include_router(subscription_router, prefix="/subscription", tags=["Subscription"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # Разрешения CORS
 app.add_middleware(
@@ -68,6 +72,8 @@ app.add_middleware(
 # db_url = os.getenv("MAINDB_URL")
 # print(" MAINDB_URL:", db_url)
 
+# TensorFlow импортируется только вместе с моделью, а не при каждом старте воркера
+# from tensorflow.keras.models import load_model
 # MODEL_PATH = "common/models/image_classifier.h5"
 # model = load_model(MODEL_PATH)
 #
@@ -77,30 +83,33 @@ app.add_middleware(
 # Проверка подключения к БД
 @app.on_event("startup")
 def startup_event():
-    from sqlalchemy import text
-    from common.db.base import Base
     from common.db.session import engine
+    from common.db.schema_version import check_schema_version
 
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Allures Backend)")
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Allures Backend)")
 
-        # Создание таблиц
-        Base.metadata.create_all(bind=engine)
-        print(" Таблицы успешно созданы (если не существовали)")
+    # Схема создаётся миграциями (alembic upgrade head), здесь — только проверка версии
+    if check_schema_version(engine):
+        print(" Схема БД актуальна")
+    from services.review_service.sentiment.analyzer import init_analyzer
+    init_analyzer()
 
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    print(" Старт:", startup_report("allures-backend"))
+
+# Пулы межсервисных async-клиентов (dashboard) закрываются вместе с приложением
+@app.on_event("shutdown")
+async def shutdown_event():
+    await aclose_async_clients()
 
 @app.get("/")
 def root():
     return {"message": "Allures Backend"}
 
 def main():
+    # pandas нужен только для разовой загрузки каталога — не импортируем его в веб-воркере
+    from bulk_classify_and_save import load_and_classify_bulk
+
     db: Session = SessionLocal()
     load_and_classify_bulk(db)
 
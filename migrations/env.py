@@ -0,0 +1,45 @@
+# migrations/env.py
+from alembic import context
+
+from common.config.settings import settings
+from common.db.base import Base
+from common.db.registry import registry
+
+# Все модели должны быть импортированы, чтобы попасть в Base.metadata (autogenerate)
+import common.models  # noqa: F401
+from services.review_service.models.review import Review  # noqa: F401
+from services.review_service.models.recommendation import Recommendation  # noqa: F401
+from services.discount_service.models.discount import Discount  # noqa: F401
+from services.profile_service.models.company import Company  # noqa: F401
+from services.profile_service.models.schedule import Schedule  # noqa: F401
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    context.configure(
+        url=settings.MAINDB_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = registry.get_engine(settings.MAINDB_URL, service="migrations")
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
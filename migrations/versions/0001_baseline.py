@@ -0,0 +1,32 @@
+"""baseline: схема, которую раньше создавал Base.metadata.create_all при старте
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+from common.db.base import Base
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Таблицы, существовавшие до перехода на миграции. На уже развёрнутой БД
+# create_all(checkfirst) ничего не делает, на пустой — создаёт их по текущим моделям.
+BASELINE_TABLES = [
+    "users", "categories", "products", "inventory", "sales", "uploads",
+    "payments", "subscriptions", "user_subscriptions", "admin_user",
+    "dashboard_logs", "reviews", "recommendations", "discounts",
+    "companies", "schedules",
+]
+
+
+def upgrade():
+    tables = [Base.metadata.tables[name] for name in BASELINE_TABLES]
+    Base.metadata.create_all(bind=op.get_bind(), tables=tables, checkfirst=True)
+
+
+def downgrade():
+    pass
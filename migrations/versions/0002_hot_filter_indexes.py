@@ -0,0 +1,37 @@
+"""индексы по горячим фильтрам (sales, reviews, recommendations, subscriptions, discounts, inventory)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_sales_sold_at", "sales", ["sold_at"]),
+    ("ix_sales_user_id_sold_at", "sales", ["user_id", "sold_at"]),
+    ("ix_sales_product_id_sold_at", "sales", ["product_id", "sold_at"]),
+    ("ix_reviews_product_id_created_at", "reviews", ["product_id", "created_at"]),
+    ("ix_reviews_user_id", "reviews", ["user_id"]),
+    ("ix_recommendations_user_id_recommended_at", "recommendations", ["user_id", "recommended_at"]),
+    ("ix_user_subscriptions_user_id_is_active", "user_subscriptions", ["user_id", "is_active"]),
+    ("ix_discounts_valid_until", "discounts", ["valid_until"]),
+    ("ix_inventory_product_id", "inventory", ["product_id"]),
+]
+
+
+def upgrade():
+    # CONCURRENTLY на Postgres не блокирует запись в таблицы, но требует выполнения вне транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,25 @@
+"""индекс products.updated_at для инкрементальной выгрузки каталога
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_updated_at", "products", ["updated_at"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_products_updated_at", table_name="products", if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,37 @@
+"""updated_at у categories и subscriptions (валидаторы ETag/Last-Modified)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+TABLES = ["categories", "subscriptions"]
+
+
+def _has_updated_at(table) -> bool:
+    # На пустой БД 0001 создаёт таблицы по текущим моделям — колонка уже может быть
+    return "updated_at" in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # batch: SQLite не умеет ADD COLUMN с DEFAULT now() — таблица пересоздаётся; на Postgres это обычный ALTER
+    for table in TABLES:
+        if _has_updated_at(table):
+            continue
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        if not _has_updated_at(table):
+            continue
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("updated_at")
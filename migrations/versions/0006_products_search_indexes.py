@@ -0,0 +1,42 @@
+"""полнотекстовый поиск товаров: GIN по tsvector и pg_trgm по названию (только Postgres)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Выражение должно совпадать с common/db/search.py::SEARCH_DOCUMENT_SQL
+SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce(category_name, '') || ' ' || coalesce(subcategory, '') || ' ' || coalesce(product_type, ''))"
+)
+
+
+def upgrade():
+    # SQLite (локально/тесты) ищет через in-process индекс — здесь ничего не нужно
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_tsv "
+            f"ON products USING GIN (({SEARCH_DOCUMENT_SQL}))"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_name_trgm "
+            "ON products USING GIN (name gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_name_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_search_tsv")
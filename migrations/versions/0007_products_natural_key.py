@@ -0,0 +1,44 @@
+"""уникальный натуральный ключ товара (name, category_id) для bulk upsert
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+DUPLICATES_SQL = """
+SELECT name, category_id, count(*) AS n
+FROM products
+GROUP BY name, category_id
+HAVING count(*) > 1
+"""
+
+
+def upgrade():
+    # Уникальный индекс не создастся на данных с дублями — сообщаем, какие строки мешают
+    duplicates = op.get_bind().execute(sa.text(DUPLICATES_SQL)).fetchall()
+    if duplicates:
+        sample = ", ".join(f"{name!r}/{category_id} x{n}" for name, category_id, n in duplicates[:10])
+        raise RuntimeError(
+            f"В products есть {len(duplicates)} дублей по (name, category_id): {sample}. "
+            "Объедините или переименуйте их и повторите alembic upgrade head."
+        )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_products_name_category_id", "products", ["name", "category_id"],
+            unique=True, if_not_exists=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_products_name_category_id", table_name="products",
+            if_exists=True, postgresql_concurrently=True,
+        )
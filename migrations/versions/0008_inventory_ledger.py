@@ -0,0 +1,152 @@
+"""журнал остатков: inventory хранит движения (delta), снимки в inventory_snapshots
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table) -> set:
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _has_table(table) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade():
+    # На пустой БД 0001 уже создал inventory по текущей модели — переносить нечего
+    legacy_columns = _columns("inventory")
+    if "inventory_quantity" in legacy_columns:
+        with op.batch_alter_table("inventory") as batch:
+            batch.add_column(sa.Column("delta", sa.Integer(), nullable=True))
+            batch.add_column(sa.Column("reason", sa.String(20), nullable=True))
+            if "created_at" not in legacy_columns:
+                batch.add_column(sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()))
+
+        # Абсолютные значения → разница с предыдущей строкой товара (LAG); первая строка — initial
+        op.execute("""
+            UPDATE inventory
+            SET delta = d.delta, reason = d.reason
+            FROM (
+                SELECT id,
+                       inventory_quantity - COALESCE(LAG(inventory_quantity) OVER w, 0) AS delta,
+                       CASE WHEN LAG(id) OVER w IS NULL THEN 'initial' ELSE 'adjust' END AS reason
+                FROM inventory
+                WINDOW w AS (PARTITION BY product_id ORDER BY id)
+            ) AS d
+            WHERE inventory.id = d.id
+        """)
+        if "created_at" not in legacy_columns:
+            # Своего времени у старых строк нет — ближайшее известное из products, а не время миграции,
+            # иначе stock_as_of до миграции не видит ни одного движения: initial — создание товара,
+            # остальные — его последнее изменение (к этому моменту остаток уже равен current_inventory)
+            op.execute("""
+                UPDATE inventory
+                SET created_at = COALESCE(
+                    CASE WHEN inventory.reason = 'initial' THEN p.created_at ELSE p.updated_at END,
+                    inventory.created_at
+                )
+                FROM products p
+                WHERE p.id = inventory.product_id
+            """)
+        op.execute("DELETE FROM inventory WHERE product_id IS NULL OR delta = 0")
+
+        with op.batch_alter_table("inventory") as batch:
+            batch.drop_column("inventory_quantity")
+            batch.alter_column("delta", existing_type=sa.Integer(), nullable=False)
+            batch.alter_column("reason", existing_type=sa.String(20), nullable=False)
+            batch.alter_column("created_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+            batch.alter_column("product_id", existing_type=sa.Integer(), nullable=False)
+            batch.alter_column(
+                "category_id", existing_type=sa.String(), type_=sa.Integer(), nullable=False,
+                postgresql_using="category_id::integer",
+            )
+            batch.create_foreign_key(
+                "fk_inventory_category_id_categories", "categories", ["category_id"], ["category_id"],
+            )
+
+        # Журнал сходится с products.current_inventory с первого дня: списания через
+        # /products/inventory/decrement и товары без строк в inventory получают движение reconcile
+        # на момент последнего изменения товара — тогда остаток и стал равен current_inventory
+        op.execute("""
+            INSERT INTO inventory (product_id, category_id, delta, reason, created_at)
+            SELECT p.id, p.category_id, p.current_inventory - COALESCE(m.moved, 0), 'reconcile',
+                   COALESCE(p.updated_at, CURRENT_TIMESTAMP)
+            FROM products p
+            LEFT JOIN (SELECT product_id, SUM(delta) AS moved FROM inventory GROUP BY product_id) m
+                ON m.product_id = p.id
+            WHERE p.current_inventory <> COALESCE(m.moved, 0)
+        """)
+
+    if not _has_table("inventory_snapshots"):
+        op.create_table(
+            "inventory_snapshots",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+            sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("quantity", sa.Integer(), nullable=False),
+            sa.Column("last_entry_id", sa.Integer(), nullable=False),
+        )
+    op.create_index(
+        "ix_inventory_snapshots_product_id_as_of", "inventory_snapshots", ["product_id", "as_of"],
+        if_not_exists=True,
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_inventory_product_id_created_at", "inventory", ["product_id", "created_at"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        # Покрывается составным индексом выше
+        op.drop_index("ix_inventory_product_id", table_name="inventory", if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_inventory_product_id", "inventory", ["product_id"],
+            if_not_exists=True, postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_inventory_product_id_created_at", table_name="inventory",
+            if_exists=True, postgresql_concurrently=True,
+        )
+
+    with op.batch_alter_table("inventory") as batch:
+        batch.add_column(sa.Column("inventory_quantity", sa.Integer(), nullable=True))
+
+    # Обратно к абсолютным значениям: снимок + нарастающий итог движений
+    op.execute("""
+        UPDATE inventory
+        SET inventory_quantity = d.quantity
+        FROM (
+            SELECT i.id,
+                   COALESCE(s.quantity, 0) + SUM(i.delta) OVER (PARTITION BY i.product_id ORDER BY i.id) AS quantity
+            FROM inventory i
+            LEFT JOIN (
+                SELECT product_id, quantity FROM inventory_snapshots
+                WHERE id IN (SELECT MAX(id) FROM inventory_snapshots GROUP BY product_id)
+            ) s ON s.product_id = i.product_id
+        ) AS d
+        WHERE inventory.id = d.id
+    """)
+    op.drop_table("inventory_snapshots")
+
+    with op.batch_alter_table("inventory") as batch:
+        batch.drop_constraint("fk_inventory_category_id_categories", type_="foreignkey")
+        batch.alter_column(
+            "category_id", existing_type=sa.Integer(), type_=sa.String(), nullable=False,
+            postgresql_using="category_id::varchar",
+        )
+        batch.alter_column("inventory_quantity", existing_type=sa.Integer(), nullable=False)
+        batch.drop_column("created_at")
+        batch.drop_column("reason")
+        batch.drop_column("delta")
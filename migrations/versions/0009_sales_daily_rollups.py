@@ -0,0 +1,50 @@
+"""дневные агрегаты продаж по товару, категории и пользователю + заполнение из sales
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# таблица → (колонки-сущности, FK)
+ROLLUPS = {
+    "sales_daily_product": [("product_id", "products.id"), ("category_id", "categories.category_id")],
+    "sales_daily_category": [("category_id", "categories.category_id")],
+    "sales_daily_user": [("user_id", "users.id")],
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, entities in ROLLUPS.items():
+        if inspector.has_table(table):
+            continue
+        op.create_table(
+            table,
+            *(sa.Column(name, sa.Integer(), sa.ForeignKey(target), primary_key=True) for name, target in entities),
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("units", sa.Integer(), nullable=False),
+            sa.Column("revenue", sa.Float(), nullable=False),
+            sa.Column("last_sold_at", sa.DateTime(), nullable=False),
+        )
+
+        # Один проход GROUP BY по истории; дальше агрегаты обновляются вместе с каждой продажей
+        keys = ", ".join(name for name, _ in entities)
+        op.execute(f"""
+            INSERT INTO {table} ({keys}, day, units, revenue, last_sold_at)
+            SELECT {keys}, DATE(sold_at), SUM(quantity), SUM(total_price), MAX(sold_at)
+            FROM sales
+            WHERE sold_at IS NOT NULL AND {" AND ".join(f"{name} IS NOT NULL" for name, _ in entities)}
+            GROUP BY {keys}, DATE(sold_at)
+        """)
+
+
+def downgrade():
+    for table in reversed(list(ROLLUPS)):
+        op.drop_table(table, if_exists=True)
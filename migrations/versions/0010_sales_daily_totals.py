@@ -0,0 +1,39 @@
+"""дневные итоги продаж без сущности (sales_daily) + заполнение из sales
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("sales_daily"):
+        return
+    op.create_table(
+        "sales_daily",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("last_sold_at", sa.DateTime(), nullable=False),
+    )
+
+    # В отличие от 0009 строки с пустыми category_id/user_id не отбрасываются:
+    # группировки day/month/year без фильтров сходятся с запросом к sales
+    op.execute("""
+        INSERT INTO sales_daily (day, units, revenue, last_sold_at)
+        SELECT DATE(sold_at), SUM(quantity), SUM(total_price), MAX(sold_at)
+        FROM sales
+        WHERE sold_at IS NOT NULL
+        GROUP BY DATE(sold_at)
+    """)
+
+
+def downgrade():
+    op.drop_table("sales_daily", if_exists=True)
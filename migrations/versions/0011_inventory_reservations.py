@@ -0,0 +1,31 @@
+"""inventory_reservations: идемпотентное списание и возврат остатков по ключу заказа
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("inventory_reservations"):
+        op.create_table(
+            "inventory_reservations",
+            sa.Column("order_key", sa.String(64), primary_key=True),
+            sa.Column("items", sa.JSON(), nullable=False),
+            sa.Column("released", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+    op.create_index(
+        "ix_inventory_reservations_created_at", "inventory_reservations", ["created_at"], if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("inventory_reservations", if_exists=True)
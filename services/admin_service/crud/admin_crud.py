@@ -1,6 +1,7 @@
 # services/admin_service/crud/admin_crud.py
 from sqlalchemy.orm import Session, joinedload
 from services.admin_service.schemas import admin_schemas
+from common.db import queries
 from common.models.admin import AdminUser
 from common.models.subscriptions import Subscription, UserSubscription
 from common.models.payment import Payment
@@ -23,7 +24,7 @@ def create_admin_user(db: Session, admin: admin_schemas.AdminUserCreate):
     return db_admin
 
 def get_admin_user_by_email(db: Session, email: str):
-    return db.query(AdminUser).filter(AdminUser.email == email).first()
+    return queries.get_admin_by_email(db, email)
 
 # Все админы
 def get_all_admins(db: Session):
@@ -12,13 +12,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 from common.models.user import User
 from common.models.uploads import Upload
 from services.admin_service.routers import admin_router
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from dotenv import load_dotenv
 
 # Загрузка .env
 load_dotenv()
 
 app = FastAPI(title="Admin Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # CORS
 app.add_middleware(
@@ -36,6 +39,7 @@ app.add_middleware(
 
 # Роуты
 app.include_router(admin_router.router, prefix="/admin", tags=["Admin"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print(" MAINDB_URL:", db_url)
@@ -43,15 +47,8 @@ app.include_router(admin_router.router, prefix="/admin", tags=["Admin"])
 # Проверка подключения к БД
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Admin Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Admin Service)")
 
 @app.get("/")
 def root():
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db, get_analytics_db
 from common.models.admin import AdminUser
 from common.models.uploads import Upload
 from common.models.subscriptions import Subscription, UserSubscription
@@ -39,12 +39,12 @@ def login_admin(credentials: AdminLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/all", response_model=list[AdminUserOut])
-def get_all_admins(db: Session = Depends(get_db)):
+def get_all_admins(db: Session = Depends(get_read_db)):
     return admin_crud.get_all_admins(db)
 
 
 @router.get("/{admin_id}/stats")
-def get_admin_stats(admin_id: int, db: Session = Depends(get_db)):
+def get_admin_stats(admin_id: int, db: Session = Depends(get_analytics_db)):
 
     upload_count = db.query(func.count(Upload.id)).scalar()
     return {"upload_count": upload_count}
@@ -4,6 +4,7 @@ from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from datetime import datetime
 
+from common.db import queries
 from common.models.user import User
 from common.models.subscriptions import UserSubscription
 from services.auth_service.utils.security import hash_password, verify_password
@@ -30,7 +31,7 @@ def create_user(db: Session, user: UserCreate):
 
 # ✅ Аутентификация
 def authenticate_user(db: Session, login: str, password: str):
-    user = db.query(User).filter(User.login == login).first()
+    user = queries.get_user_by_login(db, login)
 
     if not user:
         raise HTTPException(status_code=404, detail="Користувача не знайдено")
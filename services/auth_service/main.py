@@ -11,13 +11,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from dotenv import load_dotenv
 
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from services.auth_service.routers import auth
 from common.config.settings import settings
 
 load_dotenv()
 
 app = FastAPI(title="Authorization Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # CORS — для фронта и локальной разработки
 app.add_middleware(
@@ -35,19 +38,13 @@ app.add_middleware(
 
 # 🔗 Подключение роутеров
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Authorization Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Authorization Service)")
 
 # Корневой эндпоинт
 @app.get("/")
@@ -11,6 +11,7 @@ from services.auth_service.crud.user import (
     create_user, authenticate_user, forgot_password,
     reset_password, get_all_users, delete_user_by_id
 )
+from common.db import queries
 from common.db.session import get_db
 from common.models.user import User
 from services.auth_service.utils.security import create_access_token
@@ -50,7 +51,7 @@ def list_users(db: Session = Depends(get_db)):
 
 @router.get("/users/{user_id}", response_model=UserOut)
 def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = queries.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Користувача не знайдено")
     return user
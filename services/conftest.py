@@ -0,0 +1,39 @@
+# Общие фикстуры тестов сервисов: схема всех моделей в SQLite в памяти.
+# Данные каждый тестовый модуль добавляет сам, переопределяя db поверх этой фикстуры
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import common.models  # noqa: F401
+from common.db.base import Base
+from services.review_service.models.review import Review  # noqa: F401  (связи User/Product)
+from services.review_service.models.recommendation import Recommendation  # noqa: F401
+
+
+def _memory_session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture()
+def session_factory():
+    """sessionmaker к новой пустой БД на каждый тест (несколько сессий — одна БД)."""
+    factory = _memory_session_factory()
+    yield factory
+    factory.kw["bind"].dispose()
+
+
+@pytest.fixture(scope="module")
+def module_session_factory():
+    """То же, одна БД на модуль — для дорогого наполнения, которое тесты только читают."""
+    factory = _memory_session_factory()
+    yield factory
+    factory.kw["bind"].dispose()
+
+
+@pytest.fixture()
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
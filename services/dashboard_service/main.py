@@ -12,13 +12,17 @@ from sqlalchemy import text
 
 from services.dashboard_service.routers import dashboard
 from common.config.settings import settings
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
+from common.utils.http_client import aclose_async_clients
 from dotenv import load_dotenv
 
 # Загрузка .env
 load_dotenv()
 
 app = FastAPI(title="Dashboard Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # CORS
 app.add_middleware(
@@ -36,6 +40,7 @@ app.add_middleware(
 
 # Роутер
 app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print("🔗 MAINDB_URL:", db_url)
@@ -43,15 +48,13 @@ app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Dashboard Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Dashboard Service)")
+
+# Пул соединений к sales_service закрывается вместе с приложением
+@app.on_event("shutdown")
+async def shutdown_event():
+    await aclose_async_clients()
 
 # Корень
 @app.get("/")
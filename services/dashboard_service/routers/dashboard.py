@@ -1,10 +1,14 @@
 # services/dashboard_service/routers/dashboard.py
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Request, Depends, APIRouter, HTTPException, Query, Path
+from fastapi.responses import StreamingResponse
 from services.dashboard_service.schemas.dashboard import DashboardOut, DashboardLogOut, Sale, Review, Discount, Recommendation
-from services.dashboard_service.utils.fetch_data import get_sales_count, get_reviews_count
+from services.dashboard_service.utils.fetch_data import get_sales_count, get_reviews_count, iter_ndjson_as_array
 from common.config.settings import settings
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db
+from common.db.async_session import get_async_db
+from common.utils.http_client import async_service_client
 from datetime import datetime
 from common.models.dashboard_log import DashboardLog
 from common.models.subscriptions import Subscription, UserSubscription
@@ -22,7 +26,7 @@ REVIEW_SERVICE_URL = settings.REVIEW_SERVICE_URL
 DISCOUNT_SERVICE_URL = settings.DISCOUNT_SERVICE_URL
 
 # Функция логирования входа в дашборд
-def save_dashboard_log(db: Session, user_id: int, user_agent: str, notes: str = "Вхід у кабінет"):
+async def save_dashboard_log(db: AsyncSession, user_id: int, user_agent: str, notes: str = "Вхід у кабінет"):
     try:
         log = DashboardLog(
             user_id=user_id,
@@ -30,15 +34,15 @@ def save_dashboard_log(db: Session, user_id: int, user_agent: str, notes: str =
             notes=notes
         )
         db.add(log)
-        db.commit()
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f" Error saving dashboard log: {str(e)}")
 
 
 @router.get("/logs/", response_model=List[DashboardLogOut])
 def get_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: Optional[int] = Query(None, description="Фильтр по ID пользователя"),
     from_date: Optional[datetime] = Query(None, description="Начальная дата"),
     to_date: Optional[datetime] = Query(None, description="Конечная дата"),
@@ -75,16 +79,20 @@ async def get_all_users():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Помилка при отриманні користувачів: {str(e)}")
 
-# Получение всех продаж
+# Получение всех продаж: NDJSON-поток sales_service перекладывается в JSON-массив на лету,
+# без буферизации всей истории в памяти dashboard
 @router.get("/all/sales", response_model=List[Sale])
 async def get_all_sales():
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{SALES_SERVICE_URL}/sales/sales/")
-            resp.raise_for_status()
-            return resp.json()
+        resp = await async_service_client("sales_service", SALES_SERVICE_URL).stream(
+            "GET", "/sales/sales/", params={"format": "ndjson"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Помилка при отриманні продажів: {str(e)}")
+    if resp.status_code != 200:
+        await resp.aclose()
+        raise HTTPException(status_code=500, detail=f"Помилка при отриманні продажів: HTTP {resp.status_code}")
+    return StreamingResponse(iter_ndjson_as_array(resp, Sale), media_type="application/json")
 
 # Получение всех отзывов
 @router.get("/all/reviews", response_model=List[Review])
@@ -155,9 +163,9 @@ def get_dashboard_stats():
 
 # Основной эндпоинт дашборда (логирует вход и возвращает агрегированные данные)
 @router.get("/{user_id}", response_model=DashboardOut)
-async def get_dashboard(user_id: int, request: Request, db: Session = Depends(get_db)):
+async def get_dashboard(user_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     user_agent = request.headers.get("user-agent", "unknown")
-    save_dashboard_log(db, user_id=user_id, user_agent=user_agent)
+    await save_dashboard_log(db, user_id=user_id, user_agent=user_agent)
 
     try:
         async with httpx.AsyncClient() as client:
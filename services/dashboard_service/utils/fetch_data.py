@@ -1,5 +1,9 @@
 import httpx
+import orjson
+
 from common.config.settings import settings
+from common.utils.fast_json import dump_models
+from common.utils.http_client import async_service_client
 
 SALES_SERVICE_URL = settings.SALES_SERVICE_URL
 REVIEW_SERVICE_URL = settings.REVIEW_SERVICE_URL
@@ -9,11 +13,11 @@ async def get_sales_count(user_id: int) -> int:
     Получает количество продаж для конкретного пользователя.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{SALES_SERVICE_URL}/sales/sales/user/{user_id}")
-            resp.raise_for_status()
-            data = resp.json()
-            return len(data) if isinstance(data, list) else 0
+        # Общий пул соединений вместо нового AsyncClient (и TCP-соединения) на каждый вызов;
+        # COUNT(*) в sales_service вместо выгрузки всей истории пользователя
+        resp = await async_service_client("sales_service", SALES_SERVICE_URL).get(f"/sales/sales/user/{user_id}/count")
+        resp.raise_for_status()
+        return resp.json().get("count", 0)
     except Exception as e:
         print(f" Ошибка при получении продаж пользователя {user_id}: {e}")
         return 0
@@ -32,3 +36,25 @@ async def get_reviews_count(user_id: int) -> int:
     except Exception as e:
         print(f" Ошибка при получении отзывов пользователя {user_id}: {e}")
     return 0
+
+async def iter_ndjson_as_array(response, schema):
+    """
+    NDJSON-тело ответа -> JSON-массив по частям: строки каждого чанка валидируются schema
+    и отдаются сразу, ни тело, ни список целиком в памяти не держатся. Закрывает response.
+    """
+    try:
+        yield b"["
+        buffer, first = b"", True
+        async for chunk in response.aiter_bytes():
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            items = [orjson.loads(line) for line in lines if line.strip()]
+            if items:
+                body = b",".join(orjson.dumps(item) for item in dump_models(schema, items))
+                yield body if first else b"," + body
+                first = False
+        if buffer.strip():
+            body = orjson.dumps(dump_models(schema, [orjson.loads(buffer)])[0])
+            yield body if first else b"," + body
+        yield b"]"
+    finally:
+        await response.aclose()
@@ -8,15 +8,19 @@ from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from common.config.settings import settings
 from services.discount_service.routers import discount
 
 load_dotenv()
 
 app = FastAPI(title="Discount Service")
+app.add_middleware(SQLTimingMiddleware)
 
 app.include_router(discount.router, prefix="/discounts", tags=["Discounts"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,15 +41,8 @@ app.add_middleware(
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Discount Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Discount Service)")
 
 # Корневая точка
 @app.get("/")
@@ -9,4 +9,4 @@ class Discount(Base):
     code = Column(String(50), unique=True, index=True, nullable=False)
     percentage = Column(Float, nullable=False)
     active = Column(Boolean, default=True)
-    valid_until = Column(DateTime)
+    valid_until = Column(DateTime, index=True)
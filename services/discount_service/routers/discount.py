@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from services.discount_service.schemas.discount import DiscountCreate, DiscountOut
 from services.discount_service.crud.discount import create_discount, get_valid_discounts
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db
+from common.utils.fast_json import fast_json_list
 
 router = APIRouter()
 
@@ -15,8 +16,8 @@ def create_discount_endpoint(data: DiscountCreate, db: Session = Depends(get_db)
     return create_discount(db, data)
 
 @router.get("/", response_model=list[DiscountOut])
-def read_all_discounts(db: Session = Depends(get_db)):
+def read_all_discounts(db: Session = Depends(get_read_db)):
     """
     Получение всех актуальных скидок
     """
-    return get_valid_discounts(db)
+    return fast_json_list(DiscountOut, get_valid_discounts(db))
@@ -10,6 +10,13 @@ def create_payment(db, data):
     db.refresh(obj)
     return obj
 
+async def create_payment_async(db, data):
+    obj = Payment(**data.dict())
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)
+    return obj
+
 def get_all_payments(db):
     return db.query(Payment).all()
 
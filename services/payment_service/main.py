@@ -11,7 +11,9 @@ from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from common.models.payment import Payment
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from common.config.settings import settings
 from services.payment_service.common.config.settings_payment import settings_payment
 from services.payment_service.routers.payment import router as payment_router
@@ -19,6 +21,7 @@ from services.payment_service.routers.payment import router as payment_router
 load_dotenv()
 
 app = FastAPI(title="Payment Service")
+app.add_middleware(SQLTimingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +37,7 @@ app.add_middleware(
 )
 
 app.include_router(payment_router, prefix="/payment", tags=["Payment Methods"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print("🔗 MAINDB_URL:", db_url)
@@ -41,15 +45,8 @@ app.include_router(payment_router, prefix="/payment", tags=["Payment Methods"])
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Payment Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Payment Service)")
 
 # Корень
 @app.get("/")
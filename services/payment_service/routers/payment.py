@@ -3,15 +3,19 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from services.payment_service.schemas.payment import PaymentCreate, PaymentOut
-from services.payment_service.crud.payment import create_payment, get_all_payments, create_nowpayment_invoice
+from services.payment_service.crud.payment import (
+    create_payment, create_payment_async, get_all_payments, create_nowpayment_invoice
+)
 from services.payment_service.common.config.settings_payment import settings_payment
 
 from common.models.subscriptions import Subscription, UserSubscription
 from common.models.payment import Payment
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db
+from common.db.async_session import get_async_db
 from common.config.settings import settings
 
 
@@ -26,7 +30,7 @@ class NowPaymentRequest(BaseModel):
     order_description: str = "Test order"
 
 @router.get("/", response_model=list[PaymentOut])
-def read_all(db: Session = Depends(get_db)):
+def read_all(db: Session = Depends(get_read_db)):
     return get_all_payments(db)
 
 @router.post("/", response_model=PaymentOut)
@@ -47,7 +51,7 @@ async def create_nowpayment(data: NowPaymentRequest):
     return result
 
 @router.post("/webhook")
-async def payment_webhook(request: Request, db: Session = Depends(get_db)):
+async def payment_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     try:
         data = await request.json()
         print(" Webhook received:", data)
@@ -60,7 +64,7 @@ async def payment_webhook(request: Request, db: Session = Depends(get_db)):
                 status="paid",
                 payment_url=None
             )
-            create_payment(db, payment_data)
+            await create_payment_async(db, payment_data)
 
         return {"status": "ok"}
     except Exception as e:
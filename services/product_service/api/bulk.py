@@ -0,0 +1,173 @@
+# services/product_service/api/bulk.py
+from typing import Iterable, Iterator, List, Tuple
+
+import anyio
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from common.models.categories import Category as CategoryModel
+from common.models.products import Product as ProductModel
+from common.utils.fast_json import type_adapter
+from services.product_service.api.inventory import record_movements
+from services.product_service.api.schemas import ProductCreate
+
+BULK_BATCH_SIZE = 1000
+
+NATURAL_KEY = ("name", "category_id")
+# Колонки, которые перезаписываются при конфликте по натуральному ключу
+UPDATE_COLUMNS = [c for c in ProductCreate.model_fields if c not in NATURAL_KEY]
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class BulkBodyError(ValueError):
+    pass
+
+
+# === Разбор тела: JSON-массив или NDJSON-поток ===
+
+def iter_body(stream) -> Iterator[bytes]:
+    """
+    Чанки async-потока тела запроса для sync-маршрута: каждый берётся в event loop через
+    anyio.from_thread, маршрут работает в потоке threadpool — тело не читается целиком.
+    """
+    chunks = stream.__aiter__()
+    while True:
+        try:
+            yield anyio.from_thread.run(chunks.__anext__)
+        except StopAsyncIteration:
+            return
+
+
+def iter_ndjson(chunks: Iterable[bytes]) -> Iterator[Tuple[int, object]]:
+    """(номер строки, объект или исключение) из потока байтов, без чтения тела целиком."""
+    buffer, line_no = b"", 0
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, _loads(line)
+    if buffer.strip():
+        yield line_no + 1, _loads(buffer)
+
+
+def _loads(line: bytes):
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return e
+
+
+def parse_json_array(body: bytes) -> List[Tuple[int, object]]:
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError as e:
+        raise BulkBodyError(f"Некорректный JSON: {e}")
+    if not isinstance(data, list):
+        raise BulkBodyError("Ожидается JSON-массив товаров или NDJSON (application/x-ndjson)")
+    return list(enumerate(data, start=1))
+
+
+# === Валидация и upsert пачки ===
+
+def validate_batch(items: List[Tuple[int, object]]):
+    """Разделяет пачку на валидные строки [(номер, dict)] и отчёты об ошибках."""
+    adapter = type_adapter(ProductCreate)
+    valid, report = [], []
+    for row_no, item in items:
+        if isinstance(item, Exception):
+            report.append({"row": row_no, "status": "error", "errors": [f"Некорректный JSON: {item}"]})
+            continue
+        try:
+            valid.append((row_no, adapter.validate_python(item).model_dump()))
+        except ValidationError as e:
+            errors = [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+            report.append({"row": row_no, "status": "error", "errors": errors})
+    return valid, report
+
+
+def _upsert_statement(dialect_name: str):
+    insert = _INSERTS.get(dialect_name)
+    if insert is None:
+        raise BulkBodyError(f"Bulk upsert не поддерживается для диалекта {dialect_name}")
+    stmt = insert(ProductModel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(NATURAL_KEY),
+        set_={**{c: stmt.excluded[c] for c in UPDATE_COLUMNS}, "updated_at": func.now()},
+    )
+    # id сопоставляется со строкой по натуральному ключу, а не по позиции: на Postgres
+    # sort_by_parameter_order сортирует RETURNING по id, а обновлённые строки возвращают старые id
+    return stmt.returning(ProductModel.id, ProductModel.name, ProductModel.category_id)
+
+
+def process_batch(db: Session, items: List[Tuple[int, object]]):
+    valid, report = validate_batch(items)
+    if not valid:
+        return report, []
+    upsert_report, ids = upsert_batch(db, valid)
+    return report + upsert_report, ids
+
+
+def upsert_batch(db: Session, valid: List[Tuple[int, dict]]):
+    """
+    Upsert пачки по (name, category_id) многострочным INSERT ... ON CONFLICT DO UPDATE
+    и движения остатков для неё — в одной транзакции. Возвращает (отчёт, id товаров).
+    """
+    report = []
+    known = set(db.execute(
+        select(CategoryModel.category_id).where(CategoryModel.category_id.in_({r["category_id"] for _, r in valid}))
+    ).scalars())
+
+    # Один INSERT не может обновить одну строку дважды — при повторе ключа в пачке побеждает последний
+    latest = {}
+    for row_no, row in valid:
+        if row["category_id"] not in known:
+            report.append({"row": row_no, "status": "error", "errors": [f"category_id: Category {row['category_id']} not found"]})
+            continue
+        key = (row["name"], row["category_id"])
+        if key in latest:
+            report.append({"row": latest[key][0], "status": "skipped", "errors": ["Повтор (name, category_id) в запросе — применена более поздняя строка"]})
+        latest[key] = (row_no, row)
+
+    rows = list(latest.values())
+    if not rows:
+        return report, []
+    try:
+        # Прежние остатки существующих товаров — в журнал пишется разница, а не новое значение.
+        # FOR UPDATE до upsert: параллельное списание не изменит остаток между чтением и записью;
+        # порядок по id — тот же порядок блокировок, что у /inventory/decrement
+        previous = dict(
+            ((name, category_id), inventory) for name, category_id, inventory in db.execute(
+                select(ProductModel.name, ProductModel.category_id, ProductModel.current_inventory)
+                .where(tuple_(ProductModel.name, ProductModel.category_id).in_(list(latest)))
+                .order_by(ProductModel.id)
+                .with_for_update()
+            )
+        )
+        returned = db.execute(_upsert_statement(db.get_bind().dialect.name), [r for _, r in rows])
+        ids_by_key = {(name, category_id): product_id for product_id, name, category_id in returned}
+        ids = [ids_by_key[key] for key in latest]
+        record_movements(db, [
+            {
+                "product_id": ids_by_key[key],
+                "category_id": row["category_id"],
+                "delta": row["current_inventory"] - previous.get(key, 0),
+                "reason": "bulk",
+            }
+            for key, (_, row) in latest.items()
+        ])
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        message = f"Database error: {str(e.orig) if getattr(e, 'orig', None) else str(e)}"
+        report.extend({"row": row_no, "status": "error", "errors": [message]} for row_no, _ in rows)
+        return report, []
+
+    report.extend({"row": row_no, "status": "ok", "id": ids_by_key[key]} for key, (row_no, _) in latest.items())
+    return report, ids
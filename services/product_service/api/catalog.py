@@ -0,0 +1,217 @@
+# services/product_service/api/catalog.py
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, literal, literal_column, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from common.models.products import Product as ProductModel
+from common.utils.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, keyset_condition, keyset_order
+)
+
+# Допустимые сортировки: ключ -> колонки (id всегда последний — уникальность порядка)
+SORT_KEYS = {
+    "created_at": (ProductModel.created_at, ProductModel.id),
+    "price": (ProductModel.price, ProductModel.id),
+    "id": (ProductModel.id,),
+}
+
+MAX_PAGE_SIZE = 100
+
+# Границы ценовых корзин для фасета price: [0, 500), [500, 1000), ..., [5000, ∞)
+PRICE_BUCKETS = [0, 500, 1000, 2000, 5000]
+
+
+class ProductFilters:
+    """Фильтры каталога — общий набор query-параметров для списка товаров (через Depends())."""
+
+    def __init__(
+        self,
+        category_id: Optional[int] = None,
+        subcategory: Optional[str] = None,
+        product_type: Optional[str] = None,
+        status: Optional[str] = None,
+        is_hit: Optional[bool] = None,
+        is_new: Optional[bool] = None,
+        is_discount: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+    ):
+        self.category_id = category_id
+        self.subcategory = subcategory
+        self.product_type = product_type
+        self.status = status
+        self.is_hit = is_hit
+        self.is_new = is_new
+        self.is_discount = is_discount
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def conditions(self) -> list:
+        conditions = []
+        for column, value in (
+            (ProductModel.category_id, self.category_id),
+            (ProductModel.subcategory, self.subcategory),
+            (ProductModel.product_type, self.product_type),
+            (ProductModel.status, self.status),
+            (ProductModel.is_hit, self.is_hit),
+            (ProductModel.is_new, self.is_new),
+            (ProductModel.is_discount, self.is_discount),
+        ):
+            if value is not None:
+                conditions.append(column == value)
+        if self.min_price is not None:
+            conditions.append(ProductModel.price >= self.min_price)
+        if self.max_price is not None:
+            conditions.append(ProductModel.price <= self.max_price)
+        return conditions
+
+    def apply(self, stmt):
+        return stmt.where(*self.conditions())
+
+    def cache_key(self) -> str:
+        # Стабильный ключ набора фильтров (порядок параметров в URL не важен)
+        return "&".join(f"{k}={v}" for k, v in sorted(vars(self).items()) if v is not None)
+
+
+def catalog_validator(db: Session, filters: ProductFilters):
+    """
+    Дешёвый валидатор выборки для ETag/Last-Modified: max(updated_at) и count по тем же
+    фильтрам. Изменение/добавление меняет max, удаление — count.
+    """
+    stmt = filters.apply(select(func.max(ProductModel.updated_at), func.count(ProductModel.id)))
+    last_modified, count = db.execute(stmt).one()
+    return last_modified, count
+
+
+def _price_bucket():
+    # Индекс корзины: 0 для [0, 500), 1 для [500, 1000) ... len(PRICE_BUCKETS) - 1 для последней.
+    # Границы — литералы SQL: выражение в SELECT и GROUP BY должно совпадать текстуально
+    return case(
+        *(
+            (ProductModel.price < literal_column(str(upper)), literal_column(str(index)))
+            for index, upper in enumerate(PRICE_BUCKETS[1:])
+        ),
+        else_=literal_column(str(len(PRICE_BUCKETS) - 1)),
+    )
+
+
+# Фасет -> колонка значения (у category подпись — category_name)
+FACET_COLUMNS = {
+    "category": ProductModel.category_id,
+    "subcategory": ProductModel.subcategory,
+    "product_type": ProductModel.product_type,
+    "is_hit": ProductModel.is_hit,
+    "is_new": ProductModel.is_new,
+    "is_discount": ProductModel.is_discount,
+}
+
+
+def _facet_rows_grouping_sets(db: Session, filters: ProductFilters):
+    # Postgres: все фасеты одним GROUP BY GROUPING SETS; grouping(expr) = 0 у выражения своего набора
+    facets = dict(FACET_COLUMNS, price=_price_bucket())
+    names = list(facets)
+    stmt = filters.apply(
+        select(
+            *(expr.label(f"v_{name}") for name, expr in facets.items()),
+            *(func.grouping(expr).label(f"g_{name}") for name, expr in facets.items()),
+            func.max(ProductModel.category_name).label("label"),
+            func.count().label("count"),
+        )
+    ).group_by(func.grouping_sets(*(tuple_(expr) for expr in facets.values())))
+    for row in db.execute(stmt):
+        mapping = row._mapping
+        facet = next(name for name in names if mapping[f"g_{name}"] == 0)
+        yield facet, mapping[f"v_{facet}"], row.label if facet == "category" else None, row.count
+
+
+def _facet_rows_union(db: Session, filters: ProductFilters):
+    # Остальные диалекты (SQLite): UNION ALL сгруппированных подзапросов — тоже один запрос
+    facets = dict(FACET_COLUMNS, price=_price_bucket())
+    parts = []
+    for facet, expr in facets.items():
+        label = func.max(ProductModel.category_name) if facet == "category" else null()
+        stmt = select(literal(facet).label("facet"), expr.label("value"), label.label("label"), func.count().label("count"))
+        parts.append(filters.apply(stmt).group_by(expr))
+    for row in db.execute(union_all(*parts)):
+        yield row.facet, row.value, row.label, row.count
+
+
+def compute_facets(db: Session, filters: ProductFilters) -> dict:
+    """Счётчики по всем фасетам для текущих фильтров за один запрос к БД."""
+    rows = _facet_rows_grouping_sets if db.get_bind().dialect.name == "postgresql" else _facet_rows_union
+    facets = {name: [] for name in FACET_COLUMNS}
+    price = {}
+    for facet, value, label, count in rows(db, filters):
+        if facet == "price":
+            price[int(value)] = count
+        else:
+            if facet.startswith("is_") and value is not None:
+                value = bool(value)
+            facets[facet].append({"value": value, "label": label, "count": count})
+    for items in facets.values():
+        items.sort(key=lambda item: -item["count"])
+    facets["price"] = [
+        {
+            "min": PRICE_BUCKETS[index],
+            "max": PRICE_BUCKETS[index + 1] if index + 1 < len(PRICE_BUCKETS) else None,
+            "count": price[index],
+        }
+        for index in sorted(price)
+    ]
+    return facets
+
+
+def _cursor_values(sort: str, values: list) -> list:
+    # created_at в курсоре хранится строкой ISO — возвращаем datetime для сравнения
+    if sort == "created_at":
+        return [datetime.fromisoformat(values[0]), int(values[1])]
+    if sort == "price":
+        return [float(values[0]), int(values[1])]
+    return [int(v) for v in values]
+
+
+def fetch_product_page(
+    db: Session,
+    filters: ProductFilters,
+    sort: str = "created_at",
+    order: str = "desc",
+    cursor: Optional[str] = None,
+    limit: int = 24,
+):
+    """
+    Одна страница каталога по keyset-курсору. Возвращает (товары, next_cursor);
+    next_cursor = None на последней странице.
+    """
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort '{sort}'")
+    columns = SORT_KEYS[sort]
+    descending = order == "desc"
+
+    stmt = filters.apply(select(ProductModel))
+    if cursor:
+        try:
+            payload = decode_cursor(cursor)
+            if payload.get("s") != sort or payload.get("o") != order:
+                raise InvalidCursor("Курсор выдан для другой сортировки")
+            values = _cursor_values(sort, payload["v"])
+        except (InvalidCursor, KeyError, IndexError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+        stmt = stmt.where(keyset_condition(columns, values, descending))
+
+    # limit + 1: лишняя строка говорит, есть ли следующая страница, без COUNT(*)
+    stmt = stmt.order_by(*keyset_order(columns, descending)).limit(limit + 1)
+    rows = db.execute(stmt).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "s": sort,
+            "o": order,
+            "v": [getattr(last, c.key) for c in columns],
+        })
+    return rows, next_cursor
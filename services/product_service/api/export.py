@@ -0,0 +1,72 @@
+# services/product_service/api/export.py
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Optional
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from common.models.products import Product as ProductModel
+from common.utils.fast_json import dump_models
+from common.utils.http_cache import as_utc
+from services.product_service.api.catalog import ProductFilters
+from services.product_service.api.schemas import ProductOut
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = list(ProductOut.model_fields)
+
+
+def export_watermark(db: Session, overlap: int) -> datetime:
+    """
+    updated_since для следующей инкрементальной выгрузки. Часы — БД, из которой читается выгрузка
+    (updated_at = now() БД на старте транзакции), а не приложения; минус overlap секунд: строки
+    транзакций, ещё не завершённых или не дошедших до реплики, получат updated_at раньше now().
+    """
+    return as_utc(db.execute(select(func.now())).scalar()) - timedelta(seconds=overlap)
+
+
+def iter_product_batches(session_factory, filters: ProductFilters, updated_since: Optional[datetime] = None):
+    """
+    Каталог пачками по EXPORT_BATCH_SIZE через серверный курсор (yield_per включает
+    stream_results). Сессия открывается здесь (session_factory — ReadSessionLocal), а не через
+    Depends: зависимость закрывается раньше, чем StreamingResponse начнёт отдавать тело.
+    """
+    db = session_factory()
+    try:
+        stmt = filters.apply(select(ProductModel)).order_by(ProductModel.id)
+        if updated_since is not None:
+            stmt = stmt.where(ProductModel.updated_at >= updated_since)
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for batch in result.scalars().partitions():
+            yield dump_models(ProductOut, batch)
+            # Отданные объекты больше не нужны — identity map не растёт с размером каталога.
+            # Поштучно: expunge_all() заменяет identity map, и следующая пачка yield_per падает
+            for product in batch:
+                db.expunge(product)
+    finally:
+        db.close()
+
+
+def iter_ndjson(batches):
+    for batch in batches:
+        yield b"".join(orjson.dumps(item) + b"\n" for item in batch)
+
+
+def _csv_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        for item in batch:
+            writer.writerow([_csv_value(item[field]) for field in EXPORT_FIELDS])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
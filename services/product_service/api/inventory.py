@@ -0,0 +1,285 @@
+# services/product_service/api/inventory.py
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import bindparam, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from common.custom_exceptions import InsufficientInventoryException, ProductNotFoundException
+from common.models.inventory import Inventory, InventoryReservation, InventorySnapshot
+from common.models.products import Product as ProductModel
+
+
+class InventoryShortage(InsufficientInventoryException):
+    def __init__(self, product_id: int, requested: int, available: int):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Недостаточно товара {product_id}: запрошено {requested}, доступно {available}")
+
+    def detail(self) -> dict:
+        return {"product_id": self.product_id, "requested": self.requested, "available": self.available}
+
+
+class ReservationReleased(Exception):
+    """Списание по ключу заказа, остатки которого уже возвращены (или возврат пришёл раньше списания)."""
+
+    def __init__(self, order_key: str):
+        self.order_key = order_key
+        super().__init__(f"Резерв заказа {order_key} уже возвращён")
+
+
+# Условное списание: проверка остатка и UPDATE — одна операция в БД, без гонки «прочитал → записал»
+_decrement_stmt = (
+    update(ProductModel)
+    .where(ProductModel.id == bindparam("pid"), ProductModel.current_inventory >= bindparam("qty"))
+    .values(current_inventory=ProductModel.current_inventory - bindparam("qty"))
+    .returning(ProductModel.id, ProductModel.current_inventory, ProductModel.price, ProductModel.category_id)
+    .execution_options(synchronize_session=False)
+)
+
+# Возврат зарезервированного (компенсация заказа, который не удалось записать в sales)
+_release_stmt = (
+    update(ProductModel)
+    .where(ProductModel.id == bindparam("pid"))
+    .values(current_inventory=ProductModel.current_inventory + bindparam("qty"))
+    .returning(ProductModel.id, ProductModel.current_inventory, ProductModel.price, ProductModel.category_id)
+    .execution_options(synchronize_session=False)
+)
+
+_available_stmt = select(ProductModel.current_inventory).where(ProductModel.id == bindparam("pid"))
+
+_levels_stmt = select(
+    ProductModel.id, ProductModel.current_inventory, ProductModel.price, ProductModel.category_id
+).where(ProductModel.id.in_(bindparam("pids", expanding=True))).order_by(ProductModel.id)
+
+
+def merge_items(items: Iterable) -> List[tuple]:
+    """Суммирует повторы одного товара и сортирует по id — один порядок блокировок во всех транзакциях."""
+    totals = defaultdict(int)
+    for item in items:
+        totals[item.product_id] += item.quantity
+    return sorted(totals.items())
+
+
+def decrement_inventory(db: Session, items: Iterable, order_key: Optional[str] = None) -> List[dict]:
+    """
+    Списывает остатки по всем позициям в одной транзакции: либо все, либо ни одной.
+    С order_key — идемпотентно: повтор с тем же ключом ничего не списывает и возвращает текущие уровни.
+    ProductNotFoundException / InventoryShortage / ReservationReleased — после rollback. Commit делает вызывающий.
+    """
+    merged = merge_items(items)
+    if order_key is not None:
+        replayed = _claim_reservation(db, order_key, merged)
+        if replayed is not None:
+            return replayed
+
+    levels = []
+    for product_id, quantity in merged:
+        row = db.execute(_decrement_stmt, {"pid": product_id, "qty": quantity}).first()
+        if row is None:
+            available = db.execute(_available_stmt, {"pid": product_id}).scalar()
+            db.rollback()
+            if available is None:
+                raise ProductNotFoundException(f"Product {product_id} not found")
+            raise InventoryShortage(product_id, quantity, available)
+        levels.append({
+            "product_id": row.id,
+            "quantity": quantity,
+            "current_inventory": row.current_inventory,
+            "price": row.price,
+            "category_id": row.category_id,
+        })
+    record_movements(db, [
+        {"product_id": lv["product_id"], "category_id": lv["category_id"], "delta": -lv["quantity"], "reason": "sale"}
+        for lv in levels
+    ])
+    return levels
+
+
+def _claim_reservation(db: Session, order_key: str, merged: List[tuple]) -> Optional[List[dict]]:
+    """
+    Первый запрос с ключом записывает его в транзакции списания (None — списывать).
+    Повтор получает текущие уровни без списания, возвращённый ключ — ReservationReleased.
+    """
+    reservation = db.get(InventoryReservation, order_key)
+    if reservation is None:
+        try:
+            db.add(InventoryReservation(order_key=order_key, items=[list(item) for item in merged], released=False))
+            db.flush()
+            return None
+        except IntegrityError:
+            # Тот же ключ записала параллельная транзакция (повтор, пока первый запрос ещё шёл)
+            db.rollback()
+            reservation = db.get(InventoryReservation, order_key)
+    if reservation.released:
+        db.rollback()
+        raise ReservationReleased(order_key)
+    quantities = dict(tuple(item) for item in reservation.items)
+    return [
+        {"product_id": row.id, "quantity": quantities[row.id], "current_inventory": row.current_inventory,
+         "price": row.price, "category_id": row.category_id}
+        for row in db.execute(_levels_stmt, {"pids": list(quantities)}).all()
+    ]
+
+
+def release_reservation(db: Session, order_key: str) -> List[dict]:
+    """
+    Возврат списанного по ключу заказа — ровно то, что списано, и не больше одного раза.
+    Списания с ключом нет (не дошло или ещё в пути) — остаётся метка released, и опоздавшее
+    списание получит ReservationReleased. Commit делает вызывающий.
+    """
+    reservation = db.execute(
+        select(InventoryReservation).where(InventoryReservation.order_key == order_key).with_for_update()
+    ).scalar_one_or_none()
+    if reservation is None:
+        try:
+            db.add(InventoryReservation(order_key=order_key, items=[], released=True))
+            db.flush()
+            return []
+        except IntegrityError:
+            # Параллельное списание с этим ключом записалось раньше — возвращаем его
+            db.rollback()
+            return release_reservation(db, order_key)
+    if reservation.released:
+        return []
+    reservation.released = True
+    return _release(db, [tuple(item) for item in reservation.items])
+
+
+def release_inventory(db: Session, items: Iterable) -> List[dict]:
+    """
+    Возвращает списанное на склад (reason=release) — обратная операция к decrement_inventory.
+    ProductNotFoundException — после rollback, ничего не возвращается. Commit делает вызывающий.
+    """
+    return _release(db, merge_items(items))
+
+
+def _release(db: Session, merged: List[tuple]) -> List[dict]:
+    levels = []
+    for product_id, quantity in merged:
+        row = db.execute(_release_stmt, {"pid": product_id, "qty": quantity}).first()
+        if row is None:
+            db.rollback()
+            raise ProductNotFoundException(f"Product {product_id} not found")
+        levels.append({
+            "product_id": row.id,
+            "quantity": quantity,
+            "current_inventory": row.current_inventory,
+            "price": row.price,
+            "category_id": row.category_id,
+        })
+    record_movements(db, [
+        {"product_id": lv["product_id"], "category_id": lv["category_id"], "delta": lv["quantity"], "reason": "release"}
+        for lv in levels
+    ])
+    return levels
+
+
+# === Журнал движения остатков ===
+
+def record_movements(db: Session, movements: List[dict]):
+    """Многострочный INSERT движений {product_id, category_id, delta, reason}; нулевые delta пропускаются."""
+    rows = [m for m in movements if m["delta"]]
+    if rows:
+        db.execute(insert(Inventory), rows)
+
+
+def _latest_snapshots(as_of: Optional[datetime] = None):
+    """Последний снимок каждого товара (на момент as_of, если задан)."""
+    latest = select(func.max(InventorySnapshot.id)).group_by(InventorySnapshot.product_id)
+    if as_of is not None:
+        latest = latest.where(InventorySnapshot.as_of <= as_of)
+    return (
+        select(InventorySnapshot.product_id, InventorySnapshot.quantity, InventorySnapshot.last_entry_id)
+        .where(InventorySnapshot.id.in_(latest))
+        .subquery("snap")
+    )
+
+
+def stock_as_of(db: Session, product_id: int, as_of: datetime) -> int:
+    """
+    Остаток товара на момент as_of: снимок + движения после него, два поиска по индексам.
+    Для времени раньше последней компактизации точность — до снимков (промежуточные движения удалены).
+    """
+    snapshot = db.execute(
+        select(InventorySnapshot.quantity, InventorySnapshot.last_entry_id)
+        .where(InventorySnapshot.product_id == product_id, InventorySnapshot.as_of <= as_of)
+        .order_by(InventorySnapshot.as_of.desc(), InventorySnapshot.id.desc())
+        .limit(1)
+    ).first()
+    base, after_id = (snapshot.quantity, snapshot.last_entry_id) if snapshot else (0, 0)
+    moved = db.execute(
+        select(func.coalesce(func.sum(Inventory.delta), 0))
+        .where(Inventory.product_id == product_id, Inventory.id > after_id, Inventory.created_at <= as_of)
+    ).scalar()
+    return base + moved
+
+
+def compact_ledger(db: Session, before: datetime) -> dict:
+    """
+    Сворачивает движения старше before в снимки: INSERT ... SELECT с суммой по товару
+    поверх предыдущего снимка и DELETE свёрнутых строк. as_of снимка — время последнего
+    свёрнутого движения товара. Ключи заказов старше before удаляются. Commit делает вызывающий.
+    """
+    db.execute(delete(InventoryReservation).where(InventoryReservation.created_at < before))
+    cutoff_id = db.execute(select(func.max(Inventory.id)).where(Inventory.created_at < before)).scalar()
+    if cutoff_id is None:
+        return {"snapshots": 0, "compacted": 0}
+
+    prev = _latest_snapshots()
+    totals = (
+        select(
+            Inventory.product_id,
+            func.max(Inventory.created_at),
+            (func.coalesce(func.max(prev.c.quantity), 0) + func.sum(Inventory.delta)),
+            literal(cutoff_id),
+        )
+        .outerjoin(prev, prev.c.product_id == Inventory.product_id)
+        .where(Inventory.id <= cutoff_id)
+        .group_by(Inventory.product_id)
+    )
+    snapshots = db.execute(
+        insert(InventorySnapshot).from_select(["product_id", "as_of", "quantity", "last_entry_id"], totals)
+    ).rowcount
+    compacted = db.execute(
+        Inventory.__table__.delete().where(Inventory.id <= cutoff_id)
+    ).rowcount
+    return {"snapshots": snapshots, "compacted": compacted}
+
+
+def reconcile_inventory(db: Session, fix: bool = False) -> List[dict]:
+    """
+    Сверка журнала с products.current_inventory одним запросом по всем товарам.
+    fix=True — дописывает корректирующие движения (reason=reconcile): источник истины — current_inventory,
+    его меняет атомарное списание. Commit делает вызывающий.
+    """
+    snap = _latest_snapshots()
+    moved = (
+        select(Inventory.product_id, func.sum(Inventory.delta).label("moved"))
+        .group_by(Inventory.product_id)
+        .subquery("moved")
+    )
+    ledger = func.coalesce(snap.c.quantity, 0) + func.coalesce(moved.c.moved, 0)
+    rows = db.execute(
+        select(ProductModel.id, ProductModel.category_id, ProductModel.current_inventory, ledger.label("ledger"))
+        .outerjoin(snap, snap.c.product_id == ProductModel.id)
+        .outerjoin(moved, moved.c.product_id == ProductModel.id)
+        .where(ProductModel.current_inventory != ledger)
+        .order_by(ProductModel.id)
+    ).all()
+
+    mismatches = [
+        {"product_id": r.id, "current_inventory": r.current_inventory, "ledger": r.ledger,
+         "diff": r.current_inventory - r.ledger}
+        for r in rows
+    ]
+    if fix:
+        record_movements(db, [
+            {"product_id": r.id, "category_id": r.category_id, "delta": r.current_inventory - r.ledger,
+             "reason": "reconcile"}
+            for r in rows
+        ])
+    return mismatches
@@ -1,125 +1,326 @@
 # services/product_service/api/routes.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
 
-from common.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import List, Literal, Optional
+
+from common.db import queries
+from common.db.category_map import invalidate_category_map
+from common.db.search import search_products
+from common.config.settings import settings
+from common.db.session import ReadSessionLocal, get_db, get_read_db
+from common.utils.fast_json import FastJSONResponse, dump_model, dump_models
+from common.utils.http_cache import as_utc, conditional_response, make_etag
 from common.models.products import Product as ProductModel
 from common.models.categories import Category as CategoryModel
 from common.models.inventory import Inventory
+from common.custom_exceptions import ProductNotFoundException
 from services.product_service.api.schemas import (
-    ProductCreate, ProductUpdate, ProductOut,
-    InventoryCreate, CategoryCreate, Category as CategorySchema
+    ProductCreate, ProductUpdate, ProductOut, ProductPage, ProductFacetsPage,
+    CategoryCreate, Category as CategorySchema, InventoryDecrement, InventoryLevel, InventoryRelease,
+    InventoryMismatch, LedgerCompaction, StockAsOf
+)
+from services.product_service.api.catalog import (
+    ProductFilters, fetch_product_page, catalog_validator, compute_facets, MAX_PAGE_SIZE
+)
+from services.product_service.api.export import (
+    export_watermark, iter_csv, iter_ndjson as iter_ndjson_export, iter_product_batches
+)
+from services.product_service.api.bulk import (
+    BULK_BATCH_SIZE, BulkBodyError, iter_body, iter_ndjson, parse_json_array, process_batch
+)
+from services.product_service.api.inventory import (
+    InventoryShortage, ReservationReleased, compact_ledger, decrement_inventory, reconcile_inventory,
+    release_reservation, stock_as_of,
+)
+from services.product_service.utils.cache import (
+    product_cache, facets_cache, product_key, category_key, invalidate_product, invalidate_category
 )
 
 router = APIRouter()
 
 # Вспомогательная функция
 
-def create_inventory(inventory: InventoryCreate, db: Session):
-    db_inventory = Inventory(**inventory.dict())
+def create_inventory(db_product: ProductModel, delta: int, db: Session, reason: str = "adjust"):
+    # Без commit: движение остатка пишется в той же транзакции (и в том же flush), что и товар
+    if not delta:
+        return None
+    db_inventory = Inventory(
+        product=db_product,
+        category_id=db_product.category_id,
+        delta=delta,
+        reason=reason,
+    )
     db.add(db_inventory)
-    db.commit()
-    db.refresh(db_inventory)
     return db_inventory
 
-# Получение всех продуктов с категорией
-@router.get("/", response_model=List[ProductOut])
-def get_all_products(db: Session = Depends(get_db)):
-    products = db.query(ProductModel).options(joinedload(ProductModel.category)).all()
-    return [
-        ProductOut(
-            id=p.id,
-            name=p.name,
-            description=p.description,
-            price=p.price,
-            old_price=p.old_price,
-            image=p.image,
-            status=p.status,
-            current_inventory=p.current_inventory,
-            is_hit=p.is_hit,
-            is_discount=p.is_discount,
-            is_new=p.is_new,
-            created_at=p.created_at,
-            updated_at=p.updated_at,
-            category_id=p.category_id,
-            category_name=p.category_name,
-            subcategory=p.subcategory,
-            product_type=p.product_type,
-        ) for p in products
-    ]
-
-# Получение продукта по ID
+# Создание продукта вместе со строкой остатков — одна транзакция
+@router.post("/", response_model=ProductOut)
+def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+    try:
+        if queries.get_category(db, product.category_id) is None:
+            raise HTTPException(status_code=404, detail=f"Category '{product.category_id}' not found")
+
+        db_product = ProductModel(**product.dict())
+        db.add(db_product)
+        create_inventory(db_product, db_product.current_inventory, db, reason="initial")
+
+        # Один flush (INSERT товара c RETURNING + INSERT остатков) и один commit
+        db.flush()
+        result = ProductOut.model_validate(db_product)
+        db.commit()
+        invalidate_product(result.id)
+        return result
+
+    except HTTPException:
+        raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Product '{product.name}' already exists in category {product.category_id}",
+        )
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Каталог: фильтры + keyset-пагинация по (created_at, id), (price, id) или (id)
+@router.get("/", response_model=ProductPage)
+def get_all_products(
+    request: Request,
+    filters: ProductFilters = Depends(),
+    sort: Literal["created_at", "price", "id"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor из предыдущей страницы"),
+    limit: int = Query(24, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    # Условный GET: при неизменной выборке 304 отдаётся без чтения страницы
+    last_modified, count = catalog_validator(db, filters)
+    etag = make_etag("products", last_modified, count, request.url.query)
+
+    def build():
+        products, next_cursor = fetch_product_page(db, filters, sort, order, cursor, limit)
+        # Одна валидация ORM-строк + orjson вместо поштучной сборки ProductOut
+        return FastJSONResponse(dump_model(ProductPage, {"items": products, "next_cursor": next_cursor}))
+
+    return conditional_response(request, etag, last_modified, build)
+
+# Атомарное списание остатков по нескольким позициям (оформление продажи/заказа).
+# 409 с {product_id, requested, available}, если хотя бы одной позиции не хватает — ничего не списывается
+@router.post("/inventory/decrement", response_model=List[InventoryLevel])
+def decrement_product_inventory(body: InventoryDecrement, db: Session = Depends(get_db)):
+    try:
+        levels = decrement_inventory(db, body.items, body.order_key)
+        db.commit()
+    except ProductNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InventoryShortage as e:
+        raise HTTPException(status_code=409, detail=e.detail())
+    except ReservationReleased as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    product_cache.delete(*(product_key(level["product_id"]) for level in levels))
+    return levels
+
+# Возврат списанного по ключу заказа — компенсация, если заказ не удалось сохранить после /inventory/decrement.
+# Идемпотентно: повтор (и возврат раньше опоздавшего списания) не возвращает остатки дважды
+@router.post("/inventory/release", response_model=List[InventoryLevel])
+def release_product_inventory(body: InventoryRelease, db: Session = Depends(get_db)):
+    try:
+        levels = release_reservation(db, body.order_key)
+        db.commit()
+    except ProductNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    product_cache.delete(*(product_key(level["product_id"]) for level in levels))
+    return levels
+
+# Компактизация журнала остатков: движения старше before (по умолчанию — срок хранения) сворачиваются в снимки
+@router.post("/inventory/compact", response_model=LedgerCompaction)
+def compact_inventory_ledger(
+    before: Optional[datetime] = Query(None, description="По умолчанию now - INVENTORY_LEDGER_RETENTION_DAYS"),
+    db: Session = Depends(get_db),
+):
+    before = before or datetime.now(timezone.utc) - timedelta(days=settings.INVENTORY_LEDGER_RETENTION_DAYS)
+    try:
+        result = compact_ledger(db, before)
+        db.commit()
+        return result
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Сверка журнала с products.current_inventory; fix=true дописывает корректирующие движения
+@router.post("/inventory/reconcile", response_model=List[InventoryMismatch])
+def reconcile_inventory_ledger(fix: bool = Query(False), db: Session = Depends(get_db)):
+    try:
+        mismatches = reconcile_inventory(db, fix=fix)
+        db.commit()
+        return mismatches
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Массовый upsert: JSON-массив или NDJSON-поток (Content-Type: application/x-ndjson).
+# Пачки по BULK_BATCH_SIZE: валидация, INSERT ... ON CONFLICT (name, category_id) и остатки — одна транзакция на пачку
+@router.post("/bulk")
+def bulk_upsert_products(request: Request, db: Session = Depends(get_db)):
+    chunks = iter_body(request.stream())
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = iter_ndjson(chunks)
+    else:
+        try:
+            items = parse_json_array(b"".join(chunks))
+        except BulkBodyError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    report = []
+    for batch in _batches(items, BULK_BATCH_SIZE):
+        batch_report, ids = process_batch(db, batch)
+        report.extend(batch_report)
+        if ids:
+            product_cache.delete(*(product_key(product_id) for product_id in ids))
+
+    report.sort(key=lambda r: r["row"])
+    counts = {status: sum(r["status"] == status for r in report) for status in ("ok", "skipped", "error")}
+    return FastJSONResponse({
+        "total": len(report), "ok": counts["ok"], "skipped": counts["skipped"], "failed": counts["error"], "rows": report,
+    })
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Счётчики по фасетам для текущих фильтров + первая страница товаров
+@router.get("/facets", response_model=ProductFacetsPage)
+def get_facets(
+    filters: ProductFilters = Depends(),
+    sort: Literal["created_at", "price", "id"] = Query("created_at"),
+    order: Literal["asc", "desc"] = Query("desc"),
+    limit: int = Query(24, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    key = filters.cache_key() or "all"
+    facets = facets_cache.get(key)
+    if facets is None:
+        facets = compute_facets(db, filters)
+        facets_cache.set(key, facets)
+    products, next_cursor = fetch_product_page(db, filters, sort, order, None, limit)
+    return FastJSONResponse(dump_model(
+        ProductFacetsPage, {"items": products, "next_cursor": next_cursor, "facets": facets}
+    ))
+
+# Поиск по названию, описанию, категории, подкатегории и типу — с ранжированием и опечатками
+@router.get("/search", response_model=List[ProductOut])
+def search_catalog(
+    q: str = Query(..., min_length=2, description="Поисковый запрос"),
+    filters: ProductFilters = Depends(),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_read_db),
+):
+    products = search_products(db, q, filters.conditions(), limit)
+    return FastJSONResponse(dump_models(ProductOut, products))
+
+# Выгрузка каталога потоком (NDJSON или CSV); updated_since — инкрементальная выгрузка.
+# Объявлена до /{product_id}, иначе "export" попадёт в параметр пути
+@router.get("/export")
+def export_products(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    updated_since: Optional[datetime] = Query(None, description="Только товары, изменённые с этого момента"),
+    filters: ProductFilters = Depends(),
+    db: Session = Depends(get_read_db),
+):
+    # Значение updated_since для следующей инкрементальной выгрузки — по часам БД, с перекрытием
+    watermark = export_watermark(db, settings.EXPORT_WATERMARK_OVERLAP).isoformat()
+    batches = iter_product_batches(ReadSessionLocal, filters, updated_since)
+    if format == "csv":
+        body, media_type = iter_csv(batches), "text/csv; charset=utf-8"
+    else:
+        body, media_type = iter_ndjson_export(batches), "application/x-ndjson"
+    return StreamingResponse(body, media_type=media_type, headers={"X-Export-Watermark": watermark})
+
+# Счётчики кэша карточек (hit/miss/eviction)
+@router.get("/cache/stats")
+def get_cache_stats():
+    return product_cache.info()
+
+# Получение продукта по ID (read-through кэш, инвалидация в create/update).
+# Промах кэша читается с основной БД: реплика с лагом вернула бы в кэш строку до изменения на весь TTL.
+# Сессия ленивая — при попадании в кэш соединение не берётся
 @router.get("/{product_id}", response_model=ProductOut)
-def get_product_by_id(product_id: int, db: Session = Depends(get_db)):
-    product = db.query(ProductModel).options(joinedload(ProductModel.category)).filter(ProductModel.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+def get_product_by_id(product_id: int, request: Request, db: Session = Depends(get_db)):
+    key = product_key(product_id)
+    data = product_cache.get(key)
+    if data is None:
+        product = queries.get_product(db, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+        data = dump_model(ProductOut, product)
+        product_cache.set(key, data)
 
-    return ProductOut(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        price=product.price,
-        old_price=product.old_price,
-        image=product.image,
-        status=product.status,
-        current_inventory=product.current_inventory,
-        is_hit=product.is_hit,
-        is_discount=product.is_discount,
-        is_new=product.is_new,
-        created_at=product.created_at,
-        updated_at=product.updated_at,
-        category_id=product.category_id,
-        category_name=product.category_name,
-        subcategory=product.subcategory,
-        product_type=product.product_type,
-    )
+    last_modified = as_utc(data["updated_at"])
+    etag = make_etag("product", product_id, last_modified.isoformat())
+    return conditional_response(request, etag, last_modified, lambda: FastJSONResponse(data))
+
+# Остаток товара на момент as_of (по журналу движений и снимкам)
+@router.get("/{product_id}/stock", response_model=StockAsOf)
+def get_product_stock(
+    product_id: int,
+    as_of: Optional[datetime] = Query(None, description="По умолчанию — сейчас"),
+    db: Session = Depends(get_read_db),
+):
+    if queries.get_product(db, product_id) is None:
+        raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    as_of = as_of or datetime.now(timezone.utc)
+    return {"product_id": product_id, "as_of": as_of, "quantity": stock_as_of(db, product_id, as_of)}
 
 # Обновление продукта
 @router.put("/{product_id}", response_model=ProductOut)
 def update_product(product_id: int, update: ProductUpdate, db: Session = Depends(get_db)):
     try:
-        db_product = db.query(ProductModel).filter_by(id=product_id).first()
+        update_data = update.dict(exclude_unset=True)
+        query = db.query(ProductModel).filter_by(id=product_id)
+        if "current_inventory" in update_data:
+            # FOR UPDATE: параллельное списание не изменит остаток между чтением и записью разницы в журнал
+            query = query.with_for_update()
+        db_product = query.first()
         if not db_product:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
 
-        update_data = update.dict(exclude_unset=True)
+        previous_inventory = db_product.current_inventory
         for key, value in update_data.items():
             setattr(db_product, key, value)
 
-        db.commit()
-        db.refresh(db_product)
-
         if "current_inventory" in update_data:
-            inventory_data = InventoryCreate(
-                product_id=product_id,
-                category_id=db_product.category_id,
-                inventory_quantity=update_data["current_inventory"],
-            )
-            create_inventory(inventory_data, db)
-
-        return ProductOut(
-            id=db_product.id,
-            name=db_product.name,
-            description=db_product.description,
-            price=db_product.price,
-            old_price=db_product.old_price,
-            image=db_product.image,
-            status=db_product.status,
-            current_inventory=db_product.current_inventory,
-            is_hit=db_product.is_hit,
-            is_discount=db_product.is_discount,
-            is_new=db_product.is_new,
-            created_at=db_product.created_at,
-            updated_at=db_product.updated_at,
-            category_id=db_product.category_id,
-            category_name=db_product.category_name,
-            subcategory=db_product.subcategory,
-            product_type=db_product.product_type,
-        )
+            create_inventory(db_product, db_product.current_inventory - previous_inventory, db)
 
+        # UPDATE (updated_at через RETURNING) и INSERT остатков — один flush и один commit
+        db.flush()
+        result = ProductOut.model_validate(db_product)
+        db.commit()
+        invalidate_product(product_id)
+        return result
+
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -134,15 +335,36 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
         db.add(db_category)
         db.commit()
         db.refresh(db_category)
+        invalidate_category(db_category.category_id)
+        invalidate_category_map()
         return db_category
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-# Получение категории по ID
+# Список категорий (ETag по max(updated_at) и count)
+@router.get("/categories/", response_model=List[CategorySchema])
+def get_all_categories(request: Request, db: Session = Depends(get_read_db)):
+    last_modified, count = db.execute(
+        select(func.max(CategoryModel.updated_at), func.count(CategoryModel.category_id))
+    ).one()
+    etag = make_etag("categories", last_modified, count)
+
+    def build():
+        categories = db.query(CategoryModel).order_by(CategoryModel.category_id).all()
+        return FastJSONResponse(dump_models(CategorySchema, categories))
+
+    return conditional_response(request, etag, last_modified, build)
+
+# Получение категории по ID (промах кэша — с основной БД, как у карточки товара)
 @router.get("/categories/{category_id}", response_model=CategorySchema)
 def get_category_by_id(category_id: int, db: Session = Depends(get_db)):
-    category = db.query(CategoryModel).filter(CategoryModel.category_id == category_id).first()
-    if category is None:
-        raise HTTPException(status_code=404, detail=f"Category with ID {category_id} not found")
-    return category
+    key = category_key(category_id)
+    data = product_cache.get(key)
+    if data is None:
+        category = queries.get_category(db, category_id)
+        if category is None:
+            raise HTTPException(status_code=404, detail=f"Category with ID {category_id} not found")
+        data = dump_model(CategorySchema, category)
+        product_cache.set(key, data)
+    return FastJSONResponse(data)
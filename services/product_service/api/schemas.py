@@ -1,6 +1,6 @@
 # services/product_service/api/schemas.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
 from datetime import datetime
 
 # === Категория товара ===
@@ -80,7 +80,87 @@ class ProductOut(BaseModel):
         from_attributes = True
 
 
+# Страница каталога: next_cursor передаётся в ?cursor= для следующей страницы
+class ProductPage(BaseModel):
+    items: List[ProductOut]
+    next_cursor: Optional[str] = None
+
+
+# === Фасеты каталога ===
+class FacetCount(BaseModel):
+    value: Optional[Union[bool, int, str]] = None
+    label: Optional[str] = None
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    category: List[FacetCount]
+    subcategory: List[FacetCount]
+    product_type: List[FacetCount]
+    is_hit: List[FacetCount]
+    is_new: List[FacetCount]
+    is_discount: List[FacetCount]
+    price: List[PriceBucket]
+
+
+# Фасеты + первая страница выдачи одним ответом (сайдбар витрины)
+class ProductFacetsPage(ProductPage):
+    facets: ProductFacets
+
+
+# === Журнал движения остатков ===
+
 class InventoryCreate(BaseModel):
     product_id: int
     category_id: int
-    inventory_quantity: int
+    delta: int
+    reason: str = "adjust"
+
+
+class StockAsOf(BaseModel):
+    product_id: int
+    as_of: datetime
+    quantity: int
+
+
+class InventoryMismatch(BaseModel):
+    product_id: int
+    current_inventory: int
+    ledger: int
+    diff: int
+
+
+class LedgerCompaction(BaseModel):
+    snapshots: int
+    compacted: int
+
+
+# === Атомарное списание и возврат остатков (POST /products/inventory/decrement, /release) ===
+
+class InventoryItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+
+class InventoryDecrement(BaseModel):
+    items: List[InventoryItem] = Field(..., min_length=1)
+    # Ключ заказа: повтор списания с тем же ключом не списывает второй раз
+    order_key: Optional[str] = Field(None, min_length=1, max_length=64)
+
+
+class InventoryRelease(BaseModel):
+    order_key: str = Field(..., min_length=1, max_length=64)
+
+
+class InventoryLevel(BaseModel):
+    product_id: int
+    quantity: int
+    current_inventory: int
+    price: float
+    category_id: int
@@ -0,0 +1,42 @@
+# services/product_service/inventory_ledger_job.py
+"""
+Периодическое обслуживание журнала остатков (cron / планировщик):
+
+    python -m services.product_service.inventory_ledger_job            # сверка + компактизация
+    python -m services.product_service.inventory_ledger_job --fix      # + корректирующие движения
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from common.config.settings import settings
+from common.db.session import SessionLocal
+import common.models  # noqa: F401
+import services.review_service.models.review  # noqa: F401  (связи User/Product)
+import services.review_service.models.recommendation  # noqa: F401
+from services.product_service.api.inventory import compact_ledger, reconcile_inventory
+
+
+def run(fix: bool = False, retention_days: int = settings.INVENTORY_LEDGER_RETENTION_DAYS):
+    db = SessionLocal()
+    try:
+        # Сверка до компактизации: расхождение не «запекается» в снимок незамеченным
+        mismatches = reconcile_inventory(db, fix=fix)
+        for m in mismatches:
+            print(f"[❗] Товар {m['product_id']}: журнал {m['ledger']}, products {m['current_inventory']} ({m['diff']:+d})")
+        db.commit()
+
+        before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        result = compact_ledger(db, before)
+        db.commit()
+        print(f"✅ Расхождений: {len(mismatches)}{' (исправлены)' if fix and mismatches else ''}; "
+              f"снимков: {result['snapshots']}, свёрнуто движений: {result['compacted']}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сверка и компактизация журнала остатков")
+    parser.add_argument("--fix", action="store_true", help="дописать корректирующие движения (reason=reconcile)")
+    parser.add_argument("--retention-days", type=int, default=settings.INVENTORY_LEDGER_RETENTION_DAYS)
+    args = parser.parse_args()
+    run(fix=args.fix, retention_days=args.retention_days)
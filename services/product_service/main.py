@@ -14,7 +14,9 @@ from common.models.products import Product
 from common.models.categories import Category
 
 
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from common.config.settings import settings
 
 from services.product_service.api.routes import router as product_router
@@ -28,6 +30,7 @@ from services.review_service.api.routes import router as review_router
 load_dotenv()
 
 app = FastAPI(title="Product Service")
+app.add_middleware(SQLTimingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +52,7 @@ print("▶ MAINDB_URL из settings:", settings.MAINDB_URL)
 app.include_router(product_router, prefix="/products", tags=["Products"])
 
 app.include_router(review_router, prefix="/reviews", tags=["Reviews"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # app.include_router(image_classifier_router.router, prefix="/product", tags=["AI classifier"])
 
@@ -58,15 +62,8 @@ app.include_router(review_router, prefix="/reviews", tags=["Reviews"])
 # Проверка подключения к БД
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print("✅ PostgreSQL подключение успешно (Product Service)")
-    except Exception as e:
-        print(f"❌ Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print("✅ PostgreSQL подключение успешно (Product Service)")
 
 # Загрузка модели при старте
 # from common.utils.model_utils import check_model_exists
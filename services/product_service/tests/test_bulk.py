@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import select
+
+from common.models.categories import Category
+from common.models.inventory import Inventory
+from common.models.products import Product
+from services.product_service.api.bulk import BulkBodyError, parse_json_array, process_batch
+
+
+@pytest.fixture()
+def db(db):
+    db.add(Category(category_id=1, category_name="shoes"))
+    db.commit()
+    return db
+
+
+def item(name, price=1.0, **extra):
+    return {
+        "name": name, "description": "d", "price": price, "status": "active",
+        "current_inventory": 2, "category_id": 1, "category_name": "shoes", **extra,
+    }
+
+
+def test_upsert_updates_by_natural_key_and_reports_rows(db):
+    report, ids = process_batch(db, [(1, item("a")), (2, item("b"))])
+    assert [r["status"] for r in report] == ["ok", "ok"]
+
+    report, new_ids = process_batch(db, [
+        (1, item("a", price=5.0, current_inventory=5)),
+        (2, item("c", price="bad")),
+        (3, item("d", category_id=42)),
+        (4, item("b", price=7.0)),
+        (5, item("b", price=9.0)),
+    ])
+    statuses = {r["row"]: r["status"] for r in report}
+    assert statuses == {1: "ok", 2: "error", 3: "error", 4: "skipped", 5: "ok"}
+    assert sorted(new_ids) == sorted(ids)
+
+    prices = dict(db.execute(select(Product.name, Product.price)).all())
+    assert prices == {"a": 5.0, "b": 9.0}
+    # В журнал остатков — только изменения: +2, +2 при создании и +3 для "a"
+    assert sorted(db.execute(select(Inventory.delta)).scalars()) == [2, 2, 3]
+
+
+def test_mixed_insert_and_update_map_ids_by_natural_key(db):
+    process_batch(db, [(1, item("a"))])
+    # Новая строка перед обновлением: на Postgres RETURNING обновлённой строки приходит со старым, меньшим id
+    report, _ = process_batch(db, [(1, item("z", current_inventory=4)), (2, item("a", current_inventory=7))])
+
+    ids = dict(db.execute(select(Product.name, Product.id)).all())
+    assert [(r["row"], r["id"]) for r in report] == [(1, ids["z"]), (2, ids["a"])]
+    deltas = sorted(db.execute(select(Inventory.product_id, Inventory.delta)).all())
+    assert deltas == sorted([(ids["a"], 2), (ids["z"], 4), (ids["a"], 5)])
+
+
+def test_body_must_be_array():
+    with pytest.raises(BulkBodyError):
+        parse_json_array(b'{"name": "a"}')
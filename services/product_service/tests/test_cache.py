@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from common.utils.cache import LocalCache, RedisCache
+
+
+class FakeRedis:
+    """Локальная замена Redis: подмножество протокола redis-py, которое использует RedisCache."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiry[key] = ex
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*"):
+        prefix = match.rstrip("*")
+        return [key for key in self.data if key.startswith(prefix)]
+
+    def info(self, section=None):
+        return {"evicted_keys": 0}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_local_cache_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = LocalCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" становится самым свежим
+    cache.set("c", 3)           # вытесняется "b"
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    clock.now = 11
+    assert cache.get("a") is None
+
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["evictions"], info["expirations"]) == (2, 2, 1, 1)
+
+
+def test_local_cache_invalidation():
+    cache = LocalCache()
+    cache.set("product:1", {"id": 1})
+    cache.delete("product:1", "product:2")
+    assert cache.get("product:1") is None
+    assert cache.info()["invalidations"] == 2
+
+
+def test_redis_cache_roundtrip_with_prefix_and_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=30, prefix="test:")
+    cache.set("product:1", {"id": 1, "updated_at": datetime(2025, 1, 1)})
+
+    assert client.expiry["test:product:1"] == 30
+    assert cache.get("product:1") == {"id": 1, "updated_at": "2025-01-01T00:00:00"}
+
+    cache.delete("product:1")
+    assert cache.get("product:1") is None
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+
+
+def test_redis_cache_errors_are_misses():
+    class BrokenRedis(FakeRedis):
+        def get(self, key):
+            raise ConnectionError("down")
+
+    cache = RedisCache(BrokenRedis())
+    assert cache.get("product:1") is None
+    assert cache.info()["errors"] == 1
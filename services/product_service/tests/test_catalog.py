@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from common.models.categories import Category
+from common.models.products import Product
+from services.product_service.api.catalog import ProductFilters, compute_facets, fetch_product_page
+
+
+@pytest.fixture()
+def db(db):
+    db.add_all([Category(category_id=1, category_name="shoes"), Category(category_id=2, category_name="bags")])
+    start = datetime(2025, 1, 1)
+    for i in range(1, 12):
+        db.add(Product(
+            id=i, name=f"p{i}", description="d", price=float(i % 4), status="active",
+            current_inventory=1, category_id=1 if i % 2 else 2, category_name="x",
+            is_hit=i % 3 == 0,
+            # у пар товаров одинаковый created_at — проверяем тай-брейк по id
+            created_at=start + timedelta(days=i // 2),
+        ))
+    db.commit()
+    return db
+
+
+def walk(db, filters, sort, order, limit=3):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = fetch_product_page(db, filters, sort, order, cursor, limit)
+        ids += [p.id for p in rows]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("sort,order,key", [
+    ("created_at", "desc", lambda p: (p.created_at, p.id)),
+    ("price", "asc", lambda p: (p.price, p.id)),
+    ("id", "asc", lambda p: (p.id,)),
+])
+def test_pages_cover_catalog_in_order(db, sort, order, key):
+    expected = [p.id for p in sorted(db.query(Product).all(), key=key, reverse=order == "desc")]
+    assert walk(db, ProductFilters(), sort, order) == expected
+
+
+def test_filters_apply_to_every_page(db):
+    filters = ProductFilters(category_id=1, min_price=1)
+    ids = walk(db, filters, "id", "asc", limit=2)
+    assert ids == [p.id for p in db.query(Product).order_by(Product.id) if p.category_id == 1 and p.price >= 1]
+
+
+def test_cursor_is_bound_to_sort(db):
+    _, cursor = fetch_product_page(db, ProductFilters(), "price", "asc", None, 2)
+    with pytest.raises(HTTPException) as exc:
+        fetch_product_page(db, ProductFilters(), "id", "asc", cursor, 2)
+    assert exc.value.status_code == 400
+    with pytest.raises(HTTPException):
+        fetch_product_page(db, ProductFilters(), "id", "asc", "not-a-cursor", 2)
+
+
+def test_facet_counts_follow_filters(db):
+    facets = compute_facets(db, ProductFilters(category_id=1))
+    products = [p for p in db.query(Product).all() if p.category_id == 1]
+
+    assert facets["category"] == [{"value": 1, "label": "x", "count": len(products)}]
+    assert sum(item["count"] for item in facets["is_hit"]) == len(products)
+    hits = next(item["count"] for item in facets["is_hit"] if item["value"] is True)
+    assert hits == sum(p.is_hit for p in products)
+    assert sum(b["count"] for b in facets["price"]) == len(products)
+    assert facets["price"][0]["min"] == 0
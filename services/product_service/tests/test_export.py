@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+from common.models.categories import Category
+from common.models.products import Product
+from services.product_service.api import export
+from services.product_service.api.catalog import ProductFilters
+
+
+@pytest.fixture()
+def factory(session_factory):
+    with session_factory() as session:
+        session.add(Category(category_id=1, category_name="shoes"))
+        for i in range(1, 6):
+            session.add(Product(
+                id=i, name=f"p{i}", description="d", price=10.0, status="active", current_inventory=1,
+                category_id=1, category_name="shoes", updated_at=datetime(2025, 1, i),
+            ))
+        session.commit()
+    return session_factory
+
+
+def exported_ids(factory, updated_since=None):
+    batches = export.iter_product_batches(factory, ProductFilters(), updated_since)
+    return [orjson.loads(line)["id"] for line in b"".join(export.iter_ndjson(batches)).splitlines()]
+
+
+def test_incremental_export_includes_rows_from_watermark(factory, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    assert exported_ids(factory) == [1, 2, 3, 4, 5]
+    # Граница включительно: строка с updated_at == watermark не теряется
+    assert exported_ids(factory, datetime(2025, 1, 3)) == [3, 4, 5]
+
+
+def test_watermark_uses_db_clock_with_overlap(factory):
+    with factory() as db:
+        watermark = export.export_watermark(db, overlap=300)
+    now = datetime.now(timezone.utc)
+    assert now - timedelta(seconds=310) < watermark < now - timedelta(seconds=290)
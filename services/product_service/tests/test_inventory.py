@@ -0,0 +1,118 @@
+from datetime import datetime
+
+import pytest
+
+from common.custom_exceptions import ProductNotFoundException
+from common.models.categories import Category
+from common.models.products import Product
+from common.models.inventory import Inventory
+from services.product_service.api.inventory import (
+    InventoryShortage, ReservationReleased, compact_ledger, decrement_inventory, reconcile_inventory,
+    release_inventory, release_reservation, stock_as_of,
+)
+from services.product_service.api.schemas import InventoryItem
+
+
+@pytest.fixture()
+def db(db):
+    db.add(Category(category_id=1, category_name="shoes"))
+    for i, stock in ((1, 5), (2, 1)):
+        db.add(Product(
+            id=i, name=f"p{i}", description="d", price=10.0 * i, status="active",
+            current_inventory=stock, category_id=1, category_name="shoes",
+        ))
+    db.commit()
+    return db
+
+
+def stock(db):
+    return dict(db.query(Product.id, Product.current_inventory).all())
+
+
+def test_decrement_merges_items(db):
+    items = [InventoryItem(product_id=2, quantity=1), InventoryItem(product_id=1, quantity=2),
+             InventoryItem(product_id=1, quantity=1)]
+    levels = decrement_inventory(db, items)
+    db.commit()
+    assert [(lv["product_id"], lv["quantity"], lv["current_inventory"]) for lv in levels] == [(1, 3, 2), (2, 1, 0)]
+    assert stock(db) == {1: 2, 2: 0}
+
+
+def test_decrement_is_all_or_nothing(db):
+    with pytest.raises(InventoryShortage) as exc:
+        decrement_inventory(db, [InventoryItem(product_id=1, quantity=1), InventoryItem(product_id=2, quantity=2)])
+    assert exc.value.detail() == {"product_id": 2, "requested": 2, "available": 1}
+    assert stock(db) == {1: 5, 2: 1}
+
+    with pytest.raises(ProductNotFoundException):
+        decrement_inventory(db, [InventoryItem(product_id=3, quantity=1)])
+
+
+def test_release_undoes_decrement(db):
+    items = [InventoryItem(product_id=1, quantity=2), InventoryItem(product_id=2, quantity=1)]
+    decrement_inventory(db, items)
+    release_inventory(db, items)
+    db.commit()
+    assert stock(db) == {1: 5, 2: 1}
+    assert sorted(db.query(Inventory.product_id, Inventory.delta, Inventory.reason).all()) == [
+        (1, -2, "sale"), (1, 2, "release"), (2, -1, "sale"), (2, 1, "release"),
+    ]
+
+    with pytest.raises(ProductNotFoundException):
+        release_inventory(db, [InventoryItem(product_id=1, quantity=1), InventoryItem(product_id=3, quantity=1)])
+    assert stock(db) == {1: 5, 2: 1}
+
+
+def test_order_key_makes_decrement_and_release_idempotent(db):
+    items = [InventoryItem(product_id=1, quantity=2)]
+    first = decrement_inventory(db, items, "order-1")
+    db.commit()
+    # Повтор после таймаута: остаток не меняется, уровни те же
+    assert decrement_inventory(db, items, "order-1") == first
+    db.commit()
+    assert stock(db) == {1: 3, 2: 1}
+
+    assert [lv["quantity"] for lv in release_reservation(db, "order-1")] == [2]
+    db.commit()
+    assert release_reservation(db, "order-1") == []
+    db.commit()
+    assert stock(db) == {1: 5, 2: 1}
+    with pytest.raises(ReservationReleased):
+        decrement_inventory(db, items, "order-1")
+
+
+def test_release_before_decrement_blocks_late_decrement(db):
+    assert release_reservation(db, "order-2") == []
+    db.commit()
+    with pytest.raises(ReservationReleased):
+        decrement_inventory(db, [InventoryItem(product_id=1, quantity=1)], "order-2")
+    assert stock(db) == {1: 5, 2: 1}
+
+
+def test_ledger_as_of_survives_compaction(db):
+    def move(day, delta):
+        db.add(Inventory(product_id=1, category_id=1, delta=delta, reason="adjust", created_at=datetime(2025, 1, day)))
+
+    move(1, 5)
+    move(3, -2)
+    move(5, 4)
+    db.commit()
+    assert [stock_as_of(db, 1, datetime(2025, 1, day)) for day in (1, 2, 3, 5)] == [5, 5, 3, 7]
+
+    assert compact_ledger(db, datetime(2025, 1, 4)) == {"snapshots": 1, "compacted": 2}
+    db.commit()
+    assert db.query(Inventory).count() == 1
+    assert [stock_as_of(db, 1, datetime(2025, 1, day)) for day in (3, 4, 5)] == [3, 3, 7]
+
+
+def test_reconcile_reports_and_fixes_drift(db):
+    decrement_inventory(db, [InventoryItem(product_id=1, quantity=2)])
+    db.commit()
+    # Начальных движений нет — журнал отстаёт от products на весь остаток
+    assert reconcile_inventory(db) == [
+        {"product_id": 1, "current_inventory": 3, "ledger": -2, "diff": 5},
+        {"product_id": 2, "current_inventory": 1, "ledger": 0, "diff": 1},
+    ]
+    reconcile_inventory(db, fix=True)
+    db.commit()
+    assert reconcile_inventory(db) == []
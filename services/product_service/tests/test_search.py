@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+
+from common.db import search
+from common.db.search import ProductSearchIndex
+from common.models.categories import Category
+from common.models.products import Product
+
+
+def product(id, name, description="", category_name="", subcategory=None, product_type=None):
+    return SimpleNamespace(
+        id=id, name=name, description=description, category_name=category_name,
+        subcategory=subcategory, product_type=product_type,
+    )
+
+
+def build_index():
+    index = ProductSearchIndex()
+    index.build([
+        product(1, "Кросівки Nike Air", "легкі бігові кросівки", "Взуття", "Спорт"),
+        product(2, "Сумка шкіряна", "сумка для ноутбука, підходить до кросівок", "Сумки"),
+        product(3, "Футболка бавовняна", "біла", "Одяг", product_type="Nike"),
+    ])
+    return index
+
+
+def test_name_matches_rank_above_description_matches():
+    ids = [product_id for product_id, _ in build_index().search("кросівки")]
+    assert ids[0] == 1
+    assert 2 in ids  # "кросівок" в описании — через триграммы
+
+
+def test_typo_tolerance():
+    ids = [product_id for product_id, _ in build_index().search("крсівки найк")]
+    assert ids[0] == 1
+
+
+def test_searches_category_and_product_type():
+    assert [pid for pid, _ in build_index().search("одяг")] == [3]
+    assert {pid for pid, _ in build_index().search("nike")} == {1, 3}
+
+
+def test_no_match():
+    assert build_index().search("телевізор") == []
+    assert build_index().search("   ") == []
+
+
+def test_filters_apply_before_candidate_cap(db, monkeypatch):
+    monkeypatch.setattr(search, "_local_index", ProductSearchIndex())
+    db.add_all([Category(category_id=1, category_name="shoes"), Category(category_id=2, category_name="bags")])
+    # Равная релевантность — порядок по id; товар нужной категории за пределами первой пачки кандидатов
+    total = search.MAX_CANDIDATES + 5
+    db.execute(insert(Product), [
+        dict(id=i, name=f"сумка {i}", description="", price=1.0, status="active", current_inventory=1,
+             category_id=2 if i == total else 1, category_name="x")
+        for i in range(1, total + 1)
+    ])
+    db.commit()
+
+    found = search.search_products(db, "сумка", [Product.category_id == 2], limit=20)
+    assert [p.id for p in found] == [total]
+    assert [p.id for p in search.search_products(db, "сумка", limit=3)] == [1, 2, 3]
@@ -0,0 +1,38 @@
+# services/product_service/utils/cache.py
+from common.config.settings import settings
+from common.utils.cache import build_cache
+
+# Read-through кэш карточек товаров и категорий (значения — уже сериализованные dict)
+product_cache = build_cache(
+    backend=settings.CACHE_BACKEND,
+    maxsize=settings.PRODUCT_CACHE_MAXSIZE,
+    ttl=settings.PRODUCT_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+    prefix="allures:product_service:",
+)
+
+# Счётчики фасетов по набору фильтров: короткий TTL вместо точной инвалидации
+facets_cache = build_cache(
+    backend=settings.CACHE_BACKEND,
+    maxsize=1000,
+    ttl=settings.FACETS_CACHE_TTL,
+    redis_url=settings.REDIS_URL,
+    prefix="allures:product_service:facets:",
+)
+
+
+def product_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_key(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+# Инвалидация вызывается после commit — до него другие читатели видят старую строку в БД
+def invalidate_product(product_id: int):
+    product_cache.delete(product_key(product_id))
+
+
+def invalidate_category(category_id: int):
+    product_cache.delete(category_key(category_id))
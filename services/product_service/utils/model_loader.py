@@ -1,8 +1,10 @@
 import requests
-from tensorflow.keras.models import load_model
 from tempfile import NamedTemporaryFile
 
 def load_remote_model():
+    # TensorFlow грузится только при первой загрузке модели
+    from tensorflow.keras.models import load_model
+
     file_id = "1QSUv9D0i-3YhsaXBbEgBaRAStIsz19_n"  # замените на свой ID
     url = f"https://drive.google.com/uc?export=download&id={file_id}"
 
@@ -12,12 +12,15 @@ from sqlalchemy import text
 from dotenv import load_dotenv
 
 from services.profile_service.routers import company, schedule
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from common.config.settings import settings
 
 load_dotenv()
 
 app = FastAPI(title="Profile Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # CORS
 app.add_middleware(
@@ -36,6 +39,7 @@ app.add_middleware(
 # Роуты
 app.include_router(company.router, prefix="/company", tags=["Company Profile"])
 app.include_router(schedule.router, prefix="/schedule", tags=["Work Schedule"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print(" MAINDB_URL:", db_url)
@@ -43,15 +47,8 @@ app.include_router(schedule.router, prefix="/schedule", tags=["Work Schedule"])
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Profile Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Profile Service)")
 
 # Корень
 @app.get("/")
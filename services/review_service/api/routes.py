@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from services.review_service.db.database import get_db
+from common.db.session import get_read_db
+from common.utils.fast_json import fast_json_list
 from services.review_service.api import controller
 from services.review_service.logic.recommendation import (
     Product, recommend_products, save_recommendations_to_db
@@ -32,35 +34,35 @@ def add_review(review: ReviewCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/reviews/{product_id}", response_model=List[ReviewOut])
-def get_reviews(product_id: int, db: Session = Depends(get_db)):
+def get_reviews(product_id: int, db: Session = Depends(get_read_db)):
     return controller.get_reviews_by_product(db, product_id)
 
 
 @router.get("/reviews/", response_model=List[ReviewOut])
-def get_all_reviews(db: Session = Depends(get_db)):
-    return db.query(Review).all()
+def get_all_reviews(db: Session = Depends(get_read_db)):
+    return fast_json_list(ReviewOut, db.query(Review).all())
 
 
 @router.get("/reviews/user/{user_id}", response_model=List[ReviewOut])
-def get_reviews_by_user(user_id: int, db: Session = Depends(get_db)):
+def get_reviews_by_user(user_id: int, db: Session = Depends(get_read_db)):
     return db.query(Review).filter(Review.user_id == user_id).all()
 
 
 @router.get("/by-subscription", response_model=List[ReviewOut])
 def reviews_by_subscription(
     subscription_name: str = Query(..., description="Назва підписки (наприклад, Базовий, Продвинутий, Преміум)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     return get_reviews_by_subscription_name(db, subscription_name)
 
 # === RECOMMENDATIONS ===
 
 @router.get("/recommendations/", response_model=List[RecommendationOut])
-def get_all_recommendations(db: Session = Depends(get_db)):
+def get_all_recommendations(db: Session = Depends(get_read_db)):
     return db.query(Recommendation).all()
 
 @router.get("/recommendations/user/{user_id}", response_model=List[RecommendationOut])
-def get_user_recommendations(user_id: int, db: Session = Depends(get_db)):
+def get_user_recommendations(user_id: int, db: Session = Depends(get_read_db)):
     return (
         db.query(Recommendation)
         .filter(Recommendation.user_id == user_id)
@@ -119,12 +121,12 @@ def delete_recommendation_route(id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/recommendations/filtered/")
-def get_filtered_recommendations(min_score: float = 0.5, db: Session = Depends(get_db)):
+def get_filtered_recommendations(min_score: float = 0.5, db: Session = Depends(get_read_db)):
     return db.query(Review).filter(Review.pos_score >= min_score).all()
 
 
 @router.get("/recommendations/joined/", response_model=List[dict])
-def get_recommendations_with_product_name(db: Session = Depends(get_db)):
+def get_recommendations_with_product_name(db: Session = Depends(get_read_db)):
     results = (
         db.query(
             Recommendation,
@@ -1,11 +1,3 @@
-import strawberry
-from datetime import datetime
-from sqlalchemy.orm import Session
-from common.db.session import SessionLocal
-from common.models.products import Product as ProductModel
-from services.review_service.models.review import Review as ReviewModel
-from services.review_service.models.recommendation import Recommendation as RecommendationModel
-
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, date, timedelta
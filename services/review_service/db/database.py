@@ -1,22 +1,12 @@
 # services/review_service/db/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from common.db.registry import registry
 from services.review_service.common.config.settings_review import settings_review
 
-# Создание движка подключения
-engine = create_engine(
-    settings_review.MAINDB_URL,
-    echo=True,  # Вкл. лог SQL-запросов — можно отключить на проде
-    future=True  # Рекомендуется для SQLAlchemy 1.4+
-)
+# Движок берётся из общего реестра: при том же MAINDB_URL это тот же пул, что и в common/db/session.py
+engine = registry.get_engine(settings_review.MAINDB_URL, service="review_service", pool_size=5, max_overflow=5)
 
 # Создание локальной сессии
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    future=True
-)
+SessionLocal = registry.get_sessionmaker(settings_review.MAINDB_URL, service="review_service")
 
 # ✅ Генератор сессии для Depends
 def get_db():
@@ -25,4 +15,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
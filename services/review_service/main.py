@@ -16,8 +16,12 @@ from common.models.categories import Category
 from common.models.payment import Payment
 from common.models.subscriptions import Subscription, UserSubscription
 from common.db.base import Base
-from common.db.session import engine, get_db
+from common.db.session import engine, get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.schema_version import check_schema_version
+from common.db.instrumentation import SQLTimingMiddleware
 from services.review_service.api.routes import router
+from services.review_service.sentiment.analyzer import init_analyzer
 from services.review_service.models.recommendation import Recommendation
 from services.review_service.models.review import Review
 from dotenv import load_dotenv
@@ -26,6 +30,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 app = FastAPI(title="Review Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # CORS
 app.add_middleware(
@@ -43,23 +48,19 @@ app.add_middleware(
 
 # Здесь была ошибка — теперь исправлено
 app.include_router(router, prefix="/reviews", tags=["Reviews"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print(" MAINDB_URL:", db_url)
 
-# Создание таблиц при старте
+# Проверка подключения и версии схемы при старте
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print("PostgreSQL подключение успешно (Review Service)")
-    except Exception as e:
-        print(f"Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print("PostgreSQL подключение успешно (Review Service)")
+    check_schema_version(engine)
+    # Прогрев NLTK до первого запроса (данные — из образа, без скачивания)
+    init_analyzer()
 
 # Корень
 @app.get("/")
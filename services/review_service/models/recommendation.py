@@ -1,5 +1,5 @@
 # services/review_service/models/recommendation.py
-from sqlalchemy import Column, Integer, Float, DateTime
+from sqlalchemy import Column, Integer, Float, DateTime, Index
 from sqlalchemy.sql import func
 from common.db.base import Base
 
@@ -12,3 +12,7 @@ class Recommendation(Base):
     score = Column(Float, nullable=False)
     recommended_at = Column(DateTime, default=func.now())
 
+    __table_args__ = (
+        Index("ix_recommendations_user_id_recommended_at", "user_id", "recommended_at"),
+    )
+
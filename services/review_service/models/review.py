@@ -1,5 +1,5 @@
 # services/review_service/models/review.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, TIMESTAMP, func
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, TIMESTAMP, Index, func
 from sqlalchemy.orm import relationship
 from common.db.base import Base
 from common.models.products import Product
@@ -18,5 +18,11 @@ class Review(Base):
     score = Column(Float)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
-    user = relationship("User", back_populates="reviews", lazy="joined")
-    product = relationship("Product", back_populates="reviews", lazy="joined")
+    # Загружаются только при обращении: списки отзывов не тянут JOIN users/products на каждую строку
+    user = relationship("User", back_populates="reviews")
+    product = relationship("Product", back_populates="reviews")
+
+    __table_args__ = (
+        Index("ix_reviews_product_id_created_at", "product_id", "created_at"),
+        Index("ix_reviews_user_id", "user_id"),
+    )
@@ -1,20 +1,50 @@
 import difflib
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-import nltk
 import os
+import re
 
+# Данные NLTK собираются заранее (download_nltk_data.py при сборке образа) — в рантайме сети нет
 nltk_data_path = os.path.join(os.path.dirname(__file__), "nltk_data")
-if not os.path.exists(nltk_data_path):
-    os.makedirs(nltk_data_path, exist_ok=True)
 
-nltk.download('punkt', download_dir=nltk_data_path)
-nltk.download('wordnet', download_dir=nltk_data_path)
+_word_tokenize = None
+_lemmatize = None
+_ready = False
 
-nltk.data.path.append(nltk_data_path)
+_FALLBACK_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
 
 
-lemmatizer = WordNetLemmatizer()
+def init_analyzer() -> bool:
+    """
+    Явная инициализация: загружает токенизатор и корпус WordNet из локального
+    nltk_data и прогревает их, чтобы первый запрос не платил за загрузку.
+    Вызывается на старте сервиса. Без данных анализатор работает в упрощённом
+    режиме (regex-токенизация, без лемматизации) — возвращает False.
+    """
+    global _word_tokenize, _lemmatize, _ready
+    if _ready:
+        return _lemmatize is not None
+
+    import nltk
+    from nltk.tokenize import word_tokenize
+    from nltk.stem import WordNetLemmatizer
+
+    if nltk_data_path not in nltk.data.path:
+        nltk.data.path.insert(0, nltk_data_path)
+
+    _word_tokenize, _lemmatize = word_tokenize, None
+    try:
+        word_tokenize("прогрев токенизатора")
+    except LookupError:
+        print(f"⚠️ Токенизатор punkt не найден в {nltk_data_path}, используется regex-токенизация")
+        _word_tokenize = _FALLBACK_TOKEN_RE.findall
+    try:
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize("warming")  # WordNet грузит корпус лениво — заставляем сейчас
+        _lemmatize = lemmatizer.lemmatize
+    except LookupError:
+        print(f"⚠️ Корпус WordNet не найден в {nltk_data_path}, анализ без лемматизации")
+    _ready = True
+    return _lemmatize is not None
+
 
 positive_words = ["качественный", "удобный", "красивый", "отличный"]
 negative_words = ["плохой", "медленный", "разочарован", "ненадежный"]
@@ -23,8 +53,11 @@ def get_similarity(word, word_list):
     return max([difflib.SequenceMatcher(None, word, w).ratio() for w in word_list], default=0)
 
 def analyze_sentiment(text: str):
-    tokens = word_tokenize(text.lower())
-    lexemes = [lemmatizer.lemmatize(w) for w in tokens if w.isalpha()]
+    if not _ready:
+        init_analyzer()
+    tokens = _word_tokenize(text.lower())
+    words = [w for w in tokens if w.isalpha()]
+    lexemes = [_lemmatize(w) for w in words] if _lemmatize else words
 
     pos = [get_similarity(w, positive_words) for w in lexemes if get_similarity(w, positive_words) > 0.5]
     neg = [get_similarity(w, negative_words) for w in lexemes if get_similarity(w, negative_words) > 0.5]
@@ -0,0 +1,32 @@
+# services/review_service/sentiment/download_nltk_data.py
+"""
+Сборка локального набора данных NLTK для анализатора тональности.
+Запускается один раз при сборке образа (Dockerfile) или вручную в dev-окружении:
+
+    python services/review_service/sentiment/download_nltk_data.py
+
+В рантайме анализатор ничего не скачивает — только читает nltk_data рядом с этим файлом.
+"""
+import os
+import sys
+
+import nltk
+
+NLTK_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nltk_data")
+
+# punkt_tab нужен word_tokenize в nltk>=3.8.2, omw-1.4 — лемматизатору WordNet
+RESOURCES = ["punkt", "punkt_tab", "wordnet", "omw-1.4"]
+
+
+def main() -> int:
+    os.makedirs(NLTK_DATA_PATH, exist_ok=True)
+    failed = [r for r in RESOURCES if not nltk.download(r, download_dir=NLTK_DATA_PATH, quiet=True)]
+    if failed:
+        print(f"❌ Не удалось скачать ресурсы NLTK: {', '.join(failed)}")
+        return 1
+    print(f"✅ Ресурсы NLTK сохранены в {NLTK_DATA_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,23 @@
 #sales_service/api/controller.py
+import logging
 import os
-import requests
+import uuid
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm.exc import NoResultFound
 from http import HTTPStatus as HttpStatus
 
+from common.db.category_map import get_category_map
+from common.enums.product_enums import ProductStatus
 from common.models.sales import Sales
+from common.utils.http_client import ServiceUnavailableError, service_client
+from services.sales_service.api.history import (
+    DEFAULT_SALES_PAGE_SIZE, after_cursor, history_conditions, sales_page
+)
+from services.sales_service.api.rollups import (
+    GROUPINGS, parse_bound, query_rollup, record_sales_rollups, sold_at_conditions, time_parts
+)
 from common.custom_exceptions import (
     ProductNotFoundException,
     ProductOutofStockException,
@@ -17,154 +26,272 @@ from common.custom_exceptions import (
     InsufficientInventoryException,
 )
 
+logger = logging.getLogger("allures.sales")
+
+def product_service():
+    # Общий клиент процесса: пул keep-alive соединений, таймауты, повторы и circuit breaker
+    return service_client("product_service", os.getenv("PRODUCT_SERVICE_URL", "http://product_service:8000"))
+
+
 # Получение деталей продукта по ID
 def get_product_details_by_id(product_id: int):
-    base_path = os.getenv("PRODUCT_SERVICE_URL", "http://product_service:8000")
-    url = f"{base_path}/products/get_product/?product_id={product_id}"
-    print("Запрос к продукту:", url)
-    return requests.get(url=url)
-
-
-# Обновление инвентаря продукта
-def decrement_product_inventory(new_quantity: int, product_id: int):
-    base_path = os.getenv("PRODUCT_SERVICE_URL", "http://product_service:8000")
-    url = f"{base_path}/products/update/?product_id={product_id}"
-    return requests.put(url=url, json={"current_inventory": new_quantity})
-
-# Получение всех категорий для сопоставления ID -> name
-def get_all_categories():
-    base_path = os.getenv("PRODUCT_SERVICE_URL", "http://product_service:8000")
-    url = f"{base_path}/categories/"
-    try:
-        resp = requests.get(url)
-        if resp.status_code == HttpStatus.OK:
-            return {c["category_id"]: c["name"] for c in resp.json()}
-    except Exception as e:
-        print(" Ошибка при получении категорий:", e)
-    return {}
+    return product_service().get(f"/products/{product_id}")
 
-# Транзакция создания продажи
-def create_product_sale_transaction(sale_data: dict, db: Session):
-    try:
-        db_sale = Sales(
-            product_id=sale_data["product_id"],
-            user_id=sale_data["user_id"],
-            category_id=sale_data["category_id"],
-            units_sold=sale_data["units_sold"]
-        )
 
-        print("Полученные данные:", vars(db_sale))
+# Запись товаров — только через product_service: там журнал остатков и инвалидация кэша карточек
+def create_product_in_product_service(product: dict):
+    return product_service().post("/products/", json=product)
+
+
+def update_product_in_product_service(product_id: int, fields: dict):
+    return product_service().put(f"/products/{product_id}", json=fields)
 
-        product_response = get_product_details_by_id(db_sale.product_id)
-        if product_response.status_code != HttpStatus.OK:
-            raise ProductNotFoundException("Продукт не найден")
 
-        product_data = product_response.json()
-        current_inventory = product_data.get("current_inventory", 0)
+def product_create_payload(db: Session, product: dict) -> dict:
+    """
+    Тело POST /sales/products/ -> тело POST /products/ product_service.
+    Категория приходит именем (ProductCategory), product_service ждёт её id и статус товара.
+    """
+    category_name = product["category_id"]
+    category_ids = {name: category_id for category_id, name in get_category_map(db).items()}
+    if category_name not in category_ids:
+        raise ProductNotFoundException(f"Категория '{category_name}' не найдена")
+    return {
+        **product,
+        "category_id": category_ids[category_name],
+        "category_name": category_name,
+        "status": ProductStatus.active.value,
+    }
 
-        if current_inventory >= db_sale.units_sold:
-            new_inventory = current_inventory - db_sale.units_sold
-            inventory_update = decrement_product_inventory(new_inventory, db_sale.product_id)
 
-            if inventory_update.status_code != HttpStatus.OK:
-                raise ProductInventoryUpdateException("Ошибка при обновлении инвентаря")
+# Атомарное списание остатков в product_service: одна позиция или несколько, всё или ничего.
+# order_key делает POST идемпотентным — повтор после таймаута не спишет второй раз
+def decrement_product_inventory(items: list, order_key: str):
+    return product_service().post(
+        "/products/inventory/decrement", json={"items": items, "order_key": order_key}, idempotent=True
+    )
 
-            db_sale.total_price = product_data["price"] * db_sale.units_sold
-            db_sale.revenue = db_sale.total_price
 
-            db.add(db_sale)
-            db.commit()
-            db.refresh(db_sale)
-            return db_sale
+# Компенсация: возврат списанного по ключу заказа, если заказ не удалось записать в sales.
+# Повтор безопасен — product_service возвращает остатки заказа не больше одного раза
+def release_product_inventory(order_key: str):
+    return product_service().post("/products/inventory/release", json={"order_key": order_key}, idempotent=True)
 
-        elif current_inventory > 0:
-            reduce_by = db_sale.units_sold - current_inventory
+
+def _raise_for_inventory_response(response):
+    if response.status_code == HttpStatus.NOT_FOUND:
+        raise ProductNotFoundException("Продукт не найден")
+    if response.status_code == HttpStatus.CONFLICT and isinstance(response.json()["detail"], dict):
+        shortage = response.json()["detail"]
+        # product_id — чтобы в заказе из нескольких позиций было видно, какую исправлять
+        if shortage["available"] > 0:
+            reduce_by = shortage["requested"] - shortage["available"]
             raise InsufficientInventoryException(
-                f"Недостаточно товара на складе. Уменьшите количество на {reduce_by}"
+                f"Недостаточно товара {shortage['product_id']} на складе. Уменьшите количество на {reduce_by}"
             )
-        else:
-            raise ProductOutofStockException("Продукт отсутствует на складе")
+        raise ProductOutofStockException(f"Продукт {shortage['product_id']} отсутствует на складе")
+    if response.status_code != HttpStatus.OK:
+        raise ProductInventoryUpdateException("Ошибка при обновлении инвентаря")
+
+# Резерв остатков в product_service: {product_id: {price, category_id, current_inventory}}
+def _reserve_inventory(items: list, order_key: str) -> dict:
+    try:
+        inventory_response = decrement_product_inventory(items, order_key)
+    except ServiceUnavailableError:
+        # Таймаут после отправки: списание могло пройти. Возврат по ключу безопасен в обоих случаях —
+        # если списание ещё в пути, product_service его отклонит
+        _release_reserved(order_key, items)
+        raise
+    _raise_for_inventory_response(inventory_response)
+    return {level["product_id"]: level for level in inventory_response.json()}
+
+
+def _sale_rows(user_id: int, items: list, levels: dict, sold_at: datetime) -> list:
+    # Цена и категория — из ответа списания (источник истины — products), а не от клиента:
+    # category_id продажи попадает и в агрегаты (product_id, category_id)
+    rows = []
+    for item in items:
+        level = levels[item["product_id"]]
+        total_price = level["price"] * item["quantity"]
+        rows.append({
+            "product_id": item["product_id"],
+            "user_id": user_id,
+            "category_id": level["category_id"],
+            "quantity": item["quantity"],
+            "sold_at": sold_at,
+            "total_price": total_price,
+            "revenue": total_price,
+        })
+    return rows
+
 
-    except SQLAlchemyError as e:
+def _write_sales(db: Session, rows: list, order_key: str, items: list) -> list:
+    """
+    Многострочный INSERT в sales + дневные агрегаты, один commit. Возвращает id продаж
+    в порядке rows. Любая ошибка записи — rollback и возврат зарезервированного по order_key.
+    """
+    try:
+        sale_ids = db.execute(
+            insert(Sales).returning(Sales.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        record_sales_rollups(db, [Sales(**row) for row in rows])
+        db.commit()
+        return sale_ids
+    except Exception:
         db.rollback()
-        raise e
+        _release_reserved(order_key, items)
+        raise
+
+
+# Транзакция создания продажи (заказ из одной позиции)
+def create_product_sale_transaction(sale_data: dict, db: Session):
+    items = [{"product_id": sale_data["product_id"], "quantity": sale_data["quantity"]}]
+    order_key = uuid.uuid4().hex
+    try:
+        # Проверка и списание остатка — один запрос; цена берётся из ответа, без отдельного GET товара
+        levels = _reserve_inventory(items, order_key)
+        row = _sale_rows(sale_data["user_id"], items, levels, datetime.utcnow())[0]
+        sale_id, = _write_sales(db, [row], order_key, items)
+        return {"id": sale_id, **row}
     finally:
         db.close()
 
 
-# Получение и агрегация статистики продаж
-def fetch_sales(db: Session, product_id=None, category_id=None, user_id=None, start_date=None, end_date=None, group_by=None):
+# Транзакция заказа из нескольких позиций: одно списание в product_service на весь заказ,
+# один многострочный INSERT в sales и агрегаты — один commit. Ошибка записи — возврат списанного
+def create_order_transaction(order_data: dict, db: Session):
+    items = [{"product_id": item["product_id"], "quantity": item["quantity"]} for item in order_data["items"]]
+    order_key = uuid.uuid4().hex
     try:
-        sales_query = db.query(
-            Sales.product_id,
-            Sales.category_id,
-            Sales.user_id,
-            func.max(Sales.sold_at).label("last_sold_at"),
-            func.sum(Sales.units_sold).label("total_units_sold"),
-            func.sum(Sales.total_price).label("total_revenue"),
-        )
+        levels = _reserve_inventory(items, order_key)
+        sold_at = datetime.utcnow()
+        rows = _sale_rows(order_data["user_id"], items, levels, sold_at)
+        sale_ids = _write_sales(db, rows, order_key, items)
 
-        if product_id is not None:
-            product_details = get_product_details_by_id(product_id)
-            if product_details.status_code != HttpStatus.OK:
-                raise ProductNotFoundException("Продукт не найден")
-            sales_query = sales_query.filter(Sales.product_id == product_id)
-
-        if category_id is not None:
-            sales_query = sales_query.filter(Sales.category_id == category_id)
-
-        if user_id is not None:
-            sales_query = sales_query.filter(Sales.user_id == user_id)
-
-        start_date = start_date or datetime.min
-        end_date = end_date or datetime.now()
-        sales_query = sales_query.filter(Sales.sold_at.between(start_date, end_date))
-
-        if group_by:
-            group_map = {
-                "day": [func.DATE(Sales.sold_at)],
-                "month": [func.extract("year", Sales.sold_at), func.extract("month", Sales.sold_at)],
-                "year": [func.extract("year", Sales.sold_at)],
-                "category": [Sales.category_id],
-                "category-year": [Sales.category_id, func.extract("year", Sales.sold_at)],
-                "category-month": [Sales.category_id, func.extract("year", Sales.sold_at), func.extract("month", Sales.sold_at)],
-                "category-date": [Sales.category_id, func.DATE(Sales.sold_at)],
-                "product_id-year": [Sales.product_id, func.extract("year", Sales.sold_at)],
-                "product_id-month": [Sales.product_id, func.extract("year", Sales.sold_at), func.extract("month", Sales.sold_at)],
-                "product_id-date": [Sales.product_id, func.DATE(Sales.sold_at)],
-                "user": [Sales.user_id],
-                "user-date": [Sales.user_id, func.DATE(Sales.sold_at)],
+        lines = [
+            {
+                "line": number,
+                "sale_id": sale_id,
+                "product_id": row["product_id"],
+                "category_id": row["category_id"],
+                "quantity": row["quantity"],
+                "unit_price": levels[row["product_id"]]["price"],
+                "total_price": row["total_price"],
+                "current_inventory": levels[row["product_id"]]["current_inventory"],
             }
+            for number, (sale_id, row) in enumerate(zip(sale_ids, rows), start=1)
+        ]
+        return {
+            "user_id": order_data["user_id"],
+            "sold_at": sold_at,
+            "total_units": sum(row["quantity"] for row in rows),
+            "total_price": sum(row["total_price"] for row in rows),
+            "lines": lines,
+        }
+    finally:
+        db.close()
 
-            if group_by in group_map:
-                group_fields = group_map[group_by]
-                sales_query = sales_query.group_by(*group_fields)
 
-                selected_fields = group_fields + [
-                    func.max(Sales.sold_at).label("last_sold_at"),
-                    func.sum(Sales.units_sold).label("total_units_sold"),
-                    func.sum(Sales.total_price).label("total_revenue"),
-                ]
-                sales_query = sales_query.with_entities(*selected_fields)
-        else:
-            sales_query = sales_query.group_by(Sales.product_id, Sales.category_id, Sales.user_id, Sales.sold_at)
+def _release_reserved(order_key: str, items: list):
+    # Исходная ошибка важнее ошибки компенсации: её пробрасывает вызывающий, здесь — лог с ключом.
+    # Клиент уже повторил запрос; дальше возврат повторяется вручную тем же POST с тем же order_key
+    try:
+        response = release_product_inventory(order_key)
+        if response.status_code == HttpStatus.OK:
+            return
+        logger.error(
+            "Остатки заказа не возвращены: order_key=%s items=%s HTTP %s. "
+            "Повтор: POST /products/inventory/release {\"order_key\": \"%s\"}",
+            order_key, items, response.status_code, order_key,
+        )
+    except Exception:
+        logger.exception(
+            "Остатки заказа не возвращены: order_key=%s items=%s. "
+            "Повтор: POST /products/inventory/release {\"order_key\": \"%s\"}",
+            order_key, items, order_key,
+        )
 
-        print("Generated SQL:\n", sales_query.statement)
-        raw_sales = sales_query.all()
 
-        if not raw_sales:
-            raise NoSalesDataFoundException("Нет данных о продажах")
+def _check_product(product_id):
+    if product_id is not None:
+        product_details = get_product_details_by_id(product_id)
+        if product_details.status_code != HttpStatus.OK:
+            raise ProductNotFoundException("Продукт не найден")
+
+
+# Отдельные продажи (fetch_sales без group_by) постранично по (sold_at, id):
+# (строки, next_cursor) вместо всей истории одним запросом
+def fetch_sales_history(db: Session, product_id=None, category_id=None, user_id=None, start_date=None,
+                        end_date=None, cursor=None, limit=DEFAULT_SALES_PAGE_SIZE, order="desc"):
+    _check_product(product_id)
+    filters = {"product_id": product_id, "category_id": category_id, "user_id": user_id}
+    stmt = select(
+        Sales.id,
+        Sales.product_id,
+        Sales.category_id,
+        Sales.user_id,
+        Sales.sold_at.label("last_sold_at"),
+        Sales.quantity.label("total_units_sold"),
+        Sales.total_price.label("total_revenue"),
+    ).where(*history_conditions(filters, parse_bound(start_date), parse_bound(end_date)))
+    if cursor:
+        stmt = stmt.where(after_cursor(cursor, order))
+    rows, next_cursor = sales_page(
+        db, stmt, order, limit, key=lambda row: (row.last_sold_at, row.id), scalars=False
+    )
+    return _with_category_names(db, rows), next_cursor
+
 
-        # Получение категорий и добавление имени категории
-        category_map = get_all_categories()
-        enriched_result = []
+def _with_category_names(db: Session, rows) -> list:
+    # Имена категорий — из общего кэша словаря (при промахе — из той же БД), без HTTP к product_service
+    category_map = get_category_map(db)
+    enriched_result = []
 
-        for row in raw_sales:
-            row_dict = row._asdict() if hasattr(row, "_asdict") else dict(row)
-            row_dict["category_name"] = category_map.get(row_dict.get("category_id"), "Без категории")
-            enriched_result.append(row_dict)
+    for row in rows:
+        row_dict = row._asdict() if hasattr(row, "_asdict") else dict(row)
+        row_dict["category_name"] = category_map.get(row_dict.get("category_id"), "Без категории")
+        enriched_result.append(row_dict)
+
+    return enriched_result
+
+
+# Получение и агрегация статистики продаж
+def fetch_sales(db: Session, product_id=None, category_id=None, user_id=None, start_date=None, end_date=None,
+                group_by=None, use_rollups=True, cursor=None, limit=DEFAULT_SALES_PAGE_SIZE):
+    try:
+        # Без группировки — отдельные продажи: одна страница, а не вся история
+        if group_by not in GROUPINGS:
+            rows, _ = fetch_sales_history(db, product_id, category_id, user_id, start_date, end_date, cursor, limit)
+            if not rows:
+                raise NoSalesDataFoundException("Нет данных о продажах")
+            return rows
+
+        _check_product(product_id)
+        filters = {"product_id": product_id, "category_id": category_id, "user_id": user_id}
+        start, end = parse_bound(start_date), parse_bound(end_date)
+
+        # Дневные агрегаты, если их ключ покрывает группировку и фильтры, а период — целые дни
+        raw_sales = query_rollup(db, group_by, filters, start, end) if use_rollups else None
+
+        if raw_sales is None:
+            entities, parts = GROUPINGS[group_by]
+            group_fields = [getattr(Sales, name) for name in entities] + time_parts(Sales.sold_at, parts)
+            sales_query = db.query(
+                *group_fields,
+                func.max(Sales.sold_at).label("last_sold_at"),
+                func.sum(Sales.quantity).label("total_units_sold"),
+                func.sum(Sales.total_price).label("total_revenue"),
+            )
+            for name, value in filters.items():
+                if value is not None:
+                    sales_query = sales_query.filter(getattr(Sales, name) == value)
+            sales_query = sales_query.filter(*sold_at_conditions(start, end))
+            raw_sales = sales_query.group_by(*group_fields).order_by(*group_fields).all()
+
+        if not raw_sales:
+            raise NoSalesDataFoundException("Нет данных о продажах")
 
-        return enriched_result
+        return _with_category_names(db, raw_sales)
 
     except NoResultFound:
         raise ProductNotFoundException("Продукт не найден")
@@ -0,0 +1,118 @@
+# services/sales_service/api/history.py
+from datetime import datetime
+from typing import Literal, Optional
+
+import orjson
+from fastapi import Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from common.models.sales import Sales
+from common.utils.fast_json import dump_models
+from common.utils.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_condition, keyset_order
+from services.sales_service.api.rollups import parse_bound, sold_at_conditions
+
+# Порядок истории продаж: (sold_at, id) — id различает продажи с одинаковым временем.
+# Фильтр по user_id/product_id + диапазон sold_at идут по индексам ix_sales_*_sold_at
+SALES_KEY = (Sales.sold_at, Sales.id)
+DEFAULT_SALES_PAGE_SIZE = 100
+MAX_SALES_PAGE_SIZE = 500
+SALES_STREAM_BATCH_SIZE = 1000
+
+
+def history_conditions(filters: dict, start=None, end=None) -> list:
+    """
+    Условия выборки продаж. Строки без sold_at в историю не попадают:
+    NULL не сравнивается в keyset-условии, и такая строка повторялась бы на каждой странице.
+    """
+    conditions = [getattr(Sales, name) == value for name, value in filters.items() if value is not None]
+    conditions.append(Sales.sold_at.isnot(None))
+    if start is not None or end is not None:
+        conditions.extend(sold_at_conditions(start, end))
+    return conditions
+
+
+def after_cursor(cursor: str, order: str = "desc"):
+    """Keyset-условие «после последней строки предыдущей страницы»; InvalidCursor — курсор испорчен."""
+    payload = decode_cursor(cursor)
+    if payload.get("o") != order:
+        raise InvalidCursor("Курсор выдан для другого порядка сортировки")
+    try:
+        sold_at, sale_id = payload["v"]
+        values = [datetime.fromisoformat(sold_at), int(sale_id)]
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor("Некорректный курсор") from e
+    return keyset_condition(SALES_KEY, values, order == "desc")
+
+
+class SalesListParams:
+    """Query-параметры истории продаж (через Depends()): фильтры, период, курсор, размер страницы, формат."""
+
+    def __init__(
+        self,
+        product_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        start_date: Optional[str] = Query(None, description="YYYY-MM-DD (весь день) или ISO-время"),
+        end_date: Optional[str] = Query(None, description="YYYY-MM-DD (весь день) или ISO-время"),
+        order: Literal["asc", "desc"] = "desc",
+        cursor: Optional[str] = Query(None, description="заголовок X-Next-Cursor предыдущей страницы"),
+        limit: int = Query(DEFAULT_SALES_PAGE_SIZE, ge=1, le=MAX_SALES_PAGE_SIZE),
+        format: Literal["json", "ndjson"] = Query("json", description="ndjson — вся выборка потоком, без limit"),
+    ):
+        self.product_id = product_id
+        self.category_id = category_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.order = order
+        self.cursor = cursor
+        self.limit = limit
+        self.format = format
+
+    def conditions(self, **filters) -> list:
+        """Условия выборки (+ filters, например user_id из пути); ValueError — некорректная дата или курсор."""
+        conditions = history_conditions(
+            {"product_id": self.product_id, "category_id": self.category_id, **filters},
+            parse_bound(self.start_date),
+            parse_bound(self.end_date),
+        )
+        if self.cursor:
+            conditions.append(after_cursor(self.cursor, self.order))
+        return conditions
+
+
+def sales_page(db: Session, stmt, order: str = "desc", limit: int = DEFAULT_SALES_PAGE_SIZE,
+               key=lambda row: (row.sold_at, row.id), scalars: bool = True):
+    """
+    Страница продаж по keyset-курсору: (строки, next_cursor), next_cursor = None на последней.
+    stmt — select по Sales с условиями (в т.ч. after_cursor); key — (sold_at, id) строки для курсора;
+    scalars=False — stmt выбирает колонки, а не модель.
+    """
+    # limit + 1: лишняя строка говорит, есть ли следующая страница, без COUNT(*)
+    stmt = stmt.order_by(*keyset_order(SALES_KEY, order == "desc")).limit(limit + 1)
+    result = db.execute(stmt)
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor({"o": order, "v": list(key(rows[-1]))})
+    return rows, next_cursor
+
+
+def iter_sales_ndjson(session_factory, schema, conditions: list, order: str = "desc"):
+    """
+    Вся выборка NDJSON-строками через серверный курсор (yield_per включает stream_results):
+    память воркера не зависит от длины истории. Сессия открывается здесь, а не через Depends —
+    зависимость закрывается раньше, чем StreamingResponse начнёт отдавать тело.
+    """
+    db = session_factory()
+    try:
+        stmt = select(Sales).where(*conditions).order_by(*keyset_order(SALES_KEY, order == "desc"))
+        result = db.execute(stmt.execution_options(yield_per=SALES_STREAM_BATCH_SIZE))
+        for batch in result.scalars().partitions():
+            yield b"".join(orjson.dumps(item) + b"\n" for item in dump_models(schema, batch))
+            # Поштучно: expunge_all() заменяет identity map, и следующая пачка yield_per падает
+            for sale in batch:
+                db.expunge(sale)
+    finally:
+        db.close()
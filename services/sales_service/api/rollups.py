@@ -0,0 +1,164 @@
+# services/sales_service/api/rollups.py
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from common.models.sales import Sales
+from common.models.sales_rollup import SalesDaily, SalesDailyCategory, SalesDailyProduct, SalesDailyUser
+
+# group_by → (измерения-сущности, временные части)
+GROUPINGS = {
+    "day": ((), ("day",)),
+    "month": ((), ("year", "month")),
+    "year": ((), ("year",)),
+    "category": (("category_id",), ()),
+    "category-year": (("category_id",), ("year",)),
+    "category-month": (("category_id",), ("year", "month")),
+    "category-date": (("category_id",), ("day",)),
+    "product_id-year": (("product_id",), ("year",)),
+    "product_id-month": (("product_id",), ("year", "month")),
+    "product_id-date": (("product_id",), ("day",)),
+    "user": (("user_id",), ()),
+    "user-date": (("user_id",), ("day",)),
+}
+
+# Порядок выбора: самая маленькая таблица, в ключе которой есть все нужные измерения.
+# Без фильтров и сущностей — sales_daily: в остальных нет продаж с пустым ключом
+ROLLUPS = [
+    (SalesDaily, set()),
+    (SalesDailyCategory, {"category_id"}),
+    (SalesDailyUser, {"user_id"}),
+    (SalesDailyProduct, {"product_id", "category_id"}),
+]
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_GREATEST = {"postgresql": func.greatest, "sqlite": func.max}  # в SQLite max(a, b) — скалярная функция
+
+
+def time_parts(column, parts):
+    exprs = {
+        "day": lambda: func.date(column).label("day"),
+        "year": lambda: func.extract("year", column).label("year"),
+        "month": lambda: func.extract("month", column).label("month"),
+    }
+    return [exprs[part]() for part in parts]
+
+
+# === Границы периода ===
+
+def parse_bound(value):
+    """'YYYY-MM-DD' и date — целый день; остальное — момент времени."""
+    if value is None or isinstance(value, (date, datetime)):
+        return value
+    text = str(value)
+    return date.fromisoformat(text) if len(text) == 10 else datetime.fromisoformat(text)
+
+
+def sold_at_conditions(start, end) -> list:
+    """
+    Условия на Sales.sold_at; конечная дата без времени включает весь день.
+    Без end верхней границы нет, как и в агрегатах: datetime.now() хоста не в UTC отрезал бы
+    последние продажи (sold_at пишется в utcnow)
+    """
+    start = datetime.min if start is None else start
+    if type(start) is date:
+        start = datetime.combine(start, time.min)
+    conditions = [Sales.sold_at >= start]
+    if type(end) is date:
+        conditions.append(Sales.sold_at < datetime.combine(end + timedelta(days=1), time.min))
+    elif end is not None:
+        conditions.append(Sales.sold_at <= end)
+    return conditions
+
+
+def _day_range(start, end):
+    """(первый, последний день) или None, если границы не совпадают с границами дней."""
+    if isinstance(start, datetime):
+        if start.time() != time.min:
+            return None
+        start = start.date()
+    if isinstance(end, datetime):
+        return None
+    return start, end
+
+
+# === Обновление агрегатов ===
+
+def record_sales_rollups(db: Session, sales: Iterable[Sales]):
+    """
+    Добавляет продажи в дневные агрегаты: INSERT ... ON CONFLICT DO UPDATE с приращением
+    (одна строка на ключ и таблицу). Вызывается до commit транзакции, создающей продажи.
+    """
+    dialect = db.get_bind().dialect.name
+    insert, greatest = _INSERTS[dialect], _GREATEST[dialect]
+    keys = {
+        SalesDaily: lambda s: {},
+        SalesDailyProduct: lambda s: {"product_id": s.product_id, "category_id": s.category_id},
+        SalesDailyCategory: lambda s: {"category_id": s.category_id},
+        SalesDailyUser: lambda s: {"user_id": s.user_id},
+    }
+    sales = list(sales)
+    for model, key in keys.items():
+        totals = defaultdict(lambda: {"units": 0, "revenue": 0.0, "last_sold_at": datetime.min})
+        for sale in sales:
+            row = totals[tuple(key(sale).items()) + (("day", sale.sold_at.date()),)]
+            row["units"] += sale.quantity
+            row["revenue"] += sale.total_price
+            row["last_sold_at"] = max(row["last_sold_at"], sale.sold_at)
+
+        stmt = insert(model)
+        table = model.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key],
+            set_={
+                "units": table.c.units + stmt.excluded.units,
+                "revenue": table.c.revenue + stmt.excluded.revenue,
+                "last_sold_at": greatest(table.c.last_sold_at, stmt.excluded.last_sold_at),
+            },
+        )
+        db.execute(stmt, [{**dict(k), **v} for k, v in totals.items()])
+
+
+# === Чтение ===
+
+def pick_rollup(group_by: str, filters: dict):
+    """Таблица агрегатов, из которой можно ответить на запрос, или None."""
+    entities, _ = GROUPINGS[group_by]
+    needed = set(entities) | {name for name, value in filters.items() if value is not None}
+    for model, dims in ROLLUPS:
+        if needed <= dims:
+            return model
+    return None
+
+
+def query_rollup(db: Session, group_by: str, filters: dict, start=None, end=None) -> Optional[list]:
+    """
+    Ответ на group_by-запрос из дневных агрегатов: строк столько, сколько (сущность × день)
+    в периоде, а не сколько продаж. None — гранулярность или период не подходят, нужен запрос к sales.
+    """
+    if group_by not in GROUPINGS:
+        return None
+    model = pick_rollup(group_by, filters)
+    days = _day_range(start, end)
+    if model is None or days is None:
+        return None
+
+    entities, parts = GROUPINGS[group_by]
+    keys = [getattr(model, name) for name in entities] + time_parts(model.day, parts)
+    stmt = select(
+        *keys,
+        func.max(model.last_sold_at).label("last_sold_at"),
+        func.sum(model.units).label("total_units_sold"),
+        func.sum(model.revenue).label("total_revenue"),
+    ).where(*(getattr(model, name) == value for name, value in filters.items() if value is not None))
+    first_day, last_day = days
+    if first_day is not None:
+        stmt = stmt.where(model.day >= first_day)
+    if last_day is not None:
+        stmt = stmt.where(model.day <= last_day)
+    stmt = stmt.group_by(*keys).order_by(*keys)
+    return db.execute(stmt).all()
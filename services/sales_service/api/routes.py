@@ -1,17 +1,25 @@
 #sales_service/api/routes.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
 from typing import List, Optional
 import traceback
 
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db, get_analytics_db, ReadSessionLocal
+from common.db.search import search_condition
+from common.utils.fast_json import fast_json_list
+from common.utils.http_client import ServiceUnavailableError
 from common.models.products import Product as ProductModel
 from common.models.sales import Sales
 from services.sales_service.api.schemas.sales import (
     SalesOut,
+    SalesCount,
     SalesRequestParams,
     SalesStats,
     SalesCreate,
+    OrderCreate,
+    OrderOut,
 )
 from services.sales_service.api.schemas.product import (
     Product as ProductOut,
@@ -21,35 +29,58 @@ from services.sales_service.api.schemas.product import (
 from common.custom_exceptions import (
     ProductNotFoundException,
     NoSalesDataFoundException,
+    InsufficientInventoryException,
+    ProductOutofStockException,
 )
-from services.sales_service.api.controller import fetch_sales, create_product_sale_transaction
+from services.sales_service.api.controller import (
+    fetch_sales, fetch_sales_history, create_product_sale_transaction, create_order_transaction,
+    create_product_in_product_service, update_product_in_product_service, product_create_payload,
+)
+from services.sales_service.api.history import SalesListParams, iter_sales_ndjson, sales_page
+from services.sales_service.api.rollups import GROUPINGS
 
 router = APIRouter()
 
 
-# Создание продукта
+def _product_service_result(call, *args):
+    # Ответ product_service отдаётся клиенту как есть: его статус и detail
+    try:
+        response = call(*args)
+    except ServiceUnavailableError as error:
+        raise HTTPException(status_code=503, detail=str(error))
+    if response.status_code != status.HTTP_200_OK:
+        try:
+            detail = response.json().get("detail")
+        except ValueError:
+            detail = response.text
+        raise HTTPException(status_code=response.status_code, detail=detail)
+    return response.json()
+
+
+# Создание продукта — через product_service (журнал остатков и кэш карточек)
 @router.post("/products/", response_model=ProductOut, status_code=status.HTTP_201_CREATED)
-def create_product(product: ProductCreate, db: Session = Depends(get_db)):
-    db_product = ProductModel(**product.dict())
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    return db_product
+def create_product(product: ProductCreate, db: Session = Depends(get_read_db)):
+    try:
+        payload = product_create_payload(db, product.model_dump(mode="json"))
+    except ProductNotFoundException as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    return _product_service_result(create_product_in_product_service, payload)
 
 
 # Получение всех продуктов (с category_name)
 @router.get("/products/", response_model=List[ProductOut])
 def get_filtered_products(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = Query(0, description="Сколько пропустить"),
     limit: int = Query(10, description="Сколько вернуть"),
     status: Optional[str] = Query(None, description="Фильтр по статусу ('active', 'inactive')"),
     min_price: Optional[float] = Query(None, description="Минимальная цена"),
     max_price: Optional[float] = Query(None, description="Максимальная цена"),
     is_new: Optional[bool] = Query(None, description="Фильтр новых продуктов"),
-    search: Optional[str] = Query(None, description="Поиск по названию"),
+    search: Optional[str] = Query(None, description="Поиск по названию, описанию и категории"),
 ):
-    query = db.query(ProductModel).options(joinedload(ProductModel.category))
+    # category_name хранится в products — join с categories не нужен
+    query = db.query(ProductModel)
 
     if status:
         query = query.filter(ProductModel.status == status)
@@ -64,58 +95,42 @@ def get_filtered_products(
         query = query.filter(ProductModel.is_new == is_new)
 
     if search:
-        query = query.filter(ProductModel.name.ilike(f"%{search}%"))
+        # tsvector/pg_trgm-индексы на Postgres вместо ILIKE '%x%' по одному названию
+        query = query.filter(search_condition(db, search))
 
     products = query.offset(skip).limit(limit).all()
-
-    return [
-        ProductOut(
-            id=p.id,
-            name=p.name,
-            description=p.description,
-            price=p.price,
-            old_price=p.old_price,
-            image=p.image,
-            status=p.status,
-            current_inventory=p.current_inventory,
-            is_hit=p.is_hit,
-            is_discount=p.is_discount,
-            is_new=p.is_new,
-            created_at=p.created_at,
-            updated_at=p.updated_at,
-            category_id=p.category_id,
-            category_name=p.category.name if p.category else None
-        )
-        for p in products
-    ]
+    return fast_json_list(ProductOut, products)
 
 
-# Обновление продукта
+# Обновление продукта — через product_service: изменение остатка пишется в журнал
 @router.put("/products/{product_id}", response_model=ProductOut)
-def update_product(product_id: int, updated: ProductUpdate, db: Session = Depends(get_db)):
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+def update_product(product_id: int, updated: ProductUpdate):
+    fields = updated.model_dump(mode="json", exclude_unset=True)
+    return _product_service_result(update_product_in_product_service, product_id, fields)
 
-    for key, value in updated.dict(exclude_unset=True).items():
-        setattr(product, key, value)
 
-    db.commit()
-    db.refresh(product)
-    return product
+def list_sales(db: Session, params: SalesListParams, **filters):
+    # Страница по (sold_at, id) или NDJSON-поток через серверный курсор — без загрузки всей истории в память
+    try:
+        conditions = params.conditions(**filters)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"Некорректный параметр: {error}")
+
+    if params.format == "ndjson":
+        return StreamingResponse(
+            iter_sales_ndjson(ReadSessionLocal, SalesOut, conditions, params.order),
+            media_type="application/x-ndjson",
+        )
+    # Тело — прежний список SalesOut; курсор следующей страницы — в заголовке, как в /retrieve_sales
+    sales, next_cursor = sales_page(db, select(Sales).where(*conditions), params.order, params.limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return fast_json_list(SalesOut, sales, headers=headers)
 
 
-# Получение всех продаж
+# Получение всех продаж (постранично или NDJSON)
 @router.get("/sales/", response_model=List[SalesOut])
-def get_all_sales(db: Session = Depends(get_db)):
-    try:
-        sales = db.query(Sales).all()
-        if not sales:
-            raise NoSalesDataFoundException("No sales found")
-        return sales
-    except Exception:
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+def get_all_sales(params: SalesListParams = Depends(), db: Session = Depends(get_read_db)):
+    return list_sales(db, params)
 
 
 # Создание продажи с user_id
@@ -123,43 +138,83 @@ def get_all_sales(db: Session = Depends(get_db)):
 def create_sale(sale: SalesCreate, db: Session = Depends(get_db)):
     try:
         return create_product_sale_transaction(sale.dict(), db)
+    except ProductNotFoundException as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except (InsufficientInventoryException, ProductOutofStockException) as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    except ServiceUnavailableError as error:
+        raise HTTPException(status_code=503, detail=str(error))
     except Exception:
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Failed to create sale")
 
+# Оформление заказа из нескольких позиций: все продажи или ни одной
+@router.post("/orders", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
+def create_order(order: OrderCreate, db: Session = Depends(get_db)):
+    try:
+        return create_order_transaction(order.dict(), db)
+    except ProductNotFoundException as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except (InsufficientInventoryException, ProductOutofStockException) as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    except ServiceUnavailableError as error:
+        raise HTTPException(status_code=503, detail=str(error))
+    except Exception:
+        print(traceback.format_exc())
+        raise HTTPException(status_code=500, detail="Failed to create order")
+
 # Получение статистики продаж по параметрам
 @router.post("/retrieve_sales", response_model=List[SalesStats])
-def get_sales_for_product(params: SalesRequestParams, db: Session = Depends(get_db)):
+def get_sales_for_product(params: SalesRequestParams, response: Response, db: Session = Depends(get_analytics_db)):
     try:
-        sales_data = fetch_sales(
-            db,
-            product_id=params.product_id,
-            category_id=params.category_id,
-            user_id=params.user_id,
-            start_date=params.start_date,
-            end_date=params.end_date,
-            group_by=params.group_by,
-        )
+        if params.group_by in GROUPINGS:
+            sales_data = fetch_sales(
+                db,
+                product_id=params.product_id,
+                category_id=params.category_id,
+                user_id=params.user_id,
+                start_date=params.start_date,
+                end_date=params.end_date,
+                group_by=params.group_by,
+            )
+        else:
+            # Отдельные продажи — страница по (sold_at, id); курсор следующей — в заголовке,
+            # тело остаётся тем же списком SalesStats, что и при group_by
+            sales_data, next_cursor = fetch_sales_history(
+                db,
+                product_id=params.product_id,
+                category_id=params.category_id,
+                user_id=params.user_id,
+                start_date=params.start_date,
+                end_date=params.end_date,
+                cursor=params.cursor,
+                limit=params.limit,
+            )
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
         if not sales_data:
             raise NoSalesDataFoundException("No sales data found for the specified criteria.")
         return sales_data
 
     except ProductNotFoundException as error:
         raise HTTPException(status_code=404, detail=str(error))
+    except ServiceUnavailableError as error:
+        raise HTTPException(status_code=503, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"Некорректный параметр: {error}")
     except NoSalesDataFoundException as error:
         raise HTTPException(status_code=404, detail=str(error))
     except Exception:
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
-# Получение всех продаж пользователя
+# Получение всех продаж пользователя (постранично или NDJSON)
 @router.get("/sales/user/{user_id}", response_model=List[SalesOut])
-def get_sales_by_user(user_id: int, db: Session = Depends(get_db)):
-    try:
-        sales = db.query(Sales).filter(Sales.user_id == user_id).all()
-        if not sales:
-            raise NoSalesDataFoundException(f"No sales found for user {user_id}")
-        return sales
-    except Exception:
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+def get_sales_by_user(user_id: int, params: SalesListParams = Depends(), db: Session = Depends(get_read_db)):
+    return list_sales(db, params, user_id=user_id)
+
+# Количество продаж пользователя: COUNT(*) по индексу (user_id, sold_at) вместо выгрузки истории
+@router.get("/sales/user/{user_id}/count", response_model=SalesCount)
+def count_sales_by_user(user_id: int, db: Session = Depends(get_read_db)):
+    count = db.execute(select(func.count()).select_from(Sales).where(Sales.user_id == user_id)).scalar()
+    return {"user_id": user_id, "count": count}
@@ -5,5 +5,6 @@ from common.enums.product_enums import ProductCategory
 class InventoryCreate(BaseModel):
     product_id: int
     category_id: int
-    inventory_quantity: int
+    delta: int
+    reason: str = "adjust"
 
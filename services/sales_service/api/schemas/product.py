@@ -59,4 +59,5 @@ class Product(BaseModel):
 class InventoryCreate(BaseModel):
     product_id: int
     category_id: int
-    inventory_quantity: int
+    delta: int
+    reason: str = "adjust"
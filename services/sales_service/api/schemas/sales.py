@@ -1,8 +1,10 @@
 # services/sales_service/api/schemas/sales.py
 from pydantic import BaseModel, Field, field_validator
 from common.enums.product_enums import ProductCategory
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
+
+from services.sales_service.api.history import DEFAULT_SALES_PAGE_SIZE, MAX_SALES_PAGE_SIZE
 
 
 # ✅ Базовая модель для продаж
@@ -17,10 +19,44 @@ class SalesBase(BaseModel):
 class SalesCreate(BaseModel):
     product_id: int
     user_id: int
-    category_id: int
+    # Не используется: категория продажи берётся из product_service при списании
+    category_id: Optional[int] = None
     quantity: int = Field(..., alias="units_sold")
 
 
+# ✅ Позиция заказа: категория и цена берутся из product_service при списании
+class OrderItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0, alias="units_sold")
+
+
+# ✅ Заказ из нескольких позиций — одна транзакция: все продажи или ни одной
+class OrderCreate(BaseModel):
+    user_id: int
+    items: List[OrderItem] = Field(..., min_length=1)
+
+
+# ✅ Результат по позиции заказа (line — номер позиции в запросе)
+class OrderLine(BaseModel):
+    line: int
+    sale_id: int
+    product_id: int
+    category_id: int
+    quantity: int
+    unit_price: float
+    total_price: float
+    current_inventory: int
+
+
+# ✅ Оформленный заказ
+class OrderOut(BaseModel):
+    user_id: int
+    sold_at: datetime
+    total_units: int
+    total_price: float
+    lines: List[OrderLine]
+
+
 # ✅ Для возврата полной информации о продаже
 class SalesOut(BaseModel):
     id: int
@@ -37,6 +73,12 @@ class SalesOut(BaseModel):
         from_attributes = True
 
 
+# ✅ Количество продаж пользователя
+class SalesCount(BaseModel):
+    user_id: int
+    count: int
+
+
 # ✅ Параметры запроса для фильтрации продаж
 class SalesRequestParams(BaseModel):
     product_id: Optional[int] = None
@@ -45,15 +87,23 @@ class SalesRequestParams(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     group_by: Optional[str] = None
+    # Без group_by — постранично: next_cursor приходит в заголовке X-Next-Cursor
+    cursor: Optional[str] = None
+    limit: int = Field(DEFAULT_SALES_PAGE_SIZE, ge=1, le=MAX_SALES_PAGE_SIZE)
 
 
 # ✅ Результат статистики продаж
 class SalesStats(BaseModel):
-    product_id: Optional[int]
-    category_id: Optional[int]
+    # При group_by заполнены только поля группировки; id продажи — только без group_by
+    id: Optional[int] = None
+    product_id: Optional[int] = None
+    category_id: Optional[int] = None
     category_name: Optional[str] = None
-    user_id: Optional[int]
-    last_sold_at: Optional[datetime]
+    user_id: Optional[int] = None
+    day: Optional[date] = None
+    year: Optional[int] = None
+    month: Optional[int] = None
+    last_sold_at: Optional[datetime] = None
     total_units_sold: int
     total_revenue: float
 
@@ -12,16 +12,20 @@ from dotenv import load_dotenv
 from common.models.products import Product
 from common.models.categories import Category
 from services.sales_service.api.routes import router as sales_router
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 
 # Загрузка переменных окружения
 load_dotenv()
 
 # Создание приложения
 app = FastAPI(title="Sales Service")
+app.add_middleware(SQLTimingMiddleware)
 
 # Подключение роутов
 app.include_router(sales_router, tags=["sales"], prefix="/sales")
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # Настройка CORS
 app.add_middleware(
@@ -48,14 +52,7 @@ def root():
 # Проверка подключения к PostgreSQL
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Sales Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Sales Service)")
 
 # uvicorn services.sales_service.main:app --reload --port 8001
\ No newline at end of file
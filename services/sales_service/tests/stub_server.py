@@ -0,0 +1,67 @@
+# Локальный HTTP-сервер для тестов межсервисных вызовов: сценарии ответов по пути, счётчики запросов и соединений
+import json
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """
+    routes: путь -> список ответов (status, body, delay); ответы выдаются по очереди, последний повторяется.
+    Используется как контекстный менеджер: with StubServer({...}) as stub: stub.url
+    """
+
+    def __init__(self, routes: dict):
+        self.routes = {path: list(responses) for path, responses in routes.items()}
+        self.requests = defaultdict(int)
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def _next_response(self, path: str):
+        with self._lock:
+            self.requests[path] += 1
+            responses = self.routes.get(path)
+            if not responses:
+                return 404, {"detail": "Not Found"}, 0
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive: по числу соединений проверяется пул
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                with stub._lock:
+                    stub.connections.add(self.client_address)
+                status, body, delay = stub._next_response(self.path)
+                if delay:
+                    time.sleep(delay)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from common.db import category_map
+from common.models.sales import Sales
+from common.utils.cache import LocalCache
+from common.utils.pagination import InvalidCursor
+from services.sales_service.api import controller, history
+from services.sales_service.api.history import after_cursor, history_conditions, iter_sales_ndjson, sales_page
+from services.sales_service.api.schemas.sales import SalesOut
+
+
+@pytest.fixture()
+def db(db, monkeypatch):
+    monkeypatch.setattr(category_map, "_cache", LocalCache(maxsize=1))
+    start = datetime(2025, 1, 1)
+    # По три продажи на одно и то же время — порядок внутри держит id
+    db.add_all([
+        Sales(product_id=1, category_id=1, user_id=1 + i % 2, quantity=1, total_price=10.0,
+              sold_at=start + timedelta(minutes=i // 3))
+        for i in range(20)
+    ])
+    db.add(Sales(product_id=1, category_id=1, user_id=1, quantity=1, total_price=10.0, sold_at=None))
+    db.commit()
+    return db
+
+
+def all_pages(db, conditions, order, limit):
+    ids, cursor = [], None
+    while True:
+        stmt = select(Sales).where(*conditions, *([after_cursor(cursor, order)] if cursor else []))
+        rows, cursor = sales_page(db, stmt, order, limit)
+        ids += [row.id for row in rows]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_pages_cover_history_once(db, session_factory, order, monkeypatch):
+    # Несколько пачек yield_per в NDJSON-потоке
+    monkeypatch.setattr(history, "SALES_STREAM_BATCH_SIZE", 3)
+    conditions = history_conditions({"user_id": 1})
+    expected = [s.id for s in db.query(Sales).filter(Sales.user_id == 1, Sales.sold_at.isnot(None))
+                .order_by(Sales.sold_at, Sales.id)]
+    expected = expected if order == "asc" else expected[::-1]
+
+    assert all_pages(db, conditions, order, 4) == expected
+    streamed = b"".join(iter_sales_ndjson(session_factory, SalesOut, conditions, order)).splitlines()
+    assert len(streamed) == len(expected)
+
+
+def test_cursor_is_bound_to_order(db):
+    _, cursor = sales_page(db, select(Sales), "asc", 5)
+    with pytest.raises(InvalidCursor):
+        after_cursor(cursor, "desc")
+    with pytest.raises(InvalidCursor):
+        after_cursor("not-a-cursor", "asc")
+
+
+def test_fetch_sales_without_group_by_is_paged(db):
+    rows, cursor = controller.fetch_sales_history(db, user_id=2, limit=6)
+    assert len(rows) == 6 and cursor
+    rest, cursor = controller.fetch_sales_history(db, user_id=2, cursor=cursor, limit=6)
+    assert (len(rest), cursor) == (4, None)
+    assert {row["id"] for row in rows}.isdisjoint(row["id"] for row in rest)
+    assert len(controller.fetch_sales(db, user_id=2, limit=3)) == 3
@@ -0,0 +1,139 @@
+import asyncio
+import time
+import weakref
+
+import pytest
+
+from common.utils import http_client
+from common.utils.http_client import (
+    AsyncServiceClient, CircuitBreaker, ServiceClient, ServiceUnavailableError, aclose_async_clients,
+    async_service_client,
+)
+from services.sales_service.tests.stub_server import StubServer
+
+OK = (200, {"ok": True}, 0)
+UNAVAILABLE = (503, {"detail": "down"}, 0)
+
+
+def client(url, retries=2, read_timeout=1.0, breaker=None, cls=ServiceClient):
+    return cls(
+        "product_service", url, connect_timeout=0.5, read_timeout=read_timeout, retries=retries,
+        backoff=0.01, max_backoff=0.02, pool_size=4, breaker=breaker or CircuitBreaker(5, 30),
+    )
+
+
+def test_keep_alive_pool_reuses_connection():
+    with StubServer({"/products/1": [OK]}) as stub:
+        c = client(stub.url)
+        for _ in range(10):
+            assert c.get("/products/1").status_code == 200
+        assert stub.requests["/products/1"] == 10
+        assert len(stub.connections) == 1
+
+
+def test_idempotent_request_retried_post_is_not():
+    routes = {
+        "/products/1": [UNAVAILABLE, UNAVAILABLE, OK],
+        "/products/inventory/decrement": [UNAVAILABLE],
+        "/products/inventory/release": [UNAVAILABLE, OK],
+    }
+    with StubServer(routes) as stub:
+        c = client(stub.url)
+        assert c.get("/products/1").status_code == 200
+        assert stub.requests["/products/1"] == 3
+
+        # Списание могло выполниться — повтор списал бы дважды
+        assert c.post("/products/inventory/decrement", json={}).status_code == 503
+        assert stub.requests["/products/inventory/decrement"] == 1
+
+        # POST с ключом идемпотентности повторяется
+        assert c.post("/products/inventory/release", json={}, idempotent=True).status_code == 200
+        assert stub.requests["/products/inventory/release"] == 2
+
+
+def test_timeout_and_unreachable_raise_service_unavailable():
+    with StubServer({"/slow": [(200, {}, 1.0)]}) as stub:
+        start = time.perf_counter()
+        with pytest.raises(ServiceUnavailableError):
+            client(stub.url, retries=0, read_timeout=0.1).get("/slow")
+        assert time.perf_counter() - start < 0.9
+        url = stub.url
+    # Сервер остановлен: соединение не устанавливается, POST повторяется и всё равно падает
+    with pytest.raises(ServiceUnavailableError):
+        client(url, retries=1).post("/products/inventory/decrement", json={})
+
+
+def test_circuit_opens_fails_fast_and_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+    with StubServer({"/products/1": [UNAVAILABLE, UNAVAILABLE, UNAVAILABLE, OK]}) as stub:
+        c = client(stub.url, retries=0, breaker=breaker)
+        for _ in range(3):
+            assert c.get("/products/1").status_code == 503
+        assert breaker.state == "open"
+
+        with pytest.raises(ServiceUnavailableError):
+            c.get("/products/1")
+        assert stub.requests["/products/1"] == 3  # запрос не ушёл в сервис
+
+        now[0] = 11
+        assert breaker.state == "half_open"
+        assert c.get("/products/1").status_code == 200
+        assert breaker.state == "closed"
+
+
+def test_async_client_retries():
+    async def run(url):
+        c = client(url, cls=AsyncServiceClient)
+        try:
+            return (await c.get("/products/1")).status_code
+        finally:
+            await c.aclose()
+
+    with StubServer({"/products/1": [UNAVAILABLE, OK]}) as stub:
+        assert asyncio.run(run(stub.url)) == 200
+        assert stub.requests["/products/1"] == 2
+
+
+def test_async_stream_retries_before_body_and_returns_open_response():
+    async def run(url):
+        c = client(url, cls=AsyncServiceClient)
+        try:
+            response = await c.stream("GET", "/sales/sales/")
+            try:
+                return response.status_code, b"".join([chunk async for chunk in response.aiter_bytes()])
+            finally:
+                await response.aclose()
+        finally:
+            await c.aclose()
+
+    with StubServer({"/sales/sales/": [UNAVAILABLE, OK]}) as stub:
+        assert asyncio.run(run(stub.url)) == (200, b'{"ok": true}')
+        assert stub.requests["/sales/sales/"] == 2
+
+
+def test_async_clients_are_kept_per_loop(monkeypatch):
+    monkeypatch.setattr(http_client, "_async_clients", weakref.WeakKeyDictionary())
+    monkeypatch.setattr(http_client, "AsyncServiceClient", lambda service, url: client(url, cls=AsyncServiceClient))
+
+    async def get():
+        return async_service_client("sales_service", "http://sales")
+
+    async def reused():
+        return await get() is await get()
+
+    assert asyncio.run(reused())
+
+    old_loop = asyncio.new_event_loop()
+    old = old_loop.run_until_complete(get())
+    old_loop.close()
+    # Новый loop получает свой клиент, закрытый loop вычищается
+    assert asyncio.run(get()) is not old
+    assert old_loop not in http_client._async_clients
+
+    async def shutdown():
+        await get()
+        await aclose_async_clients()
+        return asyncio.get_running_loop() in http_client._async_clients
+
+    assert not asyncio.run(shutdown())
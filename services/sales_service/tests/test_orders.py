@@ -0,0 +1,145 @@
+import logging
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from common.custom_exceptions import InsufficientInventoryException
+from common.models.categories import Category
+from common.models.inventory import Inventory
+from common.models.products import Product
+from common.models.sales import Sales
+from common.models.sales_rollup import SalesDailyProduct
+from common.utils.http_client import ServiceUnavailableError
+from services.product_service.api.inventory import InventoryShortage, decrement_inventory, release_reservation
+from services.product_service.api.schemas import InventoryItem
+from services.sales_service.api import controller
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture()
+def db(db, session_factory, monkeypatch):
+    db.add_all([Category(category_id=1, category_name="shoes"), Category(category_id=2, category_name="bags")])
+    for i, (stock, category_id) in enumerate(((5, 1), (2, 2)), start=1):
+        db.add(Product(
+            id=i, name=f"p{i}", description="d", price=10.0 * i, status="active",
+            current_inventory=stock, category_id=category_id, category_name="x",
+        ))
+    db.commit()
+
+    # product_service — те же функции списания/возврата поверх той же БД, без HTTP
+    products = session_factory()
+
+    def decrement(items, order_key):
+        try:
+            levels = decrement_inventory(products, [InventoryItem(**item) for item in items], order_key)
+        except InventoryShortage as e:
+            return FakeResponse(409, {"detail": e.detail()})
+        products.commit()
+        return FakeResponse(200, levels)
+
+    def release(order_key):
+        levels = release_reservation(products, order_key)
+        products.commit()
+        return FakeResponse(200, levels)
+
+    monkeypatch.setattr(controller, "decrement_product_inventory", decrement)
+    monkeypatch.setattr(controller, "release_product_inventory", release)
+    yield db
+    products.close()
+
+
+def order(*items):
+    return {"user_id": 7, "items": [{"product_id": p, "quantity": q} for p, q in items]}
+
+
+def stock(db):
+    return dict(db.query(Product.id, Product.current_inventory).all())
+
+
+def test_order_inserts_all_lines(db):
+    result = controller.create_order_transaction(order((1, 2), (2, 1), (1, 1)), db)
+
+    assert [(l["line"], l["product_id"], l["category_id"], l["total_price"]) for l in result["lines"]] == [
+        (1, 1, 1, 20.0), (2, 2, 2, 20.0), (3, 1, 1, 10.0),
+    ]
+    assert (result["total_units"], result["total_price"]) == (4, 50.0)
+    assert sorted(s.id for s in db.query(Sales)) == sorted(l["sale_id"] for l in result["lines"])
+    assert stock(db) == {1: 2, 2: 1}
+    assert sorted(db.query(SalesDailyProduct.product_id, SalesDailyProduct.units).all()) == [(1, 3), (2, 1)]
+
+
+def test_shortage_changes_nothing(db):
+    with pytest.raises(InsufficientInventoryException, match="товара 2"):
+        controller.create_order_transaction(order((1, 1), (2, 3)), db)
+    assert db.query(Sales).count() == 0
+    assert stock(db) == {1: 5, 2: 2}
+
+
+def test_failed_insert_releases_stock(db, monkeypatch):
+    def broken(db, sales):
+        raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(controller, "record_sales_rollups", broken)
+    with pytest.raises(OperationalError):
+        controller.create_order_transaction(order((1, 2), (2, 2)), db)
+
+    assert db.query(Sales).count() == 0
+    assert stock(db) == {1: 5, 2: 2}
+    assert sorted(db.query(Inventory.product_id, Inventory.delta, Inventory.reason).all()) == [
+        (1, -2, "sale"), (1, 2, "release"), (2, -2, "sale"), (2, 2, "release"),
+    ]
+
+
+def test_single_sale_takes_category_from_product_and_releases_on_failure(db, monkeypatch):
+    sale = controller.create_product_sale_transaction(
+        {"product_id": 2, "user_id": 7, "category_id": 1, "quantity": 1}, db
+    )
+    assert (sale["category_id"], sale["total_price"]) == (2, 20.0)
+    assert db.query(SalesDailyProduct.category_id).scalar() == 2
+
+    def broken(db, sales):
+        raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(controller, "record_sales_rollups", broken)
+    with pytest.raises(OperationalError):
+        controller.create_product_sale_transaction({"product_id": 1, "user_id": 7, "quantity": 2}, db)
+    assert stock(db) == {1: 5, 2: 1}
+
+
+def test_decrement_timeout_after_commit_is_released(db, monkeypatch):
+    applied = controller.decrement_product_inventory
+
+    def timed_out(items, order_key):
+        applied(items, order_key)  # product_service списал, ответ не дошёл
+        raise ServiceUnavailableError("product_service", "read timeout")
+
+    monkeypatch.setattr(controller, "decrement_product_inventory", timed_out)
+    with pytest.raises(ServiceUnavailableError):
+        controller.create_order_transaction(order((1, 2)), db)
+    assert stock(db) == {1: 5, 2: 2}
+    assert db.query(Sales).count() == 0
+
+
+def test_failed_release_is_logged_with_order_key(db, monkeypatch, caplog):
+    def broken(db, sales):
+        raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+    monkeypatch.setattr(controller, "record_sales_rollups", broken)
+    monkeypatch.setattr(controller, "release_product_inventory", lambda order_key: FakeResponse(503, {}))
+    with caplog.at_level(logging.ERROR, logger="allures.sales"), pytest.raises(OperationalError):
+        controller.create_order_transaction(order((1, 2)), db)
+
+    assert stock(db) == {1: 3, 2: 2}
+    order_key, = [r.args[0] for r in caplog.records]
+    # Повтор возврата по ключу из лога возвращает остатки
+    assert [lv["quantity"] for lv in release_reservation(db, order_key)] == [2]
+    db.commit()
+    assert stock(db) == {1: 5, 2: 2}
@@ -0,0 +1,115 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from common.db import category_map
+from common.models.categories import Category
+from common.models.sales import Sales
+from common.models.sales_rollup import SalesDaily
+from common.utils.cache import LocalCache
+from services.sales_service.api import controller
+from services.sales_service.api.rollups import GROUPINGS, query_rollup, record_sales_rollups
+
+
+class FoundResponse:
+    status_code = 200
+
+
+@pytest.fixture(autouse=True)
+def no_product_service(monkeypatch):
+    monkeypatch.setattr(category_map, "_cache", LocalCache(maxsize=1))
+    monkeypatch.setattr(controller, "get_product_details_by_id", lambda product_id: FoundResponse())
+
+
+@pytest.fixture(scope="module")
+def db(module_session_factory):
+    session = module_session_factory()
+
+    session.add_all([Category(category_id=1, category_name="shoes"), Category(category_id=2, category_name="bags")])
+    rng = random.Random(7)
+    start = datetime(2024, 12, 30)
+    for _ in range(30):
+        batch = []
+        for _ in range(10):
+            sale = Sales(
+                product_id=rng.randint(1, 4), category_id=rng.randint(1, 2), user_id=rng.randint(1, 3),
+                quantity=rng.randint(1, 3), sold_at=start + timedelta(minutes=rng.randint(0, 60 * 24 * 70)),
+            )
+            sale.total_price = sale.quantity * 10.0
+            batch.append(sale)
+        session.add_all(batch)
+        # Продажи приходят пачками — агрегаты копятся через ON CONFLICT DO UPDATE
+        record_sales_rollups(session, batch)
+    session.commit()
+    yield session
+    session.close()
+
+
+def stats(db, **params):
+    return controller.fetch_sales(db, use_rollups=params.pop("rollups"), **params)
+
+
+@pytest.mark.parametrize("group_by", sorted(GROUPINGS))
+def test_rollups_match_raw_sales(db, group_by):
+    assert stats(db, group_by=group_by, rollups=True) == stats(db, group_by=group_by, rollups=False)
+
+
+@pytest.mark.parametrize("params", [
+    {"group_by": "category-month", "category_id": 1, "start_date": "2025-01-01", "end_date": "2025-01-31"},
+    {"group_by": "product_id-date", "product_id": 2, "category_id": 1},
+    {"group_by": "user-date", "user_id": 3, "start_date": "2025-02-01"},
+    {"group_by": "day", "user_id": 1},
+])
+def test_rollups_used_for_filters_and_whole_days(db, params):
+    filters = {name: params.get(name) for name in ("product_id", "category_id", "user_id")}
+    assert query_rollup(db, params["group_by"], filters, *(
+        controller.parse_bound(params.get(b)) for b in ("start_date", "end_date")
+    )) is not None
+    assert stats(db, **params, rollups=True) == stats(db, **params, rollups=False)
+
+
+def test_falls_back_to_sales_when_rollup_cannot_answer(db):
+    # user × category нет ни в одной таблице агрегатов; период не по границам дней
+    assert query_rollup(db, "category", {"user_id": 1, "product_id": None, "category_id": None}) is None
+    assert query_rollup(db, "day", {}, datetime(2025, 1, 1, 12)) is None
+
+
+def test_time_buckets_count_legacy_sales_without_keys(session_factory):
+    db = session_factory()
+    # Старая продажа без категории и пользователя: после миграций она есть только в sales_daily
+    legacy = Sales(product_id=1, quantity=2, total_price=20.0, sold_at=datetime(2025, 1, 5, 10))
+    db.add_all([legacy, SalesDaily(day=date(2025, 1, 5), units=2, revenue=20.0, last_sold_at=legacy.sold_at)])
+    sale = Sales(product_id=1, category_id=1, user_id=1, quantity=1, total_price=10.0, sold_at=datetime(2025, 1, 5, 12))
+    db.add(sale)
+    record_sales_rollups(db, [sale])
+    db.commit()
+
+    for group_by in ("day", "month", "year"):
+        assert stats(db, group_by=group_by, rollups=True) == stats(db, group_by=group_by, rollups=False)
+    assert stats(db, group_by="day", rollups=True)[0]["total_units_sold"] == 3
+    db.close()
+
+
+def test_open_end_has_no_upper_bound(session_factory):
+    db = session_factory()
+    # Хост западнее UTC: sold_at (utcnow) последних продаж позже локального now(), они не теряются
+    sale = Sales(product_id=1, category_id=1, user_id=1, quantity=1, total_price=10.0,
+                 sold_at=datetime.now() + timedelta(hours=3))
+    db.add(sale)
+    record_sales_rollups(db, [sale])
+    db.commit()
+    assert stats(db, group_by="day", rollups=False) == stats(db, group_by="day", rollups=True)
+    db.close()
+
+
+def test_category_names_from_cached_map(db):
+    rows = stats(db, group_by="category", rollups=True)
+    assert {r["category_id"]: r["category_name"] for r in rows} == {1: "shoes", 2: "bags"}
+
+    # Новая категория видна после инвалидации, до неё — закэшированный словарь
+    db.add(Category(category_id=3, category_name="hats"))
+    db.commit()
+    assert 3 not in category_map.get_category_map(db)
+    category_map.invalidate_category_map()
+    assert category_map.get_category_map(db)[3] == "hats"
@@ -11,7 +11,9 @@ from common.models.subscriptions import Subscription, UserSubscription
 from common.models.payment import Payment
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-from common.db.session import get_db
+from common.db.session import get_db, wait_for_database
+from common.db.debug import router as debug_router
+from common.db.instrumentation import SQLTimingMiddleware
 from dotenv import load_dotenv
 
 # Загрузка .env
@@ -19,6 +21,7 @@ load_dotenv()
 
 
 app = FastAPI(title="Subscription Service")
+app.add_middleware(SQLTimingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,21 +37,15 @@ app.add_middleware(
 )
 
 app.include_router(subscription_router, prefix="/subscription", tags=["Subscription"])
+app.include_router(debug_router, prefix="/debug", tags=["Debug"])
 
 # db_url = os.getenv("MAINDB_URL")
 # print(" MAINDB_URL:", db_url)
 
 @app.on_event("startup")
 def startup_event():
-    db_gen = get_db()
-    db = next(db_gen)
-    try:
-        db.execute(text("SELECT 1"))
-        print(" PostgreSQL подключение успешно (Subscription Service)")
-    except Exception as e:
-        print(f" Ошибка подключения к PostgreSQL: {e}")
-    finally:
-        db.close()
+    wait_for_database()
+    print(" PostgreSQL подключение успешно (Subscription Service)")
 
 @app.get("/")
 def root():
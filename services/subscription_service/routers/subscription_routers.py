@@ -1,12 +1,16 @@
 # services/subscription_service/routers/subscription_routers.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from datetime import datetime, timedelta
 from services.subscription_service.crud import subscription_crud
 
-from common.db.session import get_db
+from common.db.session import get_db, get_read_db
 from common.models.user import User
+from common.models.subscriptions import Subscription
+from common.utils.fast_json import fast_json_list
+from common.utils.http_cache import conditional_response, make_etag
 
 from services.subscription_service.schemas.subscription_schemas import (
     SubscriptionOut,
@@ -19,8 +23,16 @@ router = APIRouter()
 
 # Получить список подписок по языку (по умолчанию — 'uk')
 @router.get("/", response_model=List[SubscriptionOut])
-def get_subscriptions(language: str = "uk", db: Session = Depends(get_db)):
-    return subscription_crud.get_all_subscriptions(db, language)
+def get_subscriptions(request: Request, language: str = "uk", db: Session = Depends(get_read_db)):
+    # Каталог меняется редко — фронтенд получает 304 по ETag/Last-Modified
+    last_modified, count = db.execute(
+        select(func.max(Subscription.updated_at), func.count(Subscription.id)).where(Subscription.language == language)
+    ).one()
+    etag = make_etag("subscriptions", language, last_modified, count)
+    return conditional_response(
+        request, etag, last_modified,
+        lambda: fast_json_list(SubscriptionOut, subscription_crud.get_all_subscriptions(db, language)),
+    )
 
 # POST /start-free-subscription — вручную активировать бесплатную подписку
 @router.post("/start-free-subscription")